@@ -0,0 +1,118 @@
+"""
+배치 전투 계산 / 승률(odds) API
+
+do_battle_attack 을 NumPy 배열 단위로 계산한다.
+공격군/수비군 병력 배열을 받아 생존 병력 배열을 돌려주며,
+결과는 원소마다 do_battle_attack 을 호출한 것과 같다 (같은 float64 연산 + int() 절삭).
+AI 나 '공격 미리보기' 화면이 전선의 모든 대진을 한 번에 평가할 때 쓴다.
+"""
+import numpy as np
+
+import engine
+
+
+def do_battle_attack_batch(attacker_soldiers, defender_soldiers):
+    """
+    attacker_soldiers, defender_soldiers: 같은 모양(또는 브로드캐스트 가능한) 정수 배열.
+    (attacker_after, defender_after) int64 배열 튜플 반환.
+    """
+    atk = np.asarray(attacker_soldiers, dtype=np.int64)
+    dfn = np.asarray(defender_soldiers, dtype=np.int64)
+    atk, dfn = np.broadcast_arrays(atk, dfn)
+
+    # 한쪽 병력이 0 이하인 경우는 교환 없이 끝남 (0 으로 나누지 않도록 1 로 대체해서 계산)
+    fight = (atk > 0) & (dfn > 0)
+    a = np.where(fight, atk, 1)
+    d = np.where(fight, dfn, 1)
+
+    # 공격군이 먼저 수비군 HP를 깎음
+    lost_ratio_def = (a * engine.ATTACK_FACTOR) / (d * engine.HP_FACTOR)
+    lost_soldiers_def = np.trunc(d * lost_ratio_def).astype(np.int64)
+    defender_after = np.maximum(d - lost_soldiers_def, 0)
+
+    # 수비군이 생존했다면 반격
+    lost_ratio_atk = (d * engine.ATTACK_FACTOR) / (a * engine.HP_FACTOR)
+    lost_soldiers_atk = np.trunc(a * lost_ratio_atk).astype(np.int64)
+    attacker_after = np.where(defender_after > 0, np.maximum(a - lost_soldiers_atk, 0), a)
+
+    attacker_after = np.where(fight, attacker_after, np.where(atk <= 0, 0, atk))
+    defender_after = np.where(fight, defender_after, np.where(atk <= 0, dfn, 0))
+    return attacker_after, defender_after
+
+
+def battle_wins(attacker_soldiers, defender_soldiers):
+    """공격 승리(공격군 생존 + 수비군 전멸) 여부 bool 배열"""
+    att_after, def_after = do_battle_attack_batch(attacker_soldiers, defender_soldiers)
+    return (att_after > 0) & (def_after == 0)
+
+
+def attack_odds(attacker_sizes, defender_soldiers, defender_spread=0, samples=1000, rng=None):
+    """
+    공격 병력 후보(attacker_sizes)를 수비군 하나에 대해 한 번에 훑어본다.
+
+    전투 자체는 결정적이므로 defender_spread 가 0 이면 승률은 0 또는 1 이다.
+    defender_spread > 0 이면 수비 병력을 [defender_soldiers, defender_soldiers + defender_spread]
+    에서 균등하게 samples 번 뽑아 (다음 턴 AI 모병 등 불확실성) 몬테카를로로 승률을 추정한다.
+
+    반환 dict:
+      attacker_sizes  : 입력 공격 병력 배열
+      win_prob        : 공격 승리 확률
+      occupy_prob     : 점령 확률 (승리 후 점령/약탈을 반반으로 고르는 attack 규칙 기준)
+      attacker_after  : 평균 공격군 생존 병력
+      defender_after  : 평균 수비군 생존 병력
+    """
+    sizes = np.asarray(attacker_sizes, dtype=np.int64).reshape(-1)
+    if defender_spread > 0:
+        if rng is None:
+            rng = np.random.default_rng()
+        defenders = rng.integers(defender_soldiers, defender_soldiers + defender_spread,
+                                 size=samples, endpoint=True)
+    else:
+        defenders = np.array([defender_soldiers], dtype=np.int64)
+
+    # (공격 후보 수, 표본 수) 격자로 한 번에 계산
+    att_after, def_after = do_battle_attack_batch(sizes[:, None], defenders[None, :])
+    wins = (att_after > 0) & (def_after == 0)
+    win_prob = wins.mean(axis=1)
+    return {
+        "attacker_sizes": sizes,
+        "win_prob": win_prob,
+        "occupy_prob": win_prob * 0.5,
+        "attacker_after": att_after.mean(axis=1),
+        "defender_after": def_after.mean(axis=1),
+    }
+
+
+def min_winning_attacker(defender_soldiers, max_attacker=None):
+    """
+    defender_soldiers 를 전멸시키는 가장 작은 공격 병력 (max_attacker 까지 없으면 None).
+    승리 여부가 병력에 대해 단조롭지 않을 수 있으므로 후보 전체를 배치로 계산한다.
+    """
+    if defender_soldiers <= 0:
+        return 1
+    if max_attacker is None:
+        max_attacker = 2 * defender_soldiers
+    sizes = np.arange(1, max_attacker + 1, dtype=np.int64)
+    winners = np.flatnonzero(battle_wins(sizes, defender_soldiers))
+    if len(winners) == 0:
+        return None
+    return int(sizes[winners[0]])
+
+
+def frontier_matchups(state, owner):
+    """
+    owner 소유 지역과 인접한 모든 적 지역 쌍(전선)을 한 번에 평가.
+    (attacker 이름, target 이름, 공격 후 공격군, 공격 후 수비군, 승리 여부) 리스트 반환.
+    """
+    pairs = state.frontier_pairs(owner)
+    if not pairs:
+        return []
+
+    att_after, def_after = do_battle_attack_batch(
+        [a.army for a, _ in pairs], [t.army for _, t in pairs]
+    )
+    wins = (att_after > 0) & (def_after == 0)
+    return [
+        (a.name, t.name, int(aa), int(da), bool(w))
+        for (a, t), aa, da, w in zip(pairs, att_after.tolist(), def_after.tolist(), wins.tolist())
+    ]
@@ -0,0 +1,297 @@
+"""
+성능 측정 (벤치마크)
+
+  turns     : 턴 종료(Region.next_turn + AI) 초당 턴 수 - 14 지역 한반도 지도 / scenario.generate 지도
+  battle    : do_battle_attack 초당 전투 수 (배치 버전 battle.do_battle_attack_batch 도 같이)
+  save      : 전체 저장(JSON / 바이너리) 지연 시간과 초당 지역 수, 불러오기 지연 시간
+  ui        : GameScreen.update_regions_info 시간 (화면 없는 Kivy 창, 전체 구성 / 일부 갱신)
+  startup   : 새 프로세스에서 hgj import 부터 메인 메뉴 첫 프레임까지 걸리는 시간
+
+결과는 JSON 으로 출력하고 기준값(bench_baseline.json)과 비교해서
+허용 범위(기본 20%)보다 나빠진 항목이 있으면 종료 코드 1 을 돌려준다.
+
+    python bench.py                          전체 측정 + 기준값 비교
+    python bench.py --only turns,battle      일부만 측정
+    python bench.py --sizes 14,1000          지도 크기 지정
+    python bench.py --json result.json       결과를 파일로도 저장
+    python bench.py --save-baseline          측정 결과를 기준값으로 저장
+"""
+import argparse
+import functools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import scenario
+from engine import REGION_NAMES, do_battle_attack
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+SECTIONS = ("turns", "battle", "save", "ui", "startup")
+DEFAULT_SIZES = (14, 1000, 10000)
+TOLERANCE = 0.2
+
+# 값이 계속 커지면 2000 턴 근처에서 float 변환이 넘치므로 짧게 끊어서 새 상태로 반복
+TURNS_PER_RUN = 50
+
+
+@functools.lru_cache(maxsize=None)
+def map_scenario(size):
+    """size 가 14 면 기존 한반도 지도, 아니면 scenario.generate 로 만든 지도 (seed 0)"""
+    if size == len(REGION_NAMES):
+        return scenario.korea()
+    return scenario.generate(size, seed=0)
+
+
+def make_state(size, seed=None):
+    sc = map_scenario(size)
+    return sc.new_game("P", sc.names[0], rng=random.Random(0), seed=seed)
+
+
+def map_label(size):
+    return "korea-14" if size == len(REGION_NAMES) else f"gen-{size}"
+
+
+def best_of(func, repeat):
+    """func() 를 repeat 번 재서 가장 짧은 시간(초)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def result(name, value, unit, higher_is_better):
+    return {"name": name, "value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+# ----------------------------------
+# 측정 항목
+# ----------------------------------
+def bench_turns(sizes, repeat=3):
+    results = []
+    for size in sizes:
+        turns = TURNS_PER_RUN if size <= 1000 else max(2, TURNS_PER_RUN * 1000 // size)
+        for seed, suffix in ((None, ""), (1, "-seeded")):
+            best = None
+            for _ in range(repeat):
+                state = make_state(size, seed)
+                start = time.perf_counter()
+                for _ in range(turns):
+                    state.step()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results.append(result(f"turns/{map_label(size)}{suffix}", turns / best, "turns/s", True))
+    return results
+
+
+def bench_battle(n=200000, repeat=3):
+    rng = random.Random(0)
+    attackers = [rng.randint(0, 2000) for _ in range(n)]
+    defenders = [rng.randint(0, 2000) for _ in range(n)]
+
+    def run():
+        for a, d in zip(attackers, defenders):
+            do_battle_attack(a, d)
+
+    results = [result("battle/do_battle_attack", n / best_of(run, repeat), "battles/s", True)]
+
+    import battle
+    elapsed = best_of(lambda: battle.do_battle_attack_batch(attackers, defenders), repeat)
+    results.append(result("battle/batch", n / elapsed, "battles/s", True))
+    return results
+
+
+def bench_save(sizes, repeat=3):
+    from savegame import SaveManager, load_state
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            state = make_state(size)
+            for binary, fmt in ((False, "json"), (True, "binary")):
+                path = os.path.join(tmp, f"save-{size}.{fmt}")
+                saver = SaveManager(path, binary=binary)
+                enqueue = []
+
+                def save():
+                    start = time.perf_counter()
+                    saver.save(state)
+                    enqueue.append(time.perf_counter() - start)
+                    saver.flush()
+
+                total = best_of(save, repeat)
+                label = f"{fmt}-{map_label(size)}"
+                results.append(result(f"save/{label}/enqueue", min(enqueue) * 1000, "ms", False))
+                results.append(result(f"save/{label}/total", total * 1000, "ms", False))
+                results.append(result(f"save/{label}/throughput", size / total, "regions/s", True))
+                results.append(result(
+                    f"save/{label}/size", os.path.getsize(path) / size, "bytes/region", False
+                ))
+                elapsed = best_of(lambda: load_state(path), repeat)
+                results.append(result(f"load/{label}", elapsed * 1000, "ms", False))
+    return results
+
+
+def bench_ui(sizes, repeat=3):
+    # 창을 띄우지 않는 SDL 드라이버 (Kivy 를 import 하기 전에 지정해야 함)
+    os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+    from kivy.clock import Clock
+    from kivy.core.window import Window
+
+    import hgj
+    hgj.register_fonts()
+
+    results = []
+    for size in sizes:
+        screen = hgj.GameScreen(name="game")
+        Window.add_widget(screen)
+        states = [make_state(size) for _ in range(repeat)]
+
+        def full():
+            # 상태 객체가 바뀌면 전체 구성 (+ 다음 프레임 레이아웃)
+            screen.state = states.pop()
+            screen.update_regions_info()
+            Clock.tick()
+
+        full_time = best_of(full, repeat)
+
+        names = list(screen.state.regions)[:10]
+
+        def partial():
+            screen.state.touch(*names)
+            screen.update_regions_info()
+            Clock.tick()
+
+        partial_time = best_of(partial, repeat)
+        Window.remove_widget(screen)
+
+        label = map_label(size)
+        results.append(result(f"ui/update_regions_info/{label}/full", full_time * 1000, "ms", False))
+        results.append(result(f"ui/update_regions_info/{label}/10-dirty", partial_time * 1000, "ms", False))
+    return results
+
+
+# 첫 프레임이 그려지면 시간을 출력하고 끝나는 스크립트 (bench_startup 에서 새 프로세스로 실행)
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import hgj
+from kivy.clock import Clock
+from kivy.core.window import Window
+app = hgj.HangukGameApp()
+def first_frame(*args):
+    Window.unbind(on_flip=first_frame)
+    print((time.perf_counter() - start) * 1000)
+    Clock.schedule_once(lambda dt: app.stop())
+Window.bind(on_flip=first_frame)
+app.run()
+"""
+
+
+def bench_startup(repeat=3):
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "offscreen")
+    env.setdefault("KIVY_NO_ARGS", "1")
+    env.setdefault("KIVY_NO_CONSOLELOG", "1")
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT], env=env, capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True,
+        ).stdout
+        elapsed = float(out.split()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return [result("startup/first-frame", best, "ms", False)]
+
+
+# ----------------------------------
+# 기준값 비교
+# ----------------------------------
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {r["name"]: r for r in json.load(f)["results"]}
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    [(이름, 기준값, 측정값, 변화율, 나빠졌는지)] - 변화율 > 0 이면 좋아진 것.
+    기준값에 없는 항목은 빠진다.
+    """
+    rows = []
+    for r in results:
+        base = baseline.get(r["name"])
+        if base is None or not base["value"]:
+            continue
+        if r["higher_is_better"]:
+            change = r["value"] / base["value"] - 1
+        else:
+            change = base["value"] / r["value"] - 1 if r["value"] else 0.0
+        rows.append((r["name"], base["value"], r["value"], change, change < -tolerance))
+    return rows
+
+
+def run(sections=SECTIONS, sizes=DEFAULT_SIZES):
+    results = []
+    if "turns" in sections:
+        results += bench_turns(sizes)
+    if "battle" in sections:
+        results += bench_battle()
+    if "save" in sections:
+        results += bench_save(sizes)
+    if "ui" in sections:
+        results += bench_ui(sizes)
+    if "startup" in sections:
+        results += bench_startup()
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="한국지 벤치마크")
+    parser.add_argument("--only", default=",".join(SECTIONS), help="측정할 항목 (쉼표 구분)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="지도 크기들")
+    parser.add_argument("--json", help="결과 JSON 을 저장할 경로")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    sections = [s for s in args.only.split(",") if s]
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"알 수 없는 항목: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    results = run(sections, sizes)
+    report = {"python": sys.version.split()[0], "results": results}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(text)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        return 0
+
+    regressions = 0
+    for name, base, value, change, regressed in compare(results, load_baseline(args.baseline),
+                                                         args.tolerance):
+        mark = "  <-- 느려짐" if regressed else ""
+        print(f"{name:50s} {base:14.2f} -> {value:14.2f} ({change:+.1%}){mark}", file=sys.stderr)
+        regressions += regressed
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
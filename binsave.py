@@ -0,0 +1,394 @@
+"""
+바이너리 세이브 형식 (.hgjb)
+
+savefile.json 과 같은 내용을 고정 길이 레코드로 저장한다. (모든 값 little-endian)
+
+  헤더 (64 바이트)
+    magic "HGJB", version u16, header_size u16,
+    region_count u32, owner_count u32, turn i64,
+    player_owner_id u32, player_region_index u32,
+    owners_offset u64, names_offset u64, records_offset u64,
+    save_id 8 바이트,
+    flags u32 (1 = seed 있음, 2 = 결정적 모드), 패딩 4, seed i64          (version 2 부터, version 1 헤더는 64 바이트)
+    map_offset u64, map_size u32, 패딩 4                                  (version 3 부터)
+  소유자 이름 표 (중복 없이 한 번씩만 저장, 레코드는 번호로 참조)
+  지역 이름 표
+  지도 출처 (GameState.map_source 의 UTF-8 JSON, 기본 지도면 map_size 0)
+  지역 레코드 (지역 하나당 64 바이트: owner_id u32, 패딩 4, gold/food/population/agri/commerce/security/army i64)
+
+문자열 표는 count u32, (count + 1) 개의 u32 오프셋, UTF-8 바이트 순서다.
+없는 값(소유자 None 등)은 NONE_ID (0xFFFFFFFF) 로 표시한다.
+
+BinarySave.open() 은 파일을 mmap 하고 헤더만 읽는다. 지역은 region() / regions 로
+접근할 때 그 레코드만 풀어서 Region 으로 만든다.
+
+    python binsave.py to-bin savefile.json savefile.hgjb
+    python binsave.py to-json savefile.hgjb savefile.json
+    python binsave.py verify savefile.json     (JSON -> 바이너리 -> JSON 왕복 비교)
+"""
+import json
+import mmap
+import struct
+import sys
+from collections.abc import Mapping
+
+from engine import REGION_FIELDS, GameState, Region
+
+MAGIC = b"HGJB"
+VERSION = 3
+NONE_ID = 0xFFFFFFFF
+
+HEADER = struct.Struct("<4sHHIIqIIQQQ8s")
+# version 2 에서 HEADER 뒤에 붙은 부분: flags, seed
+HEADER_EXT = struct.Struct("<I4xq")
+# version 3 에서 그 뒤에 붙은 부분: 지도 출처 위치 / 길이
+HEADER_MAP = struct.Struct("<QI4x")
+HEADER_SIZE = HEADER.size + HEADER_EXT.size + HEADER_MAP.size
+FLAG_SEED = 1
+FLAG_DETERMINISTIC = 2
+RECORD = struct.Struct("<I4x7q")
+U32 = struct.Struct("<I")
+
+
+def is_binary_save(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+# ----------------------------------
+# 쓰기
+# ----------------------------------
+def _pack_strings(strings):
+    blobs = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for b in blobs:
+        offsets.append(offsets[-1] + len(b))
+    return struct.pack(f"<I{len(offsets)}I", len(strings), *offsets) + b"".join(blobs)
+
+
+def dumps(data):
+    """savefile.json 형식 dict -> 바이너리 bytes (data["save_id"] 는 16 자리 hex 문자열)"""
+    regions = data["regions"]
+    names = list(regions)
+
+    owner_ids = {}
+    owners = []
+
+    def owner_id(owner):
+        if owner is None:
+            return NONE_ID
+        i = owner_ids.get(owner)
+        if i is None:
+            i = owner_ids[owner] = len(owners)
+            owners.append(owner)
+        return i
+
+    records = bytearray(RECORD.size * len(names))
+    for i, name in enumerate(names):
+        r_data = regions[name]
+        try:
+            RECORD.pack_into(records, i * RECORD.size, owner_id(r_data["owner"]),
+                             *[r_data[field] for field in REGION_FIELDS])
+        except struct.error:
+            raise ValueError(f"{name}: 값이 64비트 정수 범위를 넘어 바이너리로 저장할 수 없습니다")
+
+    player_owner = owner_id(data["player_name"])
+    player_region = data["player_region_name"]
+    player_index = names.index(player_region) if player_region in regions else NONE_ID
+
+    owners_blob = _pack_strings(owners)
+    names_blob = _pack_strings(names)
+    map_source = data.get("map")
+    map_blob = b"" if map_source is None else json.dumps(map_source, ensure_ascii=False).encode("utf-8")
+    owners_offset = HEADER_SIZE
+    names_offset = owners_offset + len(owners_blob)
+    map_offset = names_offset + len(names_blob)
+    records_offset = map_offset + len(map_blob)
+    # 레코드는 8 바이트 정렬
+    padding = -records_offset % 8
+    records_offset += padding
+
+    seed = data.get("seed")
+    flags = 0
+    if seed is not None:
+        if not isinstance(seed, int) or not -2 ** 63 <= seed < 2 ** 63:
+            raise ValueError(f"seed 가 64비트 정수가 아니라 바이너리로 저장할 수 없습니다: {seed!r}")
+        flags |= FLAG_SEED
+    if data.get("deterministic"):
+        flags |= FLAG_DETERMINISTIC
+
+    header = HEADER.pack(
+        MAGIC, VERSION, HEADER_SIZE, len(names), len(owners), data.get("turn", 0),
+        player_owner, player_index, owners_offset, names_offset, records_offset,
+        bytes.fromhex(data.get("save_id") or "").ljust(8, b"\0"),
+    ) + HEADER_EXT.pack(flags, seed or 0) + HEADER_MAP.pack(map_offset, len(map_blob))
+    return b"".join([header, owners_blob, names_blob, map_blob, b"\0" * padding, bytes(records)])
+
+
+def write_binary(path, data):
+    from savegame import write_atomic
+    write_atomic(path, dumps(data))
+
+
+# ----------------------------------
+# 읽기
+# ----------------------------------
+class _StringTable:
+    """필요한 문자열만 디코드하는 문자열 표"""
+
+    def __init__(self, buf, offset):
+        self.buf = buf
+        (self.count,) = U32.unpack_from(buf, offset)
+        self.offsets_at = offset + 4
+        self.blob_at = self.offsets_at + 4 * (self.count + 1)
+        self._cache = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        s = self._cache.get(i)
+        if s is None:
+            start, end = struct.unpack_from("<II", self.buf, self.offsets_at + 4 * i)
+            s = self._cache[i] = str(self.buf[self.blob_at + start:self.blob_at + end], "utf-8")
+        return s
+
+    def all(self):
+        """전체 문자열 (오프셋 배열과 바이트 영역을 한 번에 읽어 디코드)"""
+        offsets = struct.unpack_from(f"<{self.count + 1}I", self.buf, self.offsets_at)
+        blob = bytes(self.buf[self.blob_at:self.blob_at + offsets[-1]])
+        return [str(blob[offsets[i]:offsets[i + 1]], "utf-8") for i in range(self.count)]
+
+
+class BinarySave:
+    """mmap 된 바이너리 세이브. 헤더만 읽어 두고 지역은 접근할 때 푼다."""
+
+    def __init__(self, buf, file=None):
+        self.buf = buf
+        self._file = file
+        (magic, version, header_size, self.region_count, owner_count, self.turn,
+         player_owner, player_index, owners_offset, names_offset, self.records_offset,
+         save_id) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("바이너리 세이브 파일이 아닙니다")
+        if version > VERSION:
+            raise ValueError(f"지원하지 않는 세이브 버전: {version}")
+        flags, seed = HEADER_EXT.unpack_from(buf, HEADER.size) if version >= 2 else (0, 0)
+        self.seed = seed if flags & FLAG_SEED else None
+        self.deterministic = bool(flags & FLAG_DETERMINISTIC)
+        map_offset, map_size = (
+            HEADER_MAP.unpack_from(buf, HEADER.size + HEADER_EXT.size) if version >= 3 else (0, 0)
+        )
+        self.map_source = json.loads(bytes(buf[map_offset:map_offset + map_size])) if map_size else None
+
+        # savegame 의 delta 파일과 짝을 맞추는 저장 번호 (16 자리 hex, 없으면 None)
+        self.save_id = save_id.hex() if save_id.strip(b"\0") else None
+        self.owners = _StringTable(buf, owners_offset)
+        self.names = _StringTable(buf, names_offset)
+        self.player_name = None if player_owner == NONE_ID else self.owners[player_owner]
+        self.player_region_name = None if player_index == NONE_ID else self.names[player_index]
+        self._index = None
+        self.regions = LazyRegions(self)
+
+    @classmethod
+    def open(cls, path):
+        f = open(path, "rb")
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            f.close()
+            raise
+        return cls(buf, f)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(memoryview(data))
+
+    def close(self):
+        if self._file is not None:
+            self.buf.close()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.region_count
+
+    def index_of(self, name):
+        """지역 이름 -> 레코드 번호 (처음 호출할 때 이름 표로 색인 생성)"""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.names.all())}
+        return self._index[name]
+
+    def record(self, i):
+        """(owner, gold, food, population, agri, commerce, security, army)"""
+        owner_id, *values = RECORD.unpack_from(self.buf, self.records_offset + i * RECORD.size)
+        owner = None if owner_id == NONE_ID else self.owners[owner_id]
+        return owner, values
+
+    def region_at(self, i):
+        owner, values = self.record(i)
+        r_obj = Region(self.names[i], owner)
+        for field, value in zip(REGION_FIELDS, values):
+            setattr(r_obj, field, value)
+        return r_obj
+
+    def region(self, name):
+        return self.region_at(self.index_of(name))
+
+    def iter_records(self):
+        """(이름, owner, 값 리스트) 를 레코드 순서대로 (레코드 영역을 한 번에 풀어냄)"""
+        end = self.records_offset + self.region_count * RECORD.size
+        owners = self.owners.all()
+        names = self.names.all()
+        for i, (owner_id, *values) in enumerate(RECORD.iter_unpack(self.buf[self.records_offset:end])):
+            yield names[i], (None if owner_id == NONE_ID else owners[owner_id]), values
+
+    def to_dict(self):
+        data = {
+            "player_name": self.player_name,
+            "player_region_name": self.player_region_name,
+            "turn": self.turn,
+            "regions": {},
+        }
+        if self.seed is not None:
+            data["seed"] = self.seed
+        if self.deterministic:
+            data["deterministic"] = True
+        if self.map_source is not None:
+            data["map"] = self.map_source
+        if self.save_id is not None:
+            data["save_id"] = self.save_id
+        for name, owner, values in self.iter_records():
+            r_data = {"owner": owner}
+            r_data.update(zip(REGION_FIELDS, values))
+            data["regions"][name] = r_data
+        return data
+
+    def to_state(self, rng=None, adjacency=None, header=None, changed=None):
+        """
+        모든 지역을 Region 으로 풀어 GameState 생성 (adjacency 를 주지 않으면 map_source 의 지도).
+        header ({"player_name", "player_region_name", "turn"}) / changed (지역 이름 -> savefile.json 의
+        지역 값) 를 주면 그 값으로 덮어쓴다 (savegame 의 delta 적용).
+        """
+        header = header or {}
+        state = GameState(header.get("player_name", self.player_name),
+                          header.get("player_region_name", self.player_region_name),
+                          rng=rng, adjacency=adjacency, seed=self.seed, deterministic=self.deterministic,
+                          map_source=self.map_source)
+        state.turn = header.get("turn", self.turn)
+        state.reseed()
+        for name, owner, values in self.iter_records():
+            if changed and name in changed:
+                r_data = changed[name]
+                owner = r_data["owner"]
+                values = [r_data[field] for field in REGION_FIELDS]
+            r_obj = Region(name, owner)
+            for field, value in zip(REGION_FIELDS, values):
+                setattr(r_obj, field, value)
+            state.regions[name] = r_obj
+        state.touch_all()
+        return state
+
+
+class LazyRegions(Mapping):
+    """name -> Region. 접근한 지역만 레코드에서 풀어 캐시한다."""
+
+    def __init__(self, save):
+        self._save = save
+        self._hydrated = {}
+
+    def __getitem__(self, name):
+        r_obj = self._hydrated.get(name)
+        if r_obj is None:
+            r_obj = self._hydrated[name] = self._save.region(name)
+        return r_obj
+
+    def __contains__(self, name):
+        try:
+            self._save.index_of(name)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self._save.names.all())
+
+    def __len__(self):
+        return len(self._save)
+
+
+# ----------------------------------
+# JSON <-> 바이너리 변환
+# ----------------------------------
+def json_to_binary(json_path, bin_path):
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    write_binary(bin_path, data)
+
+
+def binary_to_json(bin_path, json_path):
+    from savegame import write_atomic
+    with BinarySave.open(bin_path) as save:
+        data = save.to_dict()
+    write_atomic(json_path, json.dumps(data, ensure_ascii=False, indent=2))
+
+
+def check_parity(json_path):
+    """
+    JSON 세이브를 바이너리로 바꿨다가 다시 읽어 같은지 확인.
+    다른 항목 설명 리스트를 반환 (비어 있으면 동일).
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    save = BinarySave.from_bytes(dumps(data))
+    problems = []
+
+    back = save.to_dict()
+    for key in ("player_name", "player_region_name"):
+        if back[key] != data[key]:
+            problems.append(f"{key}: {data[key]!r} != {back[key]!r}")
+    for key, default in (("turn", 0), ("seed", None), ("deterministic", None), ("map", None)):
+        if back.get(key) != data.get(key, default):
+            problems.append(f"{key}: {data.get(key, default)!r} != {back.get(key)!r}")
+    if list(back["regions"]) != list(data["regions"]):
+        problems.append("지역 순서가 다릅니다")
+    for name, r_data in data["regions"].items():
+        expected = {"owner": r_data["owner"], **{field: r_data[field] for field in REGION_FIELDS}}
+        if back["regions"].get(name) != expected:
+            problems.append(f"{name}: {expected} != {back['regions'].get(name)}")
+        # 지연 로딩 경로도 같은 값을 주는지
+        r_obj = save.regions[name]
+        if {"owner": r_obj.owner, **{field: getattr(r_obj, field) for field in REGION_FIELDS}} != expected:
+            problems.append(f"{name}: 지연 로딩 값이 다릅니다")
+
+    state_json = GameState.from_dict(data).to_dict()
+    if save.to_state().to_dict() != state_json:
+        problems.append("GameState 변환 결과가 다릅니다")
+    return problems
+
+
+def main(argv):
+    if len(argv) == 3 and argv[0] == "to-bin":
+        json_to_binary(argv[1], argv[2])
+    elif len(argv) == 3 and argv[0] == "to-json":
+        binary_to_json(argv[1], argv[2])
+    elif len(argv) == 2 and argv[0] == "verify":
+        problems = check_parity(argv[1])
+        for problem in problems:
+            print(problem)
+        print("일치" if not problems else f"불일치 {len(problems)}건")
+        return 1 if problems else 0
+    else:
+        print(__doc__)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
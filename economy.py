@@ -0,0 +1,141 @@
+"""
+구조체 배열(struct-of-arrays) 경제 엔진
+
+지역마다 Region 객체를 두는 대신 필드별 NumPy 배열(지역 1개당 슬롯 1개)에
+자원/능력치를 저장하고, Region.next_turn 과 같은 경제 틱을 벡터 연산 몇 번으로 처리한다.
+정수 결과는 Region.next_turn 과 비트 단위로 같다
+(float64 곱셈 순서와 int() 의 0 방향 절삭을 그대로 따른다).
+
+값은 int64 로 저장하므로 2**53 을 넘는 자원량에서는 float 변환 정밀도 때문에,
+2**63 을 넘으면 오버플로 때문에 파이썬 int 와 결과가 달라질 수 있다.
+"""
+import numpy as np
+
+import engine
+from engine import REGION_FIELDS, Region
+
+
+class EconomyArrays:
+    """
+    지역 자원을 필드별 배열로 보관하는 상태 저장소.
+    names[i] 지역의 값은 gold[i], food[i], ... 에 있다.
+    """
+    FIELDS = REGION_FIELDS
+
+    def __init__(self, names, owners=None):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+        self.owners = list(owners) if owners is not None else [None] * n
+
+        # Region.__init__ 과 같은 초기값
+        self.gold = np.full(n, 1000, dtype=np.int64)
+        self.food = np.full(n, 3000, dtype=np.int64)
+        self.population = np.full(n, 1000, dtype=np.int64)
+        self.agri = np.zeros(n, dtype=np.int64)
+        self.commerce = np.zeros(n, dtype=np.int64)
+        self.security = np.zeros(n, dtype=np.int64)
+        self.army = np.zeros(n, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+    # ----------------------------------
+    # Region 객체와 변환
+    # ----------------------------------
+    @classmethod
+    def from_regions(cls, regions):
+        """name -> Region dict (GameState.regions) 로부터 생성"""
+        region_list = list(regions.values())
+        arrays = cls([r.name for r in region_list], [r.owner for r in region_list])
+        for field in cls.FIELDS:
+            getattr(arrays, field)[:] = [getattr(r, field) for r in region_list]
+        return arrays
+
+    def write_back(self, regions):
+        """배열 값을 name -> Region dict 에 다시 기록"""
+        columns = [getattr(self, field).tolist() for field in self.FIELDS]
+        for i, name in enumerate(self.names):
+            r_obj = regions.get(name)
+            if r_obj is None:
+                r_obj = regions[name] = Region(name)
+            r_obj.owner = self.owners[i]
+            for field, column in zip(self.FIELDS, columns):
+                setattr(r_obj, field, column[i])
+
+    def to_regions(self):
+        regions = {}
+        self.write_back(regions)
+        return regions
+
+    # ----------------------------------
+    # 경제 틱
+    # ----------------------------------
+    def next_turn(self):
+        """모든 지역에 Region.next_turn 을 한 번 적용한 것과 같은 결과"""
+        # 턴이 끝날 때마다 자원 증가
+        self.gold += 100
+        self.food += 300
+        self.population += 100
+
+        # 능력치 효과: int(값 * 비율 * 능력치), 능력치 > 0 인 지역만
+        self.food += _growth(self.food, engine.AGRI_RATE, self.agri)
+        self.gold += _growth(self.gold, engine.COMMERCE_RATE, self.commerce)
+        self.population += _growth(self.population, engine.SECURITY_RATE, self.security)
+
+        # 병사 유지비 (army // 10, 모자라면 식량 0)
+        food_cost = np.where(self.army > 0, self.army // 10, 0)
+        np.subtract(self.food, food_cost, out=self.food)
+        np.maximum(self.food, 0, out=self.food)
+
+    def fast_forward(self, n):
+        """
+        next_turn() 을 최대 n 번. 다음 틱에서 값이 2**53 을 넘을 수 있으면 (float 변환이 정확하지 않음)
+        거기서 멈추고 실제로 진행한 턴 수를 돌려준다. 남은 턴은 Region.fast_forward 로 이어서 계산한다.
+        """
+        if not len(self.names) or n <= 0:
+            return 0
+        # 한 턴 성장 배율의 상한 (능력치는 틱 동안 바뀌지 않음)
+        factor = 1 + max(
+            engine.AGRI_RATE * int(self.agri.max()), engine.COMMERCE_RATE * int(self.commerce.max()),
+            engine.SECURITY_RATE * int(self.security.max()), 0,
+        )
+        limit = int(2 ** 53 / factor) - 300
+        done = 0
+        while done < n:
+            top = max(int(self.gold.max()), int(self.food.max()), int(self.population.max()))
+            if top >= limit:
+                break
+            self.next_turn()
+            done += 1
+        return done
+
+    # ----------------------------------
+    # 지역 단위 명령 (Region 메서드와 같은 규칙)
+    # ----------------------------------
+    def invest(self, name, kind):
+        i = self.index[name]
+        if self.gold[i] >= engine.INVEST_COST:
+            self.gold[i] -= engine.INVEST_COST
+            getattr(self, kind)[i] += 1
+            return True
+        return False
+
+    def recruit(self, name, amount):
+        i = self.index[name]
+        cost_food = amount * engine.RECRUIT_FOOD_COST
+        if self.food[i] >= cost_food and self.population[i] >= amount:
+            self.food[i] -= cost_food
+            self.population[i] -= amount
+            self.army[i] += amount
+            return True
+        return False
+
+
+def _growth(values, rate, level):
+    """Region.next_turn 의 int(value * rate * level) 를 배열로 계산 (level <= 0 이면 0)"""
+    grown = values.astype(np.float64)
+    grown *= rate
+    grown *= level
+    np.trunc(grown, out=grown)
+    return np.where(level > 0, grown.astype(np.int64), 0)
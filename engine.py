@@ -0,0 +1,1229 @@
+"""
+한국지 게임 엔진 (UI 없음)
+
+Kivy 없이 import 할 수 있는 게임 규칙 / 상태 모듈.
+hgj.py 의 Kivy 화면들은 여기의 GameState 를 호출하기만 한다.
+배치 시뮬레이션이나 테스트에서는 GameState 를 직접 만들어 step() 을 반복 호출하면 된다.
+"""
+import hashlib
+import math
+import random
+from contextlib import contextmanager, nullcontext
+
+import ai
+from graph import OFF_MAP, FrontierCache, RouteCache, compile_graph
+
+#
+# 간단히 지역 간 인접 관계 정의 (이전과 동일)
+#
+REGION_ADJACENCY = {
+    "평안북도": ["함경북도", "평안남도"],
+    "함경북도": ["평안북도", "함경남도"],
+    "평안남도": ["평안북도", "함경남도", "황해도"],
+    "함경남도": ["함경북도", "평안남도"],
+    "황해도": ["평안남도", "강원도"],
+    "강원도": ["황해도", "경기도"],
+    "경기도": ["강원도", "충청북도"],
+    "충청북도": ["경기도", "충청남도"],
+    "충청남도": ["충청북도", "경상북도"],
+    "경상북도": ["충청남도", "경상남도"],
+    "경상남도": ["경상북도", "전라북도"],
+    "전라북도": ["경상남도", "전라남도"],
+    "전라남도": ["전라북도", "제주도"],
+    "제주도": ["전라남도"]
+}
+
+# 화면 / 초기 생성에 쓰이는 지역 순서
+REGION_NAMES = [
+    "평안북도", "평안남도", "함경북도", "함경남도", "황해도",
+    "강원도", "경기도", "경상남도", "경상북도", "전라남도",
+    "전라북도", "충청북도", "충청남도", "제주도"
+]
+
+AI_NAMES = [
+    "김유진", "김유정", "김선유", "김민유", "이동호",
+    "이병호", "김윤희", "신문주", "신선우", "김혜정",
+    "김권성", "김경남", "김민주"
+]
+
+# 저장 파일에 기록되는 지역 필드 (owner 제외)
+REGION_FIELDS = ("gold", "food", "population", "agri", "commerce", "security", "army")
+
+# 밸런스 상수 (tournament.py 의 매개변수 탐색에서 set_balance 로 바꿔 가며 시험)
+AGRI_RATE = 0.003      # 농업 1 당 식량 성장률
+COMMERCE_RATE = 0.002  # 상업 1 당 금 성장률
+SECURITY_RATE = 0.01   # 치안 1 당 인구 성장률
+INVEST_COST = 100      # 투자 한 번에 드는 금
+ATTACK_FACTOR = 20     # 병사 1 명 공격력
+HP_FACTOR = 30         # 병사 1 명 체력
+
+BALANCE_DEFAULTS = {
+    "agri_rate": AGRI_RATE, "commerce_rate": COMMERCE_RATE, "security_rate": SECURITY_RATE,
+    "invest_cost": INVEST_COST, "attack_factor": ATTACK_FACTOR, "hp_factor": HP_FACTOR,
+}
+
+
+def balance():
+    """지금 쓰고 있는 밸런스 상수 {"agri_rate": ..., ...}"""
+    return {name: globals()[name.upper()] for name in BALANCE_DEFAULTS}
+
+
+def set_balance(**values):
+    """
+    밸런스 상수 변경 (이 프로세스 전체에 적용, economy / battle / planner 도 같은 값을 씀).
+    바꾸기 전 값 dict 를 돌려주므로 set_balance(**previous) 로 되돌릴 수 있다.
+    """
+    unknown = set(values) - set(BALANCE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"알 수 없는 밸런스 상수: {', '.join(sorted(unknown))}")
+    previous = balance()
+    for name, value in values.items():
+        globals()[name.upper()] = value
+    return previous
+
+# ----------------------
+# 지역(Region) 클래스
+# ----------------------
+class Region:
+    # 큰 지도에서는 지역 수만큼 인스턴스가 생기므로 __dict__ 없이 고정 속성만 둔다
+    __slots__ = ("name", "owner") + REGION_FIELDS
+
+    def __init__(self, name, owner=None):
+        self.name = name
+        self.owner = owner  # 소유자 (플레이어명 또는 AI명)
+
+        # 자원
+        self.gold = 1000
+        self.food = 3000
+        self.population = 1000
+
+        # 능력치
+        self.agri = 0      # 농업
+        self.commerce = 0  # 상업
+        self.security = 0  # 치안
+
+        # 병력(명 수)
+        self.army = 0
+
+    def copy(self):
+        """같은 값을 가진 새 Region"""
+        return copy_regions({self.name: self})[self.name]
+
+    def invest_agri(self):
+        if self.gold >= INVEST_COST:
+            self.gold -= INVEST_COST
+            self.agri += 1
+
+    def invest_commerce(self):
+        if self.gold >= INVEST_COST:
+            self.gold -= INVEST_COST
+            self.commerce += 1
+
+    def invest_security(self):
+        if self.gold >= INVEST_COST:
+            self.gold -= INVEST_COST
+            self.security += 1
+
+    def recruit_army(self, amount):
+        # 병사 1명당 식량 RECRUIT_FOOD_COST 소모, 인구 1 감소
+        cost_food = amount * RECRUIT_FOOD_COST
+        if self.food >= cost_food and self.population >= amount:
+            self.food -= cost_food
+            self.population -= amount
+            self.army += amount
+
+    def next_turn(self):
+        # 턴이 끝날 때마다 자원 증가
+        self.gold += 100
+        self.food += 300
+        self.population += 100
+
+        # 능력치 효과 (기본값은 질문 예시대로 0.003 / 0.002 / 0.01)
+        if self.agri > 0:
+            self.food += int(self.food * AGRI_RATE * self.agri)
+        if self.commerce > 0:
+            self.gold += int(self.gold * COMMERCE_RATE * self.commerce)
+        if self.security > 0:
+            self.population += int(self.population * SECURITY_RATE * self.security)
+
+        # 병사 유지비
+        if self.army > 0:
+            food_cost = self.army // 10
+            if self.food >= food_cost:
+                self.food -= food_cost
+            else:
+                self.food = 0
+
+    def fast_forward(self, n):
+        """
+        next_turn() 을 n 번 부른 것과 같은 결과 (int() 절삭까지 동일).
+        금 / 식량 / 인구는 서로 영향을 주지 않으므로 각각 따로 계산한다.
+        성장이 없으면(능력치 0) 식 한 번, 성장분(절삭한 int 값)이 같은 턴들은 값이 매 턴 같은 만큼
+        늘므로 몇 번의 확인으로 건너뛴다. 성장분이 몇 턴 만에 바뀌는 구간은 닫힌 식이 없어 (매 턴 절삭)
+        한 턴씩 계산하므로, 기본 밸런스처럼 성장률이 큰 지역은 여전히 n 에 비례하는 비용이 든다.
+        (성장분이 오래 그대로인 낮은 성장률 / 작은 값에서만 턴 수보다 훨씬 적게 계산함)
+        """
+        if n <= 0:
+            return
+        self.gold = _fast_forward_growth(self.gold, 100, COMMERCE_RATE, self.commerce, n)
+        self.population = _fast_forward_growth(self.population, 100, SECURITY_RATE, self.security, n)
+        self.food = _fast_forward_growth(self.food, 300, AGRI_RATE, self.agri, n,
+                                         self.army // 10 if self.army > 0 else None)
+
+
+# 성장분이 같은 턴들을 한 번에 건너뛰는 것은 한 턴 성장분의 변화(d * rate * level)가 이보다 작을 때만
+# (성장분이 1/BATCH_GROWTH_LIMIT 턴보다 자주 바뀌면 한 턴씩 계산하는 편이 빠름)
+BATCH_GROWTH_LIMIT = 0.25
+
+
+def _fast_forward_growth(x, income, rate, level, n, upkeep=None):
+    """
+    Region.next_turn 의 값 하나를 n 턴: y = x + income, level > 0 이면 y += int(y * rate * level),
+    upkeep 이 있으면 (식량의 병사 유지비) y >= upkeep 일 때 y - upkeep, 모자라면 0.
+    """
+    if level <= 0 or rate == 0:
+        if upkeep is None:
+            return x + income * n
+        drain = upkeep - income
+        if x + income < upkeep:
+            # 첫 턴에 유지비를 못 내서 0 (유지비가 수입보다 크면 그 뒤로도 계속 0)
+            x, n = 0, n - 1
+            if drain > 0:
+                return 0
+        if drain <= 0:
+            return x - drain * n
+        # 매 턴 drain 씩 줄다가 유지비를 못 내는 턴에 0 이 되고 그 뒤로는 계속 0
+        return x - drain * n if n <= x // drain else 0
+    c = rate * level
+    if c < 0:
+        return _step_growth(x, income, rate, level, n, upkeep)
+
+    while n > 0:
+        base = x + income
+        g = int(base * rate * level)
+        y = base + g
+        if upkeep is not None:
+            if y < upkeep:
+                x = 0
+                n -= 1
+                continue
+            y -= upkeep
+        d = y - x
+        if d <= 0:
+            # 줄거나 그대로인 턴은 하나씩
+            x = y
+            n -= 1
+            continue
+        if d * c >= BATCH_GROWTH_LIMIT:
+            # 성장분이 몇 턴 만에 바뀌고 d 는 점점 커지므로 (어림 / 확인 비용이 더 큼) 남은 턴은 한 턴씩
+            return _step_growth(y, income, rate, level, n - 1, upkeep)
+
+        # 성장분이 g 인 동안은 매 턴 d 씩 늘어난다. int(y * rate * level) 은 y 에 대해 단조이므로
+        # 성장분이 g 인 턴들은 앞쪽에 몰려 있음: 식으로 어림한 마지막 턴 k 를 실제 식으로 확인 / 보정
+        lo, hi = 1, n + 1  # k = lo 는 성장분 g, k = hi 는 아님 (n + 1 은 끝)
+        k = math.ceil(((g + 1) / c - base) / d)
+        if 1 < k <= n:
+            if int((base + (k - 1) * d) * rate * level) == g:
+                lo = k
+            else:
+                hi = k
+        step = 1
+        while lo + step < hi and int((base + (lo + step - 1) * d) * rate * level) == g:
+            lo += step
+            step *= 2
+        hi = min(hi, lo + step)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if int((base + (mid - 1) * d) * rate * level) == g:
+                lo = mid
+            else:
+                hi = mid
+        x += d * lo
+        n -= lo
+    return x
+
+
+def _step_growth(x, income, rate, level, n, upkeep):
+    """_fast_forward_growth 를 한 턴씩 (성장분이 매 턴 바뀌는 구간)"""
+    for _ in range(n):
+        x += income
+        x += int(x * rate * level)
+        if upkeep is not None:
+            x = x - upkeep if x >= upkeep else 0
+    return x
+
+
+class Checkpoint:
+    """GameState.checkpoint() 시점: 턴, 난수 상태, 그 뒤 처음 바뀐 지역들의 원래 값"""
+    __slots__ = ("turn", "rng_state", "saved")
+
+    def __init__(self, turn, rng_state):
+        self.turn = turn
+        self.rng_state = rng_state
+        self.saved = {}  # 지역 이름 -> Region 복사본
+
+
+# 한 번의 행군 명령으로 갈 수 있는 최대 턴(칸) 수
+MARCH_MAX_TURNS = 5
+
+# 대량 명령(GameState.orders)에서 "owner 의 모든 지역" / "그 지역에서 가능한 만큼"
+ALL_REGIONS = "*"
+MAX_AMOUNT = "max"
+# 병사 1 명당 식량 (Region.recruit_army)
+RECRUIT_FOOD_COST = 5
+
+# 이 수 이상의 지역을 한꺼번에 진행할 때는 NumPy 배열로 계산 (변환 비용이 반복보다 작아지는 크기)
+FAST_FORWARD_VECTOR_MIN = 256
+
+
+def _vector_safe(regions):
+    """EconomyArrays 가 Region.next_turn 과 같은 결과를 내는 범위인지 (식량 음수 / int64 밖 값은 제외)"""
+    for r_obj in regions:
+        if r_obj.food < 0:
+            return False
+        for field in REGION_FIELDS:
+            if not -2 ** 62 < getattr(r_obj, field) < 2 ** 62:
+                return False
+    return True
+
+
+# 결정적 모드에서 턴마다 상태 난수를 만드는 키 (ai.faction_rng 의 세력 자리, 세력 이름과 겹치지 않게)
+STATE_RNG_KEY = "#state"
+
+
+def region_digest(r_obj):
+    """
+    지역 하나(이름 / 소유자 / 모든 필드)의 64 비트 해시.
+    파이썬 hash() 는 프로세스마다 달라지므로 blake2b 로 기기 / 실행과 무관한 값을 만든다.
+    """
+    text = "\x1f".join([r_obj.name, str(r_obj.owner)] + [str(getattr(r_obj, f)) for f in REGION_FIELDS])
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def combine_digest(turn, region_xor):
+    """턴 번호 + 지역 해시 XOR -> 16 자리 hex 상태 해시"""
+    data = turn.to_bytes(8, "little", signed=True) + region_xor.to_bytes(8, "little")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def copy_regions(regions):
+    """
+    {이름: Region} 을 통째로 복사 (탐색 / what-if 시뮬레이션용).
+    __init__ 을 거치지 않고 슬롯에 바로 넣는다.
+    """
+    new = Region.__new__
+    copies = {}
+    for name, r_obj in regions.items():
+        c = new(Region)
+        c.name = name
+        c.owner = r_obj.owner
+        c.gold = r_obj.gold
+        c.food = r_obj.food
+        c.population = r_obj.population
+        c.agri = r_obj.agri
+        c.commerce = r_obj.commerce
+        c.security = r_obj.security
+        c.army = r_obj.army
+        copies[name] = c
+    return copies
+
+# ----------------------
+# 전투 로직 함수 (한 번의 교환으로 승패 결정)
+# ----------------------
+def do_battle_attack(attacker_soldiers, defender_soldiers):
+    if attacker_soldiers <= 0:
+        return 0, defender_soldiers
+    if defender_soldiers <= 0:
+        return attacker_soldiers, 0
+
+    atk_attack = attacker_soldiers * ATTACK_FACTOR
+    atk_hp = attacker_soldiers * HP_FACTOR
+
+    def_attack = defender_soldiers * ATTACK_FACTOR
+    def_hp = defender_soldiers * HP_FACTOR
+
+    # 공격군이 먼저 수비군 HP를 깎음
+    old_def_hp = def_hp
+    def_hp -= atk_attack
+    if def_hp < 0:
+        def_hp = 0
+
+    lost_ratio_def = atk_attack / old_def_hp if old_def_hp > 0 else 1.0
+    lost_soldiers_def = int(defender_soldiers * lost_ratio_def)
+    defender_after = defender_soldiers - lost_soldiers_def
+    if defender_after < 0:
+        defender_after = 0
+
+    # 수비군이 생존했다면 반격
+    if defender_after > 0:
+        old_atk_hp = atk_hp
+        atk_hp -= def_attack
+        if atk_hp < 0:
+            atk_hp = 0
+
+        lost_ratio_atk = def_attack / old_atk_hp if old_atk_hp > 0 else 1.0
+        lost_soldiers_atk = int(attacker_soldiers * lost_ratio_atk)
+        attacker_after = attacker_soldiers - lost_soldiers_atk
+        if attacker_after < 0:
+            attacker_after = 0
+    else:
+        attacker_after = attacker_soldiers
+
+    return attacker_after, defender_after
+
+# ----------------------
+# 게임 상태 (한 판 전체)
+# ----------------------
+class GameState:
+    """
+    한 판의 전체 상태와 명령(투자/모병/공격/턴 종료).
+    rng 를 넘기지 않으면 전역 random 모듈을 그대로 쓴다 (기존 동작과 동일).
+    seed 를 주면 AI 턴은 ai 모듈에서 세력별 난수로 계획되어 같은 seed 면 같은 결과가 나오고,
+    deterministic=True (seed 필요) 면 나머지 난수(시작 배치 / 공격 방식)도 rng 대신 (seed, 턴) 으로
+    턴마다 새로 만든 난수를 써서 같은 seed + 같은 명령이면 어느 기기에서든 같은 게임이 되고,
+    턴이 끝날 때마다 state_hash() 를 turn_hash 에 남긴다 (journal 의 step 기록에도 들어감).
+    (탐색 플래너 세력은 시간 예산으로 탐색하므로 Planner(iterations=...) 로 반복 수를 고정해야 한다)
+    ai_planners (세력 -> planner.Planner) 에 등록된 세력은 규칙 AI 대신 탐색 플래너로 움직인다.
+    (값이 None 인 세력은 턴 종료 때 아무것도 하지 않는다 - 탐색용 복제본에서 쓰임)
+    journal (journal.Journal) 을 붙이면 명령마다 실제 난수 결과와 함께 기록된다.
+    map_source 는 지도를 다시 만드는 방법(scenario.Scenario.source)으로, 세이브 / journal 에 "map" 으로
+    기록되어 불러올 때 같은 지도가 된다. (None 이면 기본 한반도, adjacency 를 주면 그것을 씀)
+    history (history.History) 를 붙이면 턴이 끝날 때마다 지역 값이 열 배열에 기록된다.
+
+    checkpoint() / rollback() 으로 여러 단계 되돌리기, preview() 로 미리보기를 할 수 있다.
+    체크포인트 뒤 처음 바뀌는 지역만 원래 값을 복사해 두므로 비용은 바뀐 지역 수에 비례한다.
+    (그래서 지역 값을 바꾸는 명령은 바꾸기 전에 prepare_write() 를 불러야 한다)
+
+    명령으로 값이 바뀐 지역 이름은 track_changes() 로 받은 집합들에 기록된다.
+    (화면 갱신, 부분 저장 등 소비자마다 자기 집합을 비우면서 쓴다)
+
+    소유자 -> 지역 색인과 세력별 합계(금/식량/병력), 세력별 전선(인접 적 지역)도
+    touch() 때마다 함께 갱신되므로, Region 값을 직접 바꿨다면 반드시 touch() 를 불러야 한다.
+    """
+    INVEST_KINDS = ("agri", "commerce", "security")
+
+    def __init__(self, player_name=None, player_region_name=None, rng=None, adjacency=None,
+                 seed=None, deterministic=False, map_source=None):
+        if deterministic and seed is None:
+            raise ValueError("결정적 모드에는 seed 가 필요합니다")
+        self.player_name = player_name
+        self.player_region_name = player_region_name
+        self.regions = {}  # 모든 지역 정보 (name -> Region)
+        self.map_source = map_source
+        if adjacency is None:
+            if map_source is None:
+                adjacency = REGION_ADJACENCY
+            else:
+                from scenario import map_adjacency
+                adjacency = map_adjacency(map_source)
+        self.adjacency = adjacency
+        self.graph = compile_graph(self.adjacency)
+        self.turn = 0
+        self.rng = rng if rng is not None else random
+        self.seed = seed
+        self.deterministic = deterministic
+        self.turn_hash = None  # 결정적 모드: 마지막 턴 종료 때의 state_hash()
+        self._hash_turns = deterministic  # 턴마다 turn_hash 를 남길지 (탐색용 복제본은 False)
+        self.ai_planners = {}
+        self.journal = None  # journal.Journal - 명령과 그 난수 결과를 기록 (없으면 기록 안 함)
+        self.profiler = None  # profiler.Profiler - 턴 종료 구간별 시간 측정 (복제본에는 안 붙음)
+        self.history = None  # history.History - 턴 종료마다 지역 값 기록 (복제본에는 안 붙음)
+        self._change_sets = []
+        self._undo = []  # Checkpoint 스택 (checkpoint / rollback)
+
+        # 소유자 색인: owner -> {지역 이름: Region}
+        self._owned = {}
+        # 소유자가 바뀌어 지역이 뒤에 덧붙은 세력 (조회할 때 지역 순서로 다시 정렬), 지역 이름 -> 지역 순서
+        self._unsorted = set()
+        self._region_order = {}
+        # 세력별 합계: owner -> [gold, food, army], 지역별 마지막 반영값: name -> (owner, gold, food, army)
+        self._totals = {}
+        self._counted = {}
+        # 세력별 전선 (graph.FrontierCache, touch_all() 에서 생성)
+        self._frontier = None
+        # 행군 거리 표 (graph.RouteCache, 처음 물어볼 때 생성 - 소유자가 바뀐 지역이 든 표만 버림)
+        self._routes = None
+        # 상태 해시: 지역 이름 -> region_digest (처음 state_hash() 때 생성), 그 XOR, 다시 해시할 지역
+        self._digests = None
+        self._digest_xor = 0
+        self._digest_dirty = set()
+        self.reseed()
+
+    @classmethod
+    def new_game(cls, player_name, player_region_name, region_names=None, rng=None, adjacency=None,
+                 seed=None, starts=None, deterministic=False, map_source=None):
+        """
+        초기 지역 생성 + 플레이어 지역 보너스 + 나머지 AI 배정.
+        starts: 지역 이름 -> 시작 값 {"owner": ..., "gold": ..., ...} (시나리오 파일에서 옴)
+        """
+        state = cls(player_name, player_region_name, rng=rng, adjacency=adjacency, seed=seed,
+                    deterministic=deterministic, map_source=map_source)
+        if region_names is None:
+            region_names = REGION_NAMES
+        ai_name_candidates = AI_NAMES[:]
+
+        for name in region_names:
+            state.regions[name] = Region(name, owner=None)
+        if starts:
+            for name, values in starts.items():
+                r_obj = state.regions[name]
+                for field, value in values.items():
+                    setattr(r_obj, field, value)
+
+        # 플레이어가 선택한 지역 소유자 = 플레이어 이름
+        if player_region_name:
+            r_obj = state.regions[player_region_name]
+            r_obj.owner = player_name
+            # 자원 보너스
+            r_obj.gold = 2000
+            r_obj.food = 5000
+            r_obj.population = 1500
+
+        # 나머지 지역은 랜덤 AI 이름 부여
+        for r_obj in state.regions.values():
+            if r_obj.owner is None:
+                if len(ai_name_candidates) == 0:
+                    ai_name_candidates = AI_NAMES[:]
+                r_obj.owner = state.rng.choice(ai_name_candidates)
+        state.touch_all()
+        # 시작 배치에 쓴 난수와 무관하게 0 턴 난수를 새로 (스냅샷에서 이어해도 같은 난수가 되도록)
+        state.reseed()
+        return state
+
+    # ----------------------------------
+    # 변경 추적
+    # ----------------------------------
+    def track_changes(self):
+        """이후 값이 바뀌는 지역 이름이 쌓이는 set 을 새로 만들어 반환"""
+        changed = set()
+        self._change_sets.append(changed)
+        return changed
+
+    def untrack_changes(self, changed):
+        self._change_sets = [s for s in self._change_sets if s is not changed]
+
+    def touch(self, *names):
+        """지역 값이 바뀌었음을 기록 (소유자 색인 / 세력 합계도 갱신)"""
+        for name in names:
+            self._reindex(name)
+        for changed in self._change_sets:
+            changed.update(names)
+        if self._digests is not None:
+            self._digest_dirty.update(names)
+
+    def touch_all(self):
+        """모든 지역이 바뀌었음을 기록 (색인 / 합계 / 전선을 처음부터 다시 계산 - 지역을 새로 채웠을 때)"""
+        self._owned = {}
+        self._totals = {}
+        self._counted = {}
+        self._unsorted = set()
+        self._region_order = {name: i for i, name in enumerate(self.regions)}
+        for name in self.regions:
+            self._reindex(name)
+        regions = self.regions
+        self._frontier = FrontierCache(self.graph, [
+            regions[name].owner if name in regions else OFF_MAP for name in self.graph.names
+        ])
+        self._routes = None
+        for changed in self._change_sets:
+            changed.update(self.regions)
+        if self._digests is not None:
+            self._digest_dirty.update(self.regions)
+
+    def touch_values(self):
+        """
+        모든 지역의 자원 값만 바뀌었음을 기록 (경제 틱 / AI 투자·모병처럼 소유자는 그대로일 때).
+        소유자 색인과 전선은 소유자가 바뀔 때 touch() 로만 갱신되므로 그대로 두고 세력 합계만 다시 더한다.
+        """
+        totals = {}
+        counted = self._counted
+        for owner, owned in self._owned.items():
+            gold = food = army = 0
+            for name, r_obj in owned.items():
+                g, f, a = r_obj.gold, r_obj.food, r_obj.army
+                gold += g
+                food += f
+                army += a
+                counted[name] = (owner, g, f, a)
+            totals[owner] = [gold, food, army]
+        self._totals = totals
+        for changed in self._change_sets:
+            changed.update(self.regions)
+        if self._digests is not None:
+            self._digest_dirty.update(self.regions)
+
+    def _reindex(self, name):
+        r_obj = self.regions[name]
+        counted = self._counted.get(name)
+        if counted is not None:
+            old_owner, gold, food, army = counted
+            totals = self._totals[old_owner]
+            totals[0] -= gold
+            totals[1] -= food
+            totals[2] -= army
+            if old_owner != r_obj.owner:
+                if name in self.graph.ids:
+                    i = self.graph.ids[name]
+                    if self._routes is not None:
+                        self._routes.owner_changed(i, old_owner, r_obj.owner)
+                    self._frontier.set_owner(i, r_obj.owner)
+                owned = self._owned[old_owner]
+                del owned[name]
+                if not owned:
+                    del self._owned[old_owner]
+                    del self._totals[old_owner]
+                    self._unsorted.discard(old_owner)
+                self._unsorted.add(r_obj.owner)
+
+        owner = r_obj.owner
+        self._owned.setdefault(owner, {})[name] = r_obj
+        totals = self._totals.setdefault(owner, [0, 0, 0])
+        totals[0] += r_obj.gold
+        totals[1] += r_obj.food
+        totals[2] += r_obj.army
+        self._counted[name] = (owner, r_obj.gold, r_obj.food, r_obj.army)
+
+    # ----------------------------------
+    # 결정적 모드 / 상태 해시
+    # ----------------------------------
+    def reseed(self):
+        """결정적 모드면 rng 를 (seed, 지금 턴) 으로 정해지는 새 난수로 바꿈 (아니면 아무것도 안 함)"""
+        if self.deterministic:
+            self.rng = ai.faction_rng(self.seed, self.turn, STATE_RNG_KEY)
+
+    def state_hash(self):
+        """
+        턴 + 모든 지역 값의 해시 (16 자리 hex). 같은 상태면 어느 기기 / 프로세스에서든 같은 값.
+        처음 한 번만 모든 지역을 해시하고, 그 뒤로는 touch() 된 지역만 다시 해시해서
+        지역 해시들의 XOR 을 갱신하므로 비용은 바뀐 지역 수에 비례한다.
+        """
+        digests = self._digests
+        if digests is None:
+            digests = self._digests = {}
+            self._digest_xor = 0
+            dirty = self.regions
+        else:
+            dirty = self._digest_dirty
+        regions = self.regions
+        xor = self._digest_xor
+        for name in dirty:
+            digest = region_digest(regions[name])
+            xor ^= digests.get(name, 0) ^ digest
+            digests[name] = digest
+        self._digest_xor = xor
+        self._digest_dirty = set()
+        return combine_digest(self.turn, xor)
+
+    def full_state_hash(self):
+        """state_hash() 와 같은 값을 캐시 없이 모든 지역으로 다시 계산 (검증용)"""
+        xor = 0
+        for r_obj in self.regions.values():
+            xor ^= region_digest(r_obj)
+        return combine_digest(self.turn, xor)
+
+    # ----------------------------------
+    # 되돌리기 / 미리보기
+    # ----------------------------------
+    @property
+    def undo_depth(self):
+        return len(self._undo)
+
+    def prepare_write(self, *names):
+        """지역 값을 바꾸기 직전에 부름: 마지막 체크포인트 뒤 처음 바뀌는 지역이면 지금 값을 복사해 둔다"""
+        if not self._undo:
+            return
+        saved = self._undo[-1].saved
+        regions = self.regions
+        for name in names:
+            if name not in saved:
+                saved[name] = regions[name].copy()
+
+    def checkpoint(self, limit=None):
+        """
+        되돌리기 지점을 쌓는다. limit 을 주면 가장 오래된 지점을 버려서 그 수를 넘지 않게 한다.
+        (맨 아래 지점은 아래에 합칠 곳이 없으므로 그냥 버리면 된다)
+        """
+        self._undo.append(Checkpoint(self.turn, self.rng.getstate()))
+        if limit is not None:
+            del self._undo[:-limit]
+        if self.journal is not None:
+            self.journal.record({"cmd": "checkpoint", "limit": limit})
+        return len(self._undo)
+
+    def rollback(self, levels=1):
+        """마지막 levels 개의 체크포인트 시점으로 되돌림 (지역 값 / 턴 / 난수 상태)"""
+        if not 0 < levels <= len(self._undo):
+            raise ValueError("되돌릴 체크포인트가 없습니다")
+        changed = set()
+        for _ in range(levels):
+            # 위 지점부터 차례로 되돌려야 아래 지점에 복사해 둔 더 오래된 값이 마지막에 남는다
+            cp = self._undo.pop()
+            for name, old in cp.saved.items():
+                r_obj = self.regions[name]
+                r_obj.owner = old.owner
+                for field in REGION_FIELDS:
+                    setattr(r_obj, field, getattr(old, field))
+            changed.update(cp.saved)
+            self.turn = cp.turn
+            self.rng.setstate(cp.rng_state)
+        self.touch(*changed)
+        if self.journal is not None:
+            self.journal.record({"cmd": "rollback", "levels": levels, "turn": self.turn})
+
+    def commit(self):
+        """체크포인트를 모두 버리고 지금 상태를 확정 (예: 턴 종료 전에 되돌리기 기록 비우기)"""
+        if not self._undo:
+            return
+        self._undo = []
+        if self.journal is not None:
+            self.journal.record({"cmd": "commit"})
+
+    @contextmanager
+    def preview(self):
+        """
+        with state.preview(): 안에서 한 명령은 블록이 끝나면 모두 되돌려진다.
+        journal 기록과 변경 추적 집합, history 에는 아무것도 남지 않는다.
+        난수 상태도 되돌리므로 미리본 명령을 그대로 다시 하면 같은 결과가 나온다.
+        """
+        journal, change_sets, history = self.journal, self._change_sets, self.history
+        self.journal, self._change_sets, self.history = None, [], None
+        depth = self.checkpoint()
+        try:
+            yield self
+        finally:
+            self.rollback(len(self._undo) - depth + 1)
+            self.journal, self._change_sets, self.history = journal, change_sets, history
+
+    # ----------------------------------
+    # 조회
+    # ----------------------------------
+    def owned_regions(self, owner):
+        """owner 가 소유한 지역 리스트 (지역 순서 - 소유자가 바뀐 순서와 무관해서 이어하기 후에도 같다)"""
+        return list(self._owned_in_order(owner).values())
+
+    def _owned_in_order(self, owner):
+        owned = self._owned.get(owner)
+        if owned is None:
+            return {}
+        if owner in self._unsorted:
+            self._unsorted.discard(owner)
+            order = self._region_order
+            owned = self._owned[owner] = dict(sorted(owned.items(), key=lambda item: order[item[0]]))
+        return owned
+
+    def rule_ai_factions(self):
+        """규칙 AI 로 움직이는 세력 (플레이어와 플래너 세력 제외)"""
+        return [
+            f for f in self._owned if f != self.player_name and f not in self.ai_planners
+        ]
+
+    def owns(self, owner, region_name):
+        return region_name in self._owned.get(owner, ())
+
+    def factions(self):
+        """지역을 하나 이상 가진 소유자 리스트"""
+        return list(self._owned)
+
+    def faction_summary(self, owner):
+        """owner 의 지역 수 / 금 / 식량 / 병력 합계"""
+        gold, food, army = self._totals.get(owner, (0, 0, 0))
+        return {
+            "regions": len(self._owned.get(owner, ())),
+            "gold": gold,
+            "food": food,
+            "army": army,
+        }
+
+    def enemy_neighbors(self, region_name):
+        """인접 지역 중 region_name 소유자가 아닌 지역 리스트 (인접 리스트 순서, 주인 없는 지역 포함)"""
+        graph = self.graph
+        i = graph.ids.get(region_name)
+        if i is None:
+            return []
+        owners = self._frontier.owners
+        owner = owners[i]
+        names = graph.names
+        return [
+            self.regions[names[j]] for j in graph.neighbors(i)
+            if owners[j] is not OFF_MAP and owners[j] != owner
+        ]
+
+    def frontier(self, owner):
+        """owner 지역에 인접한 적 지역 리스트 (전선 캐시에서 바로 읽음, 지역 ID 순서)"""
+        names = self.graph.names
+        return [self.regions[names[j]] for j in sorted(self._frontier.frontier(owner))]
+
+    def frontier_pairs(self, owner):
+        """(owner 의 지역, 그 지역에 인접한 적 지역) 쌍 리스트. 전선 크기에 비례하는 비용"""
+        graph = self.graph
+        owners = self._frontier.owners
+        names = graph.names
+        pairs = []
+        for j in sorted(self._frontier.frontier(owner)):
+            target = self.regions[names[j]]
+            for i in graph.incoming(j):
+                if owners[i] == owner:
+                    pairs.append((self.regions[names[i]], target))
+        return pairs
+
+    # ----------------------------------
+    # 행군 경로 (내 영토를 지나 먼 적 지역까지)
+    # ----------------------------------
+    def _route_table(self, region_name, turns):
+        if self._routes is None:
+            self._routes = RouteCache(self.graph, self._frontier.owners)
+        return self._routes.table(self.graph.ids[region_name], turns)
+
+    def reachable(self, region_name, turns, enemies_only=False):
+        """
+        region_name 의 군대가 turns 턴(한 턴에 한 칸) 안에 닿는 지역 -> 걸리는 턴 수 (가까운 순).
+        자기 세력 영토만 지나갈 수 있고, 적 지역은 도착지로만 센다. region_name 자신은 빠진다.
+        """
+        table = self._route_table(region_name, turns)
+        owners = self._frontier.owners
+        names = self.graph.names
+        owner = table.owner
+        return {
+            names[j]: table.dist[j] for j in table.within(turns)[1:]
+            if not enemies_only or owners[j] != owner
+        }
+
+    def march_path(self, region_name, target, max_turns=None):
+        """region_name -> target 최단 행군 경로 (지역 이름 리스트). 닿지 않으면 None"""
+        j = self.graph.ids.get(target)
+        if j is None:
+            return None
+        if max_turns is None:
+            max_turns = len(self.graph)
+        table = self._route_table(region_name, max_turns)
+        path = table.path(j)
+        if path is None or table.dist[j] > max_turns:
+            return None
+        names = self.graph.names
+        return [names[k] for k in path]
+
+    # ----------------------------------
+    # 명령
+    # ----------------------------------
+    def invest(self, region_name, kind):
+        """kind: agri / commerce / security. 투자 성공 여부 반환"""
+        if kind not in self.INVEST_KINDS:
+            raise ValueError(f"알 수 없는 투자 종류: {kind}")
+        r_obj = self.regions[region_name]
+        before = r_obj.gold
+        self.prepare_write(region_name)
+        getattr(r_obj, "invest_" + kind)()
+        ok = r_obj.gold != before
+        if ok:
+            self.touch(region_name)
+        if self.journal is not None:
+            self.journal.record({"cmd": "invest", "region": region_name, "kind": kind, "ok": ok})
+        return ok
+
+    def recruit(self, region_name, amount):
+        """모병 성공 여부 반환"""
+        r_obj = self.regions[region_name]
+        before = r_obj.army
+        self.prepare_write(region_name)
+        r_obj.recruit_army(amount)
+        ok = r_obj.army != before
+        if ok:
+            self.touch(region_name)
+        if self.journal is not None:
+            self.journal.record({"cmd": "recruit", "region": region_name, "amount": amount, "ok": ok})
+        return ok
+
+    def check_orders(self, owner, orders):
+        """
+        대량 명령을 지역별 남은 자원으로 한 번 훑어서 검사.
+        orders: [("invest", 지역, 종류, 횟수), ("recruit", 지역, 인원), ...]
+          지역이 ALL_REGIONS 면 owner 의 모든 지역, 횟수 / 인원이 MAX_AMOUNT 면 앞 명령을 뺀 남은 자원으로 가능한 만큼
+        반환: (지역 / 횟수를 풀어 쓴 명령 리스트, 자원이 모자란 명령 설명 리스트)
+        명령 형식이 잘못되었거나 owner 의 지역이 아니면 ValueError.
+        """
+        owned = self._owned.get(owner, {})
+        budgets = {}  # 지역 이름 -> [남은 금, 남은 식량, 남은 인구]
+        resolved = []
+        errors = []
+        for order in orders:
+            kind = order[0]
+            if kind == "invest" and len(order) == 4:
+                _, target, invest_kind, amount = order
+                if invest_kind not in self.INVEST_KINDS:
+                    raise ValueError(f"알 수 없는 투자 종류: {invest_kind}")
+            elif kind == "recruit" and len(order) == 3:
+                _, target, amount = order
+            else:
+                raise ValueError(f"알 수 없는 명령: {order}")
+            if amount != MAX_AMOUNT and (not isinstance(amount, int) or amount < 1):
+                raise ValueError(f"횟수 / 인원은 1 이상의 정수 또는 {MAX_AMOUNT} 이어야 합니다: {order}")
+            if target == ALL_REGIONS:
+                names = list(owned)
+            elif target in owned:
+                names = [target]
+            else:
+                raise ValueError(f"{owner} 의 지역이 아닙니다: {target}")
+
+            for name in names:
+                budget = budgets.get(name)
+                if budget is None:
+                    r_obj = owned[name]
+                    budget = budgets[name] = [r_obj.gold, r_obj.food, r_obj.population]
+                if kind == "invest":
+                    n = amount
+                    if n == MAX_AMOUNT:
+                        n = budget[0] // INVEST_COST if INVEST_COST > 0 else 0
+                    cost = n * INVEST_COST
+                    if cost > budget[0]:
+                        errors.append(f"{name}: 금 부족 (필요 {cost}, 남은 금 {budget[0]})")
+                        continue
+                    budget[0] -= cost
+                    order_out = ("invest", name, invest_kind, n)
+                else:
+                    n = amount
+                    if n == MAX_AMOUNT:
+                        n = min(budget[1] // RECRUIT_FOOD_COST, budget[2])
+                    cost = n * RECRUIT_FOOD_COST
+                    if cost > budget[1] or n > budget[2]:
+                        errors.append(f"{name}: 식량 / 인구 부족 (병사 {n}명에 식량 {cost}, 인구 {n} 필요)")
+                        continue
+                    budget[1] -= cost
+                    budget[2] -= n
+                    order_out = ("recruit", name, n)
+                if n > 0:
+                    resolved.append(order_out)
+        return resolved, errors
+
+    def orders(self, owner, orders):
+        """
+        대량 명령을 check_orders 로 검사한 뒤 모두 적용하거나 (하나라도 모자라면) 하나도 적용하지 않는다.
+        같은 투자 / 모병 명령을 횟수만큼 따로 부른 것과 결과가 같고, 바뀐 지역은 한 번에 touch 한다.
+        결과: {"result": "ok" / "rejected", "orders": 풀어 쓴 명령, "errors": [...],
+               "gold": 쓴 금, "food": 쓴 식량, "population": 줄어든 인구, "regions": 바뀐 지역 수}
+        journal 에는 풀어 쓴 명령이 기록되어 재생할 때 그대로 다시 적용된다.
+        """
+        resolved, errors = self.check_orders(owner, orders)
+        result = {"result": "rejected" if errors else "ok", "orders": resolved, "errors": errors,
+                  "gold": 0, "food": 0, "population": 0, "regions": 0}
+        if not errors and resolved:
+            names = {order[1] for order in resolved}
+            self.prepare_write(*names)
+            regions = self.regions
+            for order in resolved:
+                r_obj = regions[order[1]]
+                if order[0] == "invest":
+                    _, _, invest_kind, n = order
+                    r_obj.gold -= n * INVEST_COST
+                    setattr(r_obj, invest_kind, getattr(r_obj, invest_kind) + n)
+                    result["gold"] += n * INVEST_COST
+                else:
+                    n = order[2]
+                    r_obj.food -= n * RECRUIT_FOOD_COST
+                    r_obj.population -= n
+                    r_obj.army += n
+                    result["food"] += n * RECRUIT_FOOD_COST
+                    result["population"] += n
+            self.touch(*names)
+            result["regions"] = len(names)
+        if self.journal is not None:
+            self.journal.record({"cmd": "orders", "owner": owner, "orders": resolved,
+                                 "result": result["result"]})
+        return result
+
+    def attack(self, region_name, mode=None, target=None):
+        """
+        region_name 에서 인접 적 지역 하나를 공격.
+        target 이 None 이면 첫 번째 인접 적 지역, mode 가 None 이면 점령/약탈을 무작위로 고른다.
+        결과는 dict 로 반환 ("result": no_enemy / no_army / occupy / plunder / fail)
+        journal 에는 실제로 고른 target / mode 와 결과가 기록된다.
+        """
+        result = self._attack(region_name, mode, target)
+        if self.journal is not None:
+            self.journal.record({
+                "cmd": "attack", "region": region_name, "target": result.get("target", target),
+                "mode": result.get("mode", mode), "result": result["result"],
+            })
+        return result
+
+    def march(self, region_name, target, mode=None, max_turns=MARCH_MAX_TURNS):
+        """
+        region_name 의 군대 전체가 내 영토를 지나 target 까지 가서 공격 (한 칸 = 행군 한 턴).
+        행군은 바로 처리하되 target 바로 앞 내 지역까지 가는 칸 수만큼 병사 유지비(병력 // 10)를
+        출발 지역 식량에서 미리 낸다. 그 지역 병력과 합쳐서 attack() 과 같은 규칙으로 싸운다.
+        결과는 attack() 결과 + "path" ("result": no_route / no_army / no_supply / occupy / plunder / fail)
+        """
+        result = self._march(region_name, target, mode, max_turns)
+        if self.journal is not None:
+            self.journal.record({
+                "cmd": "march", "region": region_name, "target": target,
+                "mode": result.get("mode", mode), "max_turns": max_turns, "result": result["result"],
+            })
+        return result
+
+    def _march(self, region_name, target, mode, max_turns):
+        src = self.regions[region_name]
+        path = self.march_path(region_name, target, max_turns)
+        if path is None or len(path) < 2 or self.regions[target].owner == src.owner:
+            return {"result": "no_route", "attacker": region_name, "target": target}
+        if src.army <= 0:
+            return {"result": "no_army", "attacker": region_name, "target": target, "path": path}
+        supply = (src.army // 10) * (len(path) - 2)
+        if src.food < supply:
+            return {"result": "no_supply", "attacker": region_name, "target": target, "path": path,
+                    "supply": supply}
+
+        staging = self.regions[path[-2]]
+        if staging is not src:
+            self.prepare_write(src.name, staging.name)
+            src.food -= supply
+            staging.army += src.army
+            src.army = 0
+            self.touch(src.name, staging.name)
+        result = self._attack(staging.name, mode, target)
+        result["path"] = path
+        result["supply"] = supply
+        return result
+
+    def _attack(self, region_name, mode, target):
+        my_region = self.regions[region_name]
+        enemy_regions = self.enemy_neighbors(region_name)
+        if target is not None:
+            enemy_regions = [r for r in enemy_regions if r.name == target]
+        if not enemy_regions:
+            return {"result": "no_enemy", "attacker": my_region.name}
+
+        # 임시로 첫 번째 적 지역만 공격
+        target_region = enemy_regions[0]
+
+        # 무작위로 점령/약탈 (실제로는 UI로 선택)
+        if mode is None:
+            mode = self.rng.choice(["occupy", "plunder"])
+
+        attacker_soldiers = my_region.army
+        if attacker_soldiers <= 0:
+            return {"result": "no_army", "attacker": my_region.name,
+                    "target": target_region.name, "mode": mode}
+
+        defender_soldiers = target_region.army
+
+        self.prepare_write(my_region.name, target_region.name)
+        att_after, def_after = do_battle_attack(attacker_soldiers, defender_soldiers)
+        my_region.army = att_after
+        target_region.army = def_after
+
+        result = {
+            "attacker": my_region.name,
+            "target": target_region.name,
+            "mode": mode,
+            "att_after": att_after,
+            "def_after": def_after,
+        }
+
+        if att_after > 0 and def_after == 0:
+            # 승리
+            if mode == "occupy":
+                result["result"] = "occupy"
+                result["old_owner"] = target_region.owner
+                target_region.owner = my_region.owner
+            else:
+                # 약탈
+                stolen_gold = int(target_region.gold * 0.5)
+                stolen_food = int(target_region.food * 0.5)
+                target_region.gold -= stolen_gold
+                target_region.food -= stolen_food
+                target_region.security = int(target_region.security * 0.5)
+
+                my_region.gold += stolen_gold
+                my_region.food += stolen_food
+
+                result["result"] = "plunder"
+                result["stolen_gold"] = stolen_gold
+                result["stolen_food"] = stolen_food
+        else:
+            # 실패 또는 서로 생존(수비 승)
+            result["result"] = "fail"
+        self.touch(my_region.name, target_region.name)
+        return result
+
+    def step(self, intents=None):
+        """
+        턴 종료: 모든 지역 자원 갱신 후 AI 행동.
+        intents 를 주면 AI 계획 대신 그 행동들을 그대로 적용하고 플래너 세력도 움직이지 않는다.
+        (journal 재생용 - 플래너 행동은 따로 기록된 명령으로 재생된다)
+        """
+        # 1) 모든 지역 자원 갱신
+        with self._phase("turn.economy"):
+            self.prepare_write(*self.regions)
+            for r_obj in self.regions.values():
+                r_obj.next_turn()
+
+        # 2) AI 로직
+        replay = intents is not None
+        with self._phase("turn.ai"):
+            if not replay:
+                if self.seed is None:
+                    intents = self.plan_rule_ai()
+                else:
+                    intents = ai.plan_turn(self, self.seed)
+            ai.apply_intents(self, intents)
+        with self._phase("turn.index"):
+            self.touch_values()
+
+        self.turn += 1
+        self.reseed()
+        entry = {"cmd": "step", "turn": self.turn, "ai": intents}
+        if self._hash_turns:
+            with self._phase("turn.hash"):
+                self.turn_hash = entry["hash"] = self.state_hash()
+        if self.journal is not None:
+            with self._phase("turn.journal"):
+                self.journal.record(entry)
+        if self.history is not None:
+            with self._phase("turn.history"):
+                self.history.record(self)
+
+        # 3) 탐색 플래너 세력 (세력 이름 순서, 명령 메서드로 움직이므로 색인은 알아서 갱신됨)
+        if replay:
+            return
+        with self._phase("turn.planners"):
+            for faction in sorted(self.ai_planners):
+                planner = self.ai_planners[faction]
+                if planner is not None and faction in self._owned:
+                    planner.play(self)
+
+    def fast_forward(self, n, names=None):
+        """
+        AI / 플래너 없이 경제 틱만 n 턴 (각 지역에 next_turn 을 n 번 부른 것과 같은 결과).
+        names 를 주면 그 지역들만 따라잡고 턴 수는 그대로, 없으면 모든 지역 + turn += n.
+        지역이 많으면 economy.EconomyArrays 로 모든 지역을 배열 연산으로 한꺼번에 진행한다.
+        """
+        if n <= 0:
+            return
+        regions = self.regions if names is None else {name: self.regions[name] for name in names}
+        with self._phase("turn.fast_forward"):
+            self.prepare_write(*regions)
+            remaining = n
+            if len(regions) >= FAST_FORWARD_VECTOR_MIN and _vector_safe(regions.values()):
+                from economy import EconomyArrays
+                arrays = EconomyArrays.from_regions(regions)
+                remaining -= arrays.fast_forward(n)
+                arrays.write_back(regions)
+            if remaining:
+                for r_obj in regions.values():
+                    r_obj.fast_forward(remaining)
+            if names is None:
+                self.touch_values()
+                self.turn += n
+                self.reseed()
+                if self.history is not None:
+                    self.history.record(self)
+            else:
+                self.touch(*regions)
+        if self.journal is not None:
+            entry = {"cmd": "fast_forward", "n": n, "names": names, "turn": self.turn}
+            if self.deterministic:
+                entry["hash"] = self.state_hash()
+            self.journal.record(entry)
+
+    def _phase(self, name):
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+
+    def run_ai(self):
+        """전역(또는 self.rng) 난수 하나로 지역 순서대로 처리하는 기존 AI"""
+        ai.apply_intents(self, self.plan_rule_ai())
+        self.touch_values()
+
+    def plan_rule_ai(self):
+        """
+        run_ai 의 행동을 [(지역 이름, "invest", 종류) 또는 (지역 이름, "recruit", 인원), ...] 로 반환.
+        지역마다 자기 값만 보고 정하므로 계획 후 한꺼번에 적용해도 난수 소비 순서와 결과가 같다.
+        """
+        rng = self.rng
+        intents = []
+        for owner in self.rule_ai_factions():
+            for r_obj in self._owned_in_order(owner).values():
+                intent = self._region_ai_intent(r_obj, rng)
+                if intent is not None:
+                    intents.append(intent)
+        return intents
+
+    def _region_ai_intent(self, r_obj, rng):
+        # 자원이 충분하면 투자 or 모병
+        if r_obj.gold > 2000:
+            return (r_obj.name, "invest", rng.choice(["agri", "commerce", "security"]))
+        elif r_obj.food > 2000 and r_obj.population > 1100:
+            return (r_obj.name, "recruit", rng.randint(5, 20))
+        return None
+
+    def clone(self, rng=None):
+        """
+        지역 값을 복사한 독립 상태 (AI 탐색의 forward model 용).
+        변경 추적 집합은 복사하지 않고, 플래너 세력은 아무것도 하지 않는 세력(None)으로 남긴다.
+        """
+        state = GameState(self.player_name, self.player_region_name, rng=rng,
+                          adjacency=self.adjacency, seed=self.seed, deterministic=self.deterministic,
+                          map_source=self.map_source)
+        state.turn = self.turn
+        if self.deterministic:
+            # 결정적 모드 복제본은 원본과 같은 난수 상태에서 이어간다 (rng 를 주면 그것을 씀)
+            if rng is None:
+                state.rng = random.Random()
+                state.rng.setstate(self.rng.getstate())
+            state.turn_hash = self.turn_hash
+            # 탐색 중에는 턴 해시가 필요 없음 (턴마다 모든 지역을 다시 해시하므로 복제본에서는 끔)
+            state._hash_turns = False
+        state.ai_planners = dict.fromkeys(self.ai_planners)
+        regions = state.regions = copy_regions(self.regions)
+
+        # 색인 / 합계 / 전선도 다시 계산하지 않고 복사
+        state._owned = {
+            owner: {name: regions[name] for name in owned} for owner, owned in self._owned.items()
+        }
+        state._totals = {owner: list(totals) for owner, totals in self._totals.items()}
+        state._counted = dict(self._counted)
+        state._unsorted = set(self._unsorted)
+        state._region_order = self._region_order
+        state._frontier = self._frontier.copy()
+        return state
+
+    # ----------------------------------
+    # 저장 / 불러오기 (savefile.json 형식)
+    # ----------------------------------
+    def to_dict(self, names=None):
+        """names 를 주면 그 지역들만 담는다 (부분 저장용)"""
+        data = {
+            "player_name": self.player_name,
+            "player_region_name": self.player_region_name,
+            "turn": self.turn,
+            "regions": {}
+        }
+        if self.seed is not None:
+            data["seed"] = self.seed
+        if self.deterministic:
+            data["deterministic"] = True
+        if self.map_source is not None:
+            data["map"] = self.map_source
+        if names is None:
+            names = self.regions
+        for r_name in names:
+            r_obj = self.regions[r_name]
+            r_data = {"owner": r_obj.owner}
+            for field in REGION_FIELDS:
+                r_data[field] = getattr(r_obj, field)
+            data["regions"][r_name] = r_data
+        return data
+
+    @classmethod
+    def from_dict(cls, data, rng=None, adjacency=None):
+        state = cls(data["player_name"], data["player_region_name"], rng=rng, adjacency=adjacency,
+                    seed=data.get("seed"), deterministic=data.get("deterministic", False),
+                    map_source=data.get("map"))
+        state.turn = data.get("turn", 0)
+        state.reseed()
+        for r_name, r_data in data["regions"].items():
+            r_obj = Region(r_name, owner=r_data["owner"])
+            for field in REGION_FIELDS:
+                setattr(r_obj, field, r_data[field])
+            state.regions[r_name] = r_obj
+        state.touch_all()
+        return state
@@ -0,0 +1,250 @@
+"""
+지역 인접 그래프 (정수 ID, CSR 형식) + 세력별 전선(frontier) 캐시 + 행군 거리 캐시
+
+REGION_ADJACENCY 같은 "이름 -> 이름 리스트" dict 를 한 번만 컴파일해서
+지역마다 정수 ID 를 붙이고, 인접 리스트를 indptr / indices 두 배열로 보관한다.
+i 번 지역의 이웃은 indices[indptr[i]:indptr[i + 1]] 이다 (원래 리스트 순서 유지).
+"""
+from array import array
+from collections import OrderedDict
+
+# 지도(인접 dict)에는 나오지만 게임 지역(regions)에는 없는 지역의 소유자 자리.
+# 소유자가 None 인 지역(주인 없는 땅)은 예전 attack_action 처럼 모든 세력의 공격 대상이고,
+# OFF_MAP 지역은 누구의 전선에도 들어가지 않으며 행군 경로로도 쓰지 않는다.
+OFF_MAP = object()
+
+
+class MapGraph:
+    def __init__(self, adjacency):
+        # ID 부여: 키 순서대로, 그 다음 키에 없던 이웃 이름 순서대로
+        self.names = list(adjacency)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        for neighbors in adjacency.values():
+            for nb_name in neighbors:
+                if nb_name not in self.ids:
+                    self.ids[nb_name] = len(self.names)
+                    self.names.append(nb_name)
+
+        n = len(self.names)
+        self.indptr = array("i", [0])
+        self.indices = array("i")
+        for i in range(n):
+            for nb_name in adjacency.get(self.names[i], ()):
+                self.indices.append(self.ids[nb_name])
+            self.indptr.append(len(self.indices))
+
+        # 역방향 인접 (j 를 이웃으로 가진 지역들) - 소유권 변경 시 전선 갱신에 필요
+        incoming = [[] for _ in range(n)]
+        for i in range(n):
+            for j in self.indices[self.indptr[i]:self.indptr[i + 1]]:
+                incoming[j].append(i)
+        self.rev_indptr = array("i", [0])
+        self.rev_indices = array("i")
+        for lst in incoming:
+            self.rev_indices.extend(lst)
+            self.rev_indptr.append(len(self.rev_indices))
+
+    def __len__(self):
+        return len(self.names)
+
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def incoming(self, i):
+        return self.rev_indices[self.rev_indptr[i]:self.rev_indptr[i + 1]]
+
+    def neighbor_names(self, name):
+        i = self.ids.get(name)
+        if i is None:
+            return []
+        names = self.names
+        return [names[j] for j in self.neighbors(i)]
+
+
+# 같은 adjacency dict 는 한 번만 컴파일
+_compiled = {}
+
+
+def compile_graph(adjacency):
+    graph = _compiled.get(id(adjacency))
+    if graph is None or graph[0] is not adjacency:
+        graph = (adjacency, MapGraph(adjacency))
+        _compiled[id(adjacency)] = graph
+    return graph[1]
+
+
+class FrontierCache:
+    """
+    세력별 전선: 그 세력 지역에 인접한 적(다른 소유자) 지역 ID 집합.
+    owner -> {적 지역 ID: 그 지역에 인접한 내 지역 수} 로 보관하고
+    지역 하나의 소유자가 바뀔 때 그 지역 주변만 갱신한다.
+    """
+
+    def __init__(self, graph, owners):
+        """owners: 지역 ID 순서의 소유자 리스트 (게임 지역에 없는 지역은 OFF_MAP)"""
+        self.graph = graph
+        self.owners = list(owners)
+        self.fronts = {}
+        for i, owner in enumerate(self.owners):
+            if owner is OFF_MAP:
+                continue
+            for j in graph.neighbors(i):
+                nb_owner = self.owners[j]
+                if nb_owner is not OFF_MAP and nb_owner != owner:
+                    self._add(owner, j, 1)
+
+    def copy(self):
+        """같은 지도를 쓰는 독립 복사본 (다시 계산하지 않음)"""
+        cache = FrontierCache.__new__(FrontierCache)
+        cache.graph = self.graph
+        cache.owners = list(self.owners)
+        cache.fronts = {owner: dict(front) for owner, front in self.fronts.items()}
+        return cache
+
+    def _add(self, owner, j, count):
+        front = self.fronts.setdefault(owner, {})
+        count += front.get(j, 0)
+        if count:
+            front[j] = count
+        else:
+            del front[j]
+
+    def frontier(self, owner):
+        """owner 의 전선 (적 지역 ID 들, dict keys view)"""
+        return self.fronts.get(owner, {}).keys()
+
+    def set_owner(self, i, new_owner):
+        """i 번 지역의 소유자 변경을 반영 (i 의 이웃만 본다)"""
+        old_owner = self.owners[i]
+        if old_owner == new_owner:
+            return
+        graph = self.graph
+        owners = self.owners
+
+        # i 에서 나가는 쪽: i 가 세던 이웃 적 지역 카운트를 새 소유자 기준으로 옮김
+        for j in graph.neighbors(i):
+            nb_owner = owners[j]
+            if nb_owner is OFF_MAP:
+                continue
+            if old_owner is not OFF_MAP and nb_owner != old_owner:
+                self._add(old_owner, j, -1)
+            if new_owner is not OFF_MAP and nb_owner != new_owner:
+                self._add(new_owner, j, 1)
+
+        # i 로 들어오는 쪽: 이웃 세력에게 i 가 적 지역인지 여부가 바뀐 경우만 갱신
+        for p in graph.incoming(i):
+            p_owner = owners[p]
+            if p_owner is OFF_MAP:
+                continue
+            before = old_owner is not OFF_MAP and p_owner != old_owner
+            after = new_owner is not OFF_MAP and p_owner != new_owner
+            if before != after:
+                self._add(p_owner, i, 1 if after else -1)
+
+        owners[i] = new_owner
+        for owner in (old_owner, new_owner):
+            if owner in self.fronts and not self.fronts[owner]:
+                del self.fronts[owner]
+
+
+class RouteTable:
+    """
+    source 에서 시작하는 BFS 거리 표. 소유자(owner) 영토만 지나가고,
+    영토에 붙은 다른 소유자 지역은 도착지로만 기록한다 (그 너머로는 가지 않음).
+    물어본 깊이까지만 한 층씩 펼쳐 둔다.
+    """
+    __slots__ = ("owner", "dist", "parent", "order", "layer_end", "queue")
+
+    def __init__(self, source, owner):
+        self.owner = owner
+        self.dist = {source: 0}
+        self.parent = {source: -1}
+        self.order = [source]   # BFS 순서 (거리 순)
+        self.layer_end = [1]    # layer_end[d] = 거리 d 이하 지역 수
+        self.queue = [source]   # 다음에 펼칠 층 (내 영토만)
+
+    def extend(self, graph, owners, depth):
+        dist = self.dist
+        parent = self.parent
+        order = self.order
+        indptr = graph.indptr
+        indices = graph.indices
+        owner = self.owner
+        while len(self.layer_end) <= depth and self.queue:
+            d = len(self.layer_end)
+            next_queue = []
+            for u in self.queue:
+                for v in indices[indptr[u]:indptr[u + 1]]:
+                    if v in dist or owners[v] is OFF_MAP:
+                        continue
+                    dist[v] = d
+                    parent[v] = u
+                    order.append(v)
+                    if owners[v] == owner:
+                        next_queue.append(v)
+            self.layer_end.append(len(order))
+            self.queue = next_queue
+
+    def within(self, depth):
+        """거리 depth 이하 지역 ID 들 (거리 순)"""
+        return self.order[:self.layer_end[min(depth, len(self.layer_end) - 1)]]
+
+    def path(self, target):
+        """source -> target 지역 ID 리스트 (표에 없으면 None)"""
+        if target not in self.parent:
+            return None
+        path = []
+        while target != -1:
+            path.append(target)
+            target = self.parent[target]
+        path.reverse()
+        return path
+
+
+class RouteCache:
+    """
+    출발 지역마다 RouteTable 을 만들어 두고 (최근 max_tables 개) 다시 쓴다.
+
+    지역 i 의 소유자가 A -> B 로 바뀌면 i 가 들어 있는 A / B 의 표만 버린다.
+    A 의 표에 없던 i 는 A 영토 안 경로에 쓰인 적이 없고, B 의 표에 없던 i 는
+    B 영토 가장자리에 닿아 있지 않았으며, 다른 세력 표에서 i 는 바뀌기 전후 모두 도착지일 뿐이다.
+    """
+
+    def __init__(self, graph, owners, max_tables=1024):
+        self.graph = graph
+        self.owners = owners  # FrontierCache.owners 를 같이 본다 (소유자 변경은 그쪽에서 반영)
+        self.max_tables = max_tables
+        self._tables = OrderedDict()  # 출발 지역 ID -> RouteTable (오래 안 쓴 순)
+        self._by_owner = {}           # 소유자 -> 그 세력 표들의 출발 지역 ID 집합
+
+    def __len__(self):
+        return len(self._tables)
+
+    def table(self, source, depth):
+        """source 에서 거리 depth 까지 펼쳐진 표"""
+        table = self._tables.get(source)
+        if table is None:
+            owner = self.owners[source]
+            table = self._tables[source] = RouteTable(source, owner)
+            self._by_owner.setdefault(owner, set()).add(source)
+            if len(self._tables) > self.max_tables:
+                old_source, old = self._tables.popitem(last=False)
+                self._drop(old_source, old.owner)
+        else:
+            self._tables.move_to_end(source)
+        table.extend(self.graph, self.owners, depth)
+        return table
+
+    def owner_changed(self, i, old_owner, new_owner):
+        """i 번 지역의 소유자 변경 (i 가 들어 있는 옛 / 새 소유자 표만 버림)"""
+        for owner in (old_owner, new_owner):
+            for source in list(self._by_owner.get(owner, ())):
+                if i in self._tables[source].dist:
+                    del self._tables[source]
+                    self._drop(source, owner)
+
+    def _drop(self, source, owner):
+        sources = self._by_owner[owner]
+        sources.discard(source)
+        if not sources:
+            del self._by_owner[owner]
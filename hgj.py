@@ -1,159 +1,104 @@
-import json
 import os
-import random
+import threading
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.label import Label
 from kivy.core.text import LabelBase
-from kivy.uix.button import Button
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.textinput import TextInput
 from kivy.core.window import Window
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.gridlayout import GridLayout
+from kivy.clock import Clock
+from kivy.properties import StringProperty
+
+from profiler import PROFILE_PATH, PROFILER, TRACE_PATH, phase, timed
+from textcache import TEXTURE_CACHE, CachedButton, CachedLabel
+
+# 게임 엔진 / 저장 모듈과 무거운 위젯(TextInput, RecycleView)은 그 화면을 처음 만들 때 import 한다.
+# (메인 메뉴가 뜨기 전에는 필요 없음)
 
 #
 # 전역 설정: 폰트 등록
 #
 current_dir = os.path.dirname(__file__)
 font_path = os.path.join(current_dir, "batang.ttc")  # .ttc가 문제 있을 경우 .ttf 사용 권장
-LabelBase.register(name="batang", fn_regular=font_path)
+_fonts_registered = False
 
-#
-# 간단히 지역 간 인접 관계 정의 (이전과 동일)
-#
-REGION_ADJACENCY = {
-    "평안북도": ["함경북도", "평안남도"],
-    "함경북도": ["평안북도", "함경남도"],
-    "평안남도": ["평안북도", "함경남도", "황해도"],
-    "함경남도": ["함경북도", "평안남도"],
-    "황해도": ["평안남도", "강원도"],
-    "강원도": ["황해도", "경기도"],
-    "경기도": ["강원도", "충청북도"],
-    "충청북도": ["경기도", "충청남도"],
-    "충청남도": ["충청북도", "경상북도"],
-    "경상북도": ["충청남도", "경상남도"],
-    "경상남도": ["경상북도", "전라북도"],
-    "전라북도": ["경상남도", "전라남도"],
-    "전라남도": ["전라북도", "제주도"],
-    "제주도": ["전라남도"]
-}
-
-AI_NAMES = [
-    "김유진", "김유정", "김선유", "김민유", "이동호",
-    "이병호", "김윤희", "신문주", "신선우", "김혜정",
-    "김권성", "김경남", "김민주"
-]
+# 시작 지역 선택 화면에 보여줄 최대 지역 수
+MAX_START_CHOICES = 20
+# 되돌리기로 거슬러 올라갈 수 있는 최대 행동 수 (턴 종료 때 비워짐)
+UNDO_LIMIT = 20
+# 모병 버튼 한 번에 모집하는 병사 수 / 일괄 투자 버튼 한 번에 지역마다 투자하는 횟수
+RECRUIT_AMOUNT = 10
+BULK_INVEST_COUNT = 10
+# 턴별 통계(history.History)를 기록할 최대 지역 수 (기록 배열 크기가 지역 수에 비례)
+HISTORY_MAX_REGIONS = 2000
+
+# 미리 한 번 그려 둘 글자 (화면에 자주 나오는 한글)
+WARMUP_TEXT = "시작 지역을 선택하세요 주인공 땅 선택 농업상업치안투자 모병 공격 저장 턴 종료 조언 소유자 되돌리기 미리보기 행군 목표 전체 최대"
+
+
+def register_fonts():
+    """batang 폰트 등록 (여러 번 불러도 한 번만)"""
+    global _fonts_registered
+    if not _fonts_registered:
+        LabelBase.register(name="batang", fn_regular=font_path)
+        _fonts_registered = True
+
+
+def warm_fonts():
+    """
+    백그라운드 스레드에서 폰트 파일을 끝까지 읽어 OS 캐시에 올린 뒤,
+    메인 스레드에서 등록하고 한글을 한 번 그려 둔다. (첫 한글 화면에서 멈칫하지 않도록)
+    """
+    def read():
+        try:
+            with open(font_path, "rb") as f:
+                while f.read(1 << 20):
+                    pass
+        except OSError:
+            pass
+        Clock.schedule_once(_render_warmup)
+
+    threading.Thread(target=read, name="font-warmup", daemon=True).start()
+
+
+def _render_warmup(dt):
+    from kivy.core.text import Label as CoreLabel
+    register_fonts()
+    CoreLabel(text=WARMUP_TEXT, font_name="batang").refresh()
 
-# ----------------------
-# 지역(Region) 클래스
-# ----------------------
-class Region:
-    def __init__(self, name, owner=None):
-        self.name = name
-        self.owner = owner  # 소유자 (플레이어명 또는 AI명)
-
-        # 자원
-        self.gold = 1000
-        self.food = 3000
-        self.population = 1000
-
-        # 능력치
-        self.agri = 0      # 농업
-        self.commerce = 0  # 상업
-        self.security = 0  # 치안
-
-        # 병력(명 수)
-        self.army = 0
-    
-    def invest_agri(self):
-        if self.gold >= 100:
-            self.gold -= 100
-            self.agri += 1
-    
-    def invest_commerce(self):
-        if self.gold >= 100:
-            self.gold -= 100
-            self.commerce += 1
-    
-    def invest_security(self):
-        if self.gold >= 100:
-            self.gold -= 100
-            self.security += 1
-    
-    def recruit_army(self, amount):
-        # 병사 1명당 식량 5 소모, 인구 1 감소
-        cost_food = amount * 5
-        if self.food >= cost_food and self.population >= amount:
-            self.food -= cost_food
-            self.population -= amount
-            self.army += amount
-    
-    def next_turn(self):
-        # 턴이 끝날 때마다 자원 증가
-        self.gold += 100
-        self.food += 300
-        self.population += 100
-        
-        # 능력치 효과 (질문 예시대로 0.003 / 0.002 적용)
-        if self.agri > 0:
-            self.food += int(self.food * 0.003 * self.agri)
-        if self.commerce > 0:
-            self.gold += int(self.gold * 0.002 * self.commerce)
-        if self.security > 0:
-            self.population += int(self.population * 0.01 * self.security)
-        
-        # 병사 유지비
-        if self.army > 0:
-            food_cost = self.army // 10
-            if self.food >= food_cost:
-                self.food -= food_cost
-            else:
-                self.food = 0
 
 # ----------------------
-# 전투 로직 함수 (한 번의 교환으로 승패 결정)
+# 화면을 처음 이동할 때 만드는 ScreenManager
 # ----------------------
-def do_battle_attack(attacker_soldiers, defender_soldiers):
-    if attacker_soldiers <= 0:
-        return 0, defender_soldiers
-    if defender_soldiers <= 0:
-        return attacker_soldiers, 0
-
-    atk_attack = attacker_soldiers * 20
-    atk_hp = attacker_soldiers * 30
-
-    def_attack = defender_soldiers * 20
-    def_hp = defender_soldiers * 30
-
-    # 공격군이 먼저 수비군 HP를 깎음
-    old_def_hp = def_hp
-    def_hp -= atk_attack
-    if def_hp < 0:
-        def_hp = 0
-    
-    lost_ratio_def = atk_attack / old_def_hp if old_def_hp > 0 else 1.0
-    lost_soldiers_def = int(defender_soldiers * lost_ratio_def)
-    defender_after = defender_soldiers - lost_soldiers_def
-    if defender_after < 0:
-        defender_after = 0
-
-    # 수비군이 생존했다면 반격
-    if defender_after > 0:
-        old_atk_hp = atk_hp
-        atk_hp -= def_attack
-        if atk_hp < 0:
-            atk_hp = 0
-        
-        lost_ratio_atk = def_attack / old_atk_hp if old_atk_hp > 0 else 1.0
-        lost_soldiers_atk = int(attacker_soldiers * lost_ratio_atk)
-        attacker_after = attacker_soldiers - lost_soldiers_atk
-        if attacker_after < 0:
-            attacker_after = 0
-    else:
-        attacker_after = attacker_soldiers
-
-    return attacker_after, defender_after
+class LazyScreenManager(ScreenManager):
+    """
+    add_lazy(이름, 화면 클래스) 로 등록해 두면 current 로 이동하거나 get_screen() 할 때 만든다.
+    화면을 만들기 전에 폰트 등록을 보장한다.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._factories = {}
+
+    def add_lazy(self, name, factory):
+        self._factories[name] = factory
+
+    def is_built(self, name):
+        return self.has_screen(name)
+
+    def _build_screen(self, name):
+        factory = self._factories.pop(name, None)
+        if factory is not None:
+            register_fonts()
+            self.add_widget(factory(name=name))
+
+    def get_screen(self, name):
+        self._build_screen(name)
+        return super().get_screen(name)
+
+    def on_current(self, instance, value):
+        self._build_screen(value)
+        super().on_current(instance, value)
 
 # ----------------------
 # 메인 메뉴 스크린
@@ -163,10 +108,11 @@ class MainMenuScreen(Screen):
         super().__init__(**kwargs)
         layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
         
-        start_btn = Button(text="Start", font_name="batang", size_hint=(1, 0.2))
-        load_btn = Button(text="Load", font_name="batang", size_hint=(1, 0.2))
-        settings_btn = Button(text="Settings", font_name="batang", size_hint=(1, 0.2))
-        exit_btn = Button(text="Exit", font_name="batang", size_hint=(1, 0.2))
+        # 메뉴 글자는 영문뿐이라 기본 폰트로 그림 (첫 화면에서 batang 을 읽지 않도록)
+        start_btn = CachedButton(text="Start", size_hint=(1, 0.2))
+        load_btn = CachedButton(text="Load", size_hint=(1, 0.2))
+        settings_btn = CachedButton(text="Settings", size_hint=(1, 0.2))
+        exit_btn = CachedButton(text="Exit", size_hint=(1, 0.2))
         
         start_btn.bind(on_release=self.start_game)
         load_btn.bind(on_release=self.load_game)
@@ -197,6 +143,7 @@ class MainMenuScreen(Screen):
 # ----------------------
 class StartRegionScreen(Screen):
     def __init__(self, **kwargs):
+        from kivy.uix.textinput import TextInput
         super().__init__(**kwargs)
         self.layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
         
@@ -209,17 +156,16 @@ class StartRegionScreen(Screen):
         )
         self.layout.add_widget(self.name_input)
 
-        label = Label(text="시작 지역을 선택하세요", font_name="batang")
+        label = CachedLabel(text="시작 지역을 선택하세요", font_name="batang")
         self.layout.add_widget(label)
         
-        self.regions_list = [
-            "평안북도", "평안남도", "함경북도", "함경남도", "황해도",
-            "강원도", "경기도", "경상남도", "경상북도", "전라남도",
-            "전라북도", "충청북도", "충청남도", "제주도"
-        ]
+        # 시나리오의 지역 목록 (큰 지도는 고르게 MAX_START_CHOICES 개만 후보로 보여줌)
+        names = App.get_running_app().scenario.names
+        step = max(1, -(-len(names) // MAX_START_CHOICES))
+        self.regions_list = names[::step]
         
         for r in self.regions_list:
-            btn = Button(text=r, size_hint=(1, 0.1), font_name="batang")
+            btn = CachedButton(text=r, size_hint=(1, 0.1), font_name="batang")
             btn.bind(on_release=self.select_region)
             self.layout.add_widget(btn)
         
@@ -239,20 +185,133 @@ class StartRegionScreen(Screen):
         
         self.manager.current = "game"
 
+# ----------------------
+# 지역 정보 한 줄 (RecycleView 에서 재사용되는 위젯)
+# ----------------------
+class RegionRow(BoxLayout):
+    """
+    지역 한 칸. 이름 / 소유자 줄(거의 안 바뀜)과 자원 줄(매 턴 바뀜)을 따로 그려서
+    스크롤하거나 턴이 바뀌어도 이름 / 소유자 줄은 텍스처 캐시에 있는 것을 그대로 쓴다.
+    """
+    header = StringProperty("")
+    body = StringProperty("")
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("orientation", "vertical")
+        super().__init__(**kwargs)
+        self.header_label = CachedLabel(font_name="batang", halign="left", valign="top", size_hint_y=2)
+        # 자원 줄은 턴마다 글자가 달라서 캐시에 넣으면 이름 / 버튼 텍스처만 밀어내므로 일반 Label
+        self.body_label = Label(font_name="batang", halign="left", valign="top", size_hint_y=5)
+        for label in (self.header_label, self.body_label):
+            label.bind(width=self._update_text_size)
+            self.add_widget(label)
+
+    def _update_text_size(self, label, width):
+        label.text_size = (width, None)  # 텍스트 정렬을 위해 필요
+
+    def on_header(self, instance, value):
+        self.header_label.text = value
+
+    def on_body(self, instance, value):
+        self.body_label.text = value
+
+
+def region_info_row(r_obj):
+    """RegionRow 에 넘길 RecycleView 데이터"""
+    return {
+        "header": f"[{r_obj.name}]\n소유자: {r_obj.owner}",
+        "body": (
+            f"Gold: {r_obj.gold}\nFood: {r_obj.food}\n"
+            f"Population: {r_obj.population}\n"
+            f"Agriculture: {r_obj.agri}, Commerce: {r_obj.commerce}, Security: {r_obj.security}\n"
+            f"Army: {r_obj.army}"
+        ),
+    }
+
+
+class CommandQueue:
+    """
+    투자 / 모병 버튼 입력을 모아 두었다가 다음 프레임에 한 번 GameState.orders 로 검사 + 적용.
+    한 프레임 안의 입력은 한꺼번에 적용되거나 (자원이 모자라면) 모두 취소되고,
+    되돌리기 한 단계와 지역 패널 갱신 한 번으로 합쳐진다.
+    공격 / 턴 종료처럼 다른 명령을 하기 전에는 flush() 로 먼저 적용해서 순서를 지킨다.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.pending = []  # GameState.orders 형식의 명령
+        self.labels = []   # 안내 문구용 입력 이름
+        self._trigger = Clock.create_trigger(self.flush)
+
+    def add(self, orders, label):
+        self.pending.extend(orders)
+        self.labels.append(label)
+        self._trigger()
+
+    @timed("ui.orders")
+    def flush(self, *args):
+        """모인 명령 적용. 적용했으면 True, 취소했으면 False, 모인 명령이 없으면 None"""
+        if not self.pending:
+            return None
+        self._trigger.cancel()
+        orders, labels = self.pending, self.labels
+        self.pending, self.labels = [], []
+        screen = self.screen
+        state = screen.state
+
+        resolved, errors = state.check_orders(state.player_name, orders)
+        if errors:
+            errors = list(dict.fromkeys(errors))  # 같은 지역의 같은 부족은 한 번만
+            more = f"\n... 외 {len(errors) - 3}건" if len(errors) > 3 else ""
+            screen.info_label.text = "자원이 부족해서 명령을 취소했습니다.\n" + "\n".join(errors[:3]) + more
+            return False
+        if not resolved:
+            screen.info_label.text = "할 수 있는 명령이 없습니다."
+            return False
+        state.checkpoint(limit=UNDO_LIMIT)
+        result = state.orders(state.player_name, resolved)
+
+        label = labels[0] if len(labels) == 1 else f"{labels[0]} 외 {len(labels) - 1}건"
+        spent = [f"지역 {result['regions']}곳"]
+        if result["gold"]:
+            spent.append(f"금 -{result['gold']}")
+        if result["population"]:
+            spent.append(f"식량 -{result['food']}, 병사 +{result['population']}")
+        screen.info_label.text = f"{label} 진행 ({', '.join(spent)})"
+        screen.request_refresh()
+        return True
+
+
 # ----------------------
 # 게임 플레이 스크린 (맵 화면)
 # ----------------------
 class GameScreen(Screen):
     def __init__(self, **kwargs):
+        from kivy.uix.recycleview import RecycleView
+        from kivy.uix.recyclegridlayout import RecycleGridLayout
+        from savegame import BINARY_SAVE_PATH, SaveManager
         super().__init__(**kwargs)
         
         self.player_name = None         # 플레이어 입력 이름
         self.player_region_name = None  # 플레이어가 첫 선택한 지역
-        self.regions = {}              # 모든 지역 정보 (name -> Region)
+        self.state = None               # 게임 상태 (engine.GameState)
+        self.saver = SaveManager(BINARY_SAVE_PATH, binary=True)  # 백그라운드 저장 (바이너리 세이브)
+        self.autosave = False           # 턴 종료마다 부분 저장
+        self.advisor = None             # 플레이어 조언용 탐색기 (턴이 바뀌어도 트리 재사용)
+        self.command_queue = CommandQueue(self)  # 투자 / 모병 입력을 프레임마다 모아서 적용
+        # 지역 패널 갱신은 요청이 여러 번 와도 다음 프레임에 한 번만
+        self._refresh_trigger = Clock.create_trigger(lambda dt: self.update_regions_info())
+
+        # 지역 정보 패널 갱신용: 화면에 연결된 상태, 변경된 지역 이름, 지역 -> 행 번호
+        self._panel_state = None
+        self._dirty_regions = None
+        self._region_rows = {}
 
         # "현재 선택된 내 땅" 관리
         self.selected_region_name = None  
         self.selected_region_index = 0   # 내 땅 리스트를 순환하기 위한 인덱스
+        self.march_target_name = None    # 행군 공격 목표 (선택한 내 땅에서 닿는 적 지역)
+        self.march_target_index = 0
         
         self.layout = BoxLayout(orientation='vertical', spacing=5, padding=5)
         self.info_label = Label(text="게임 화면입니다.", font_name="batang")
@@ -262,24 +321,27 @@ class GameScreen(Screen):
         button_layout = BoxLayout(size_hint=(1, 0.2))
         
         # (1) 땅 선택 버튼
-        self.select_region_btn = Button(text="땅 선택", font_name="batang", size_hint=(1, 1))
+        self.select_region_btn = CachedButton(text="땅 선택", font_name="batang", size_hint=(1, 1))
         self.select_region_btn.bind(on_release=self.select_owned_region_action)
         
         # (2) 투자 버튼들 (3개)
-        self.invest_agri_btn = Button(text="농업투자", font_name="batang", size_hint=(1, 1))
-        self.invest_commerce_btn = Button(text="상업투자", font_name="batang", size_hint=(1, 1))
-        self.invest_security_btn = Button(text="치안투자", font_name="batang", size_hint=(1, 1))
+        self.invest_agri_btn = CachedButton(text="농업투자", font_name="batang", size_hint=(1, 1))
+        self.invest_commerce_btn = CachedButton(text="상업투자", font_name="batang", size_hint=(1, 1))
+        self.invest_security_btn = CachedButton(text="치안투자", font_name="batang", size_hint=(1, 1))
         
         # (3) 모병 버튼
-        self.recruit_btn = Button(text="모병", font_name="batang", size_hint=(1, 1))
+        self.recruit_btn = CachedButton(text="모병", font_name="batang", size_hint=(1, 1))
         
         # (4) 공격 버튼
-        self.attack_btn = Button(text="공격", font_name="batang", size_hint=(1, 1))
+        self.attack_btn = CachedButton(text="공격", font_name="batang", size_hint=(1, 1))
         
         # (5) 저장 / 턴 종료
-        self.save_btn = Button(text="저장", font_name="batang", size_hint=(1, 1))
-        self.next_turn_btn = Button(text="턴 종료", font_name="batang", size_hint=(1, 1))
-        self.exit_btn = Button(text="종료", font_name="batang", size_hint=(1, 1))
+        self.save_btn = CachedButton(text="저장", font_name="batang", size_hint=(1, 1))
+        self.next_turn_btn = CachedButton(text="턴 종료", font_name="batang", size_hint=(1, 1))
+        self.exit_btn = CachedButton(text="종료", font_name="batang", size_hint=(1, 1))
+        
+        # (6) 조언
+        self.advise_btn = CachedButton(text="조언", font_name="batang", size_hint=(1, 1))
         
         # 버튼 이벤트 바인딩
         self.invest_agri_btn.bind(on_release=self.invest_agri_action)
@@ -289,6 +351,7 @@ class GameScreen(Screen):
         self.attack_btn.bind(on_release=self.attack_action)
         self.save_btn.bind(on_release=self.save_game)
         self.next_turn_btn.bind(on_release=self.next_turn)
+        self.advise_btn.bind(on_release=self.advise_action)
         self.exit_btn.bind(on_release=self.exit_game)
 
         # 버튼들을 레이아웃에 배치
@@ -300,49 +363,84 @@ class GameScreen(Screen):
         button_layout.add_widget(self.attack_btn)
         button_layout.add_widget(self.save_btn)
         button_layout.add_widget(self.next_turn_btn)
+        button_layout.add_widget(self.advise_btn)
         button_layout.add_widget(self.exit_btn)
         self.layout.add_widget(button_layout)
         
-        # 스크롤뷰 + GridLayout (지역 정보 표시)
-        self.scroll_view = ScrollView(size_hint=(1, 0.6))
-        self.regions_layout = GridLayout(cols=2, spacing=10, size_hint_y=None)
+        # (7) 되돌리기 / 미리보기 / 행군
+        preview_layout = BoxLayout(size_hint=(1, 0.1))
+        self.undo_btn = CachedButton(text="되돌리기", font_name="batang", size_hint=(1, 1))
+        self.preview_attack_btn = CachedButton(text="공격 미리보기", font_name="batang", size_hint=(1, 1))
+        self.preview_turn_btn = CachedButton(text="턴 미리보기", font_name="batang", size_hint=(1, 1))
+        self.undo_btn.bind(on_release=self.undo_action)
+        self.preview_attack_btn.bind(on_release=self.preview_attack_action)
+        self.preview_turn_btn.bind(on_release=self.preview_turn_action)
+        preview_layout.add_widget(self.undo_btn)
+        preview_layout.add_widget(self.preview_attack_btn)
+        preview_layout.add_widget(self.preview_turn_btn)
+        self.march_target_btn = CachedButton(text="행군 목표", font_name="batang", size_hint=(1, 1))
+        self.march_btn = CachedButton(text="행군 공격", font_name="batang", size_hint=(1, 1))
+        self.march_target_btn.bind(on_release=self.select_march_target_action)
+        self.march_btn.bind(on_release=self.march_action)
+        preview_layout.add_widget(self.march_target_btn)
+        preview_layout.add_widget(self.march_btn)
+        self.layout.add_widget(preview_layout)
+        
+        # (8) 일괄 명령 (내 모든 지역 / 가능한 만큼)
+        bulk_layout = BoxLayout(size_hint=(1, 0.1))
+        for kind, text in (("agri", "농업"), ("commerce", "상업"), ("security", "치안")):
+            btn = CachedButton(text=f"전체 {text} ×{BULK_INVEST_COUNT}", font_name="batang", size_hint=(1, 1))
+            btn.bind(on_release=lambda instance, kind=kind: self.bulk_invest_action(kind))
+            bulk_layout.add_widget(btn)
+        self.recruit_max_btn = CachedButton(text="최대 모병", font_name="batang", size_hint=(1, 1))
+        self.recruit_max_all_btn = CachedButton(text="전체 최대 모병", font_name="batang", size_hint=(1, 1))
+        self.recruit_max_btn.bind(on_release=self.recruit_max_action)
+        self.recruit_max_all_btn.bind(on_release=self.recruit_max_all_action)
+        bulk_layout.add_widget(self.recruit_max_btn)
+        bulk_layout.add_widget(self.recruit_max_all_btn)
+        self.layout.add_widget(bulk_layout)
+        
+        # RecycleView + RecycleGridLayout (지역 정보 표시)
+        # 보이는 행 위젯만 만들어 재사용하므로 지역 수가 늘어도 갱신 비용이 거의 일정
+        self.regions_view = RecycleView(size_hint=(1, 0.6))
+        self.regions_layout = RecycleGridLayout(
+            cols=2, spacing=10, size_hint_y=None,
+            default_size=(None, 120), default_size_hint=(1, None)
+        )
         self.regions_layout.bind(minimum_height=self.regions_layout.setter('height'))
-        self.scroll_view.add_widget(self.regions_layout)
+        self.regions_view.add_widget(self.regions_layout)
+        self.regions_view.viewclass = RegionRow  # layout manager 를 붙인 뒤에 지정해야 함
         
-        self.layout.add_widget(self.scroll_view)
+        self.layout.add_widget(self.regions_view)
         self.add_widget(self.layout)
     
     def exit_game(self, instance):
         App.get_running_app().stop()
 
+    def set_state(self, state):
+        """불러온 상태로 교체 (이전 상태의 journal 은 닫음)"""
+        if self.state is not None and self.state.journal is not None:
+            self.state.journal.close()
+        self.player_name = state.player_name
+        self.player_region_name = state.player_region_name
+        self.state = state
+
     def on_pre_enter(self, *args):
         """화면 들어올 때 초기화 작업 (한 번만)"""
-        if not self.regions:
-            # 초기 지역 생성
-            region_names = [
-                "평안북도", "평안남도", "함경북도", "함경남도", "황해도",
-                "강원도", "경기도", "경상남도", "경상북도", "전라남도",
-                "전라북도", "충청북도", "충청남도", "제주도"
-            ]
-            ai_name_candidates = AI_NAMES[:]
-            
-            for name in region_names:
-                self.regions[name] = Region(name, owner=None)
-            
-            # 플레이어가 선택한 지역 소유자 = 플레이어 이름
-            if self.player_region_name:
-                self.regions[self.player_region_name].owner = self.player_name
-                # 자원 보너스
-                self.regions[self.player_region_name].gold = 2000
-                self.regions[self.player_region_name].food = 5000
-                self.regions[self.player_region_name].population = 1500
-            
-            # 나머지 지역은 랜덤 AI 이름 부여
-            for r_name, r_obj in self.regions.items():
-                if r_obj.owner is None:
-                    if len(ai_name_candidates) == 0:
-                        ai_name_candidates = AI_NAMES[:]
-                    r_obj.owner = random.choice(ai_name_candidates)
+        from journal import Journal
+        if self.state is None:
+            # 초기 지역 생성 (앱의 시나리오 지도)
+            scenario = App.get_running_app().scenario
+            self.state = scenario.new_game(self.player_name, self.player_region_name)
+        if self.state.journal is None:
+            # 새 게임 / 세이브에서 불러온 게임은 지금 상태부터 기록을 새로 시작
+            Journal.create(self.state)
+        # 턴 종료 구간(경제 / AI / 색인 / 플래너) 시간 측정
+        self.state.profiler = PROFILER
+        if self.state.history is None and len(self.state.regions) <= HISTORY_MAX_REGIONS:
+            # 차트 / 밸런스 분석용 턴별 통계
+            from history import History
+            History.for_state(self.state)
         
         # 시작 시, 선택된 땅 초기화
         self.selected_region_name = None
@@ -358,7 +456,7 @@ class GameScreen(Screen):
         '땅 선택' 버튼을 누를 때마다
         플레이어가 소유한 지역 리스트를 순환하며 현재 선택 지역을 변경.
         """
-        owned_regions = [r for r in self.regions.values() if r.owner == self.player_name]
+        owned_regions = self.state.owned_regions(self.state.player_name)
         if not owned_regions:
             self.selected_region_name = None
             self.info_label.text = "플레이어가 소유한 지역이 없습니다."
@@ -381,10 +479,10 @@ class GameScreen(Screen):
         """
         if not self.selected_region_name:
             return None
-        r_obj = self.regions.get(self.selected_region_name)
+        r_obj = self.state.regions.get(self.selected_region_name)
         if not r_obj:
             return None
-        if r_obj.owner != self.player_name:
+        if r_obj.owner != self.state.player_name:
             return None
         return r_obj
     
@@ -393,54 +491,50 @@ class GameScreen(Screen):
     # ----------------------------------
 
 
+    @timed("ui.update_regions_info")
     def update_regions_info(self):
-        """지역 정보를 갱신하여 스크롤뷰에 표시"""
-        # 기존 정보 제거
-        self.regions_layout.clear_widgets()
-        
-        for r_name, r_obj in self.regions.items():
-            # 지역 이름
-            region_label = Label(
-                text=f"[{r_name}]\n소유자: {r_obj.owner}\n"
-                     f"Gold: {r_obj.gold}\nFood: {r_obj.food}\n"
-                     f"Population: {r_obj.population}\n"
-                     f"Agriculture: {r_obj.agri}, Commerce: {r_obj.commerce}, Security: {r_obj.security}\n"
-                     f"Army: {r_obj.army}",
-                size_hint_y=None,
-                height=120,
-                font_name="batang",
-                halign="left",
-                valign="top"
-            )
-            region_label.text_size = (self.width, None)  # 텍스트 정렬을 위해 필요
-            self.regions_layout.add_widget(region_label)
+        """바뀐 지역의 행만 다시 써서 지역 정보 패널 갱신"""
+        if self.state is not self._panel_state:
+            # 새 게임 / 불러오기로 상태가 바뀌면 전체를 다시 구성
+            if self._panel_state is not None:
+                self._panel_state.untrack_changes(self._dirty_regions)
+            self._panel_state = self.state
+            self._dirty_regions = self.state.track_changes()
+            self._region_rows = {name: i for i, name in enumerate(self.state.regions)}
+            self.regions_view.data = [region_info_row(r_obj) for r_obj in self.state.regions.values()]
+            return
+        
+        data = self.regions_view.data
+        for r_name in self._dirty_regions:
+            data[self._region_rows[r_name]] = region_info_row(self.state.regions[r_name])
+        self._dirty_regions.clear()
+
+    def request_refresh(self):
+        """지역 패널 갱신 예약 (한 프레임에 여러 번 불러도 갱신은 한 번)"""
+        self._refresh_trigger()
 
     def invest_agri_action(self, instance):
-        my_region = self.get_selected_region()
-        if not my_region:
-            self.info_label.text = "투자할 내 땅이 선택되지 않았습니다."
-            return
-        my_region.invest_agri()
-        self.info_label.text = f"{my_region.name} 농업투자 진행"
-        self.update_regions_info()
+        self.invest_action("agri", "농업")
     
     def invest_commerce_action(self, instance):
-        my_region = self.get_selected_region()
-        if not my_region:
-            self.info_label.text = "투자할 내 땅이 선택되지 않았습니다."
-            return
-        my_region.invest_commerce()
-        self.info_label.text = f"{my_region.name} 상업투자 진행"
-        self.update_regions_info()
+        self.invest_action("commerce", "상업")
     
     def invest_security_action(self, instance):
+        self.invest_action("security", "치안")
+    
+    def invest_action(self, kind, text):
         my_region = self.get_selected_region()
         if not my_region:
             self.info_label.text = "투자할 내 땅이 선택되지 않았습니다."
             return
-        my_region.invest_security()
-        self.info_label.text = f"{my_region.name} 치안투자 진행"
-        self.update_regions_info()
+        self.command_queue.add([("invest", my_region.name, kind, 1)], f"{my_region.name} {text}투자")
+    
+    def bulk_invest_action(self, kind):
+        from engine import ALL_REGIONS
+        text = {"agri": "농업", "commerce": "상업", "security": "치안"}[kind]
+        self.command_queue.add(
+            [("invest", ALL_REGIONS, kind, BULK_INVEST_COUNT)], f"전체 {text}투자 ×{BULK_INVEST_COUNT}"
+        )
     
     # ----------------------------------
     # 모병
@@ -450,134 +544,190 @@ class GameScreen(Screen):
         if not my_region:
             self.info_label.text = "모병할 내 땅이 선택되지 않았습니다."
             return
-        
-        recruit_amount = 10  # 예시로 10명
-        my_region.recruit_army(recruit_amount)
-        self.info_label.text = f"{my_region.name}에서 병사 {recruit_amount}명 모집"
-        
-        self.update_regions_info()
+        self.command_queue.add(
+            [("recruit", my_region.name, RECRUIT_AMOUNT)], f"{my_region.name}에서 병사 {RECRUIT_AMOUNT}명 모집"
+        )
+    
+    def recruit_max_action(self, instance):
+        from engine import MAX_AMOUNT
+        my_region = self.get_selected_region()
+        if not my_region:
+            self.info_label.text = "모병할 내 땅이 선택되지 않았습니다."
+            return
+        self.command_queue.add([("recruit", my_region.name, MAX_AMOUNT)], f"{my_region.name} 최대 모병")
+    
+    def recruit_max_all_action(self, instance):
+        from engine import ALL_REGIONS, MAX_AMOUNT
+        self.command_queue.add([("recruit", ALL_REGIONS, MAX_AMOUNT)], "전체 최대 모병")
     
     # ----------------------------------
     # 공격
     # ----------------------------------
+    @timed("ui.attack_action")
     def attack_action(self, instance):
+        self.command_queue.flush()
         my_region = self.get_selected_region()
         if not my_region:
             self.info_label.text = "공격할 내 땅이 선택되지 않았습니다."
             return
         
-        # 인접 지역 중에서 적 소유 찾기
-        neighbors = REGION_ADJACENCY.get(my_region.name, [])
-        enemy_regions = []
-        for nb_name in neighbors:
-            if self.regions[nb_name].owner != self.player_name:
-                enemy_regions.append(self.regions[nb_name])
+        self.state.checkpoint(limit=UNDO_LIMIT)
+        with phase("attack.battle"):
+            result = self.state.attack(my_region.name)
         
-        if not enemy_regions:
-            self.info_label.text = f"{my_region.name} 인접에 적 소유 지역 없음"
+        self.info_label.text = self.attack_result_text(my_region.name, result)
+        if result["result"] in ("no_enemy", "no_army"):
             return
-        
-        # 임시로 첫 번째 적 지역만 공격
-        target_region = enemy_regions[0]
-        
-        # 무작위로 점령/약탈 (실제로는 UI로 선택)
-        mode = random.choice(["occupy", "plunder"])
-        
-        attacker_soldiers = my_region.army
-        if attacker_soldiers <= 0:
-            self.info_label.text = "병력이 없습니다. 공격 불가!"
+        self.request_refresh()
+    
+    def attack_result_text(self, region_name, result):
+        if result["result"] == "no_enemy":
+            return f"{region_name} 인접에 적 소유 지역 없음"
+        if result["result"] == "no_army":
+            return "병력이 없습니다. 공격 불가!"
+        
+        if result["result"] == "occupy":
+            return (
+                f"[점령 성공]\n{region_name} → {result['target']} (소유자:{result['old_owner']} -> {self.state.player_name})"
+            )
+        if result["result"] == "plunder":
+            return (
+                f"[약탈 성공]\n{region_name} -> {result['target']}\n"
+                f"금 {result['stolen_gold']}, 식량 {result['stolen_food']} 약탈\n"
+                f"{result['target']} 치안 50% 감소"
+            )
+        # 실패 또는 서로 생존(수비 승)
+        return f"[공격 실패]\n공격군 생존:{result['att_after']}, 수비군 생존:{result['def_after']}"
+    
+    # ----------------------------------
+    # 행군 (내 영토를 지나 먼 적 지역 공격)
+    # ----------------------------------
+    def select_march_target_action(self, instance):
+        """누를 때마다 선택한 내 땅에서 MARCH_MAX_TURNS 턴 안에 닿는 적 지역을 가까운 순으로 순환"""
+        from engine import MARCH_MAX_TURNS
+        my_region = self.get_selected_region()
+        if not my_region:
+            self.info_label.text = "행군할 내 땅이 선택되지 않았습니다."
+            return
+        targets = list(self.state.reachable(my_region.name, MARCH_MAX_TURNS, enemies_only=True).items())
+        if not targets:
+            self.march_target_name = None
+            self.info_label.text = f"{my_region.name}에서 {MARCH_MAX_TURNS}턴 안에 닿는 적 지역이 없습니다."
+            return
+        self.march_target_index = self.march_target_index % len(targets)
+        self.march_target_name, turns = targets[self.march_target_index]
+        self.info_label.text = (
+            f"행군 목표: {self.march_target_name} ({turns}턴, 소유자:{self.state.regions[self.march_target_name].owner})"
+            f" [{self.march_target_index + 1}/{len(targets)}]"
+        )
+        self.march_target_index += 1
+    
+    def march_action(self, instance):
+        self.command_queue.flush()
+        my_region = self.get_selected_region()
+        if not my_region or not self.march_target_name:
+            self.info_label.text = "행군할 내 땅과 목표를 먼저 선택하세요."
             return
         
-        defender_soldiers = target_region.army
-        
-        att_after, def_after = do_battle_attack(attacker_soldiers, defender_soldiers)
-        my_region.army = att_after
-        target_region.army = def_after
-        
-        if att_after > 0 and def_after == 0:
-            # 승리
-            if mode == "occupy":
-                old_owner = target_region.owner
-                target_region.owner = self.player_name
-                self.info_label.text = (
-                    f"[점령 성공]\n{my_region.name} → {target_region.name} (소유자:{old_owner} -> {self.player_name})"
-                )
-            else:
-                # 약탈
-                stolen_gold = int(target_region.gold * 0.5)
-                stolen_food = int(target_region.food * 0.5)
-                target_region.gold -= stolen_gold
-                target_region.food -= stolen_food
-                target_region.security = int(target_region.security * 0.5)
-                
-                my_region.gold += stolen_gold
-                my_region.food += stolen_food
-                
-                self.info_label.text = (
-                    f"[약탈 성공]\n{my_region.name} -> {target_region.name}\n"
-                    f"금 {stolen_gold}, 식량 {stolen_food} 약탈\n"
-                    f"{target_region.name} 치안 50% 감소"
-                )
-        else:
-            # 실패 또는 서로 생존(수비 승)
-            self.info_label.text = f"[공격 실패]\n공격군 생존:{att_after}, 수비군 생존:{def_after}"
+        self.state.checkpoint(limit=UNDO_LIMIT)
+        with phase("attack.battle"):
+            result = self.state.march(my_region.name, self.march_target_name)
         
-        self.update_regions_info()
+        if result["result"] == "no_route":
+            self.info_label.text = f"{self.march_target_name}까지 내 땅으로 이어진 길이 없습니다."
+            return
+        if result["result"] == "no_supply":
+            self.info_label.text = f"행군 식량이 부족합니다. (필요 {result['supply']})"
+            return
+        path = " → ".join(result.get("path", ()))
+        self.info_label.text = f"[행군] {path}\n" + self.attack_result_text(result["attacker"], result)
+        if result["result"] != "no_army":
+            self.request_refresh()
+    
+    # ----------------------------------
+    # 되돌리기 / 미리보기
+    # ----------------------------------
+    def undo_action(self, instance):
+        self.command_queue.flush()
+        if not self.state.undo_depth:
+            self.info_label.text = "이번 턴에 되돌릴 행동이 없습니다."
+            return
+        self.state.rollback()
+        self.info_label.text = f"한 단계 되돌렸습니다. (남은 되돌리기 {self.state.undo_depth}번)"
+        self.request_refresh()
+    
+    def preview_attack_action(self, instance):
+        """공격 결과만 보여주고 상태는 그대로 (같은 공격을 하면 같은 결과가 나옴)"""
+        self.command_queue.flush()
+        my_region = self.get_selected_region()
+        if not my_region:
+            self.info_label.text = "공격할 내 땅이 선택되지 않았습니다."
+            return
+        with self.state.preview():
+            result = self.state.attack(my_region.name)
+        self.info_label.text = "[미리보기] " + self.attack_result_text(my_region.name, result)
+    
+    def preview_turn_action(self, instance):
+        """턴을 끝냈을 때 내 세력 합계가 어떻게 바뀌는지 (상태는 그대로)"""
+        self.command_queue.flush()
+        player = self.state.player_name
+        before = self.state.faction_summary(player)
+        with self.state.preview():
+            self.state.step()
+            after = self.state.faction_summary(player)
+        self.info_label.text = (
+            f"[턴 미리보기] 지역 {before['regions']} -> {after['regions']}, "
+            f"금 {before['gold']} -> {after['gold']}, 식량 {before['food']} -> {after['food']}, "
+            f"병력 {before['army']} -> {after['army']}"
+        )
     
     # ----------------------------------
     # 저장
     # ----------------------------------
+    @timed("ui.save_game")
     def save_game(self, instance):
-        data = {
-            "player_name": self.player_name,
-            "player_region_name": self.player_region_name,
-            "regions": {}
-        }
-        
-        for r_name, r_obj in self.regions.items():
-            data["regions"][r_name] = {
-                "owner": r_obj.owner,
-                "gold": r_obj.gold,
-                "food": r_obj.food,
-                "population": r_obj.population,
-                "agri": r_obj.agri,
-                "commerce": r_obj.commerce,
-                "security": r_obj.security,
-                "army": r_obj.army
-            }
-        
-        with open("savefile.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        self.info_label.text = "게임이 저장되었습니다."
+        self.command_queue.flush()
+        self.info_label.text = "저장 중..."
+        self.saver.save(self.state, on_done=self._on_save_done)
+    
+    def _on_save_done(self, error):
+        # 저장 작업 스레드에서 불리므로 화면 갱신은 메인 스레드로 넘김
+        Clock.schedule_once(lambda dt: self._show_save_result(error))
+    
+    def _show_save_result(self, error):
+        if error is None:
+            self.info_label.text = "게임이 저장되었습니다."
+        else:
+            self.info_label.text = f"저장 실패: {error}"
+    
+    # ----------------------------------
+    # 조언 (탐색 AI 가 추천하는 다음 행동)
+    # ----------------------------------
+    def advise_action(self, instance):
+        self.command_queue.flush()
+        from planner import Planner
+        if self.advisor is None or self.advisor.faction != self.state.player_name:
+            self.advisor = Planner(self.state.player_name, budget_ms=200)
+        _, text = self.advisor.advise(self.state)
+        self.info_label.text = f"[조언] {text}"
     
     # ----------------------------------
     # 턴 종료
     # ----------------------------------
+    @timed("ui.next_turn")
     def next_turn(self, instance):
-        # 1) 모든 지역 자원 갱신
-        for r_obj in self.regions.values():
-            r_obj.next_turn()
-        
-        # 2) AI 로직
-        for r_obj in self.regions.values():
-            if r_obj.owner == self.player_name:
-                continue
-            
-            # 자원이 충분하면 투자 or 모병
-            if r_obj.gold > 2000:
-                action = random.choice(["agri", "commerce", "security"])
-                if action == "agri":
-                    r_obj.invest_agri()
-                elif action == "commerce":
-                    r_obj.invest_commerce()
-                else:
-                    r_obj.invest_security()
-            elif r_obj.food > 2000 and r_obj.population > 1100:
-                r_obj.recruit_army(random.randint(5, 20))
+        self.command_queue.flush()
+        # 되돌리기는 한 턴 안에서만
+        self.state.commit()
+        self.state.step()
         
-        self.update_regions_info()
+        self.request_refresh()
         self.info_label.text = "다음 턴이 시작되었습니다."
+        
+        if self.autosave:
+            # 지난 저장 이후 바뀐 지역만 덧붙임 (완료 메시지는 띄우지 않음)
+            with phase("ui.autosave"):
+                self.saver.save(self.state, delta=True)
 
 # ----------------------
 # 불러오기 스크린
@@ -587,44 +737,117 @@ class LoadScreen(Screen):
         super().__init__(**kwargs)
         layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
         
-        load_btn = Button(text="파일 불러오기", font_name="batang")
+        load_btn = CachedButton(text="파일 불러오기", font_name="batang")
         load_btn.bind(on_release=self.load_game_file)
+        resume_btn = CachedButton(text="기록에서 이어하기", font_name="batang")
+        resume_btn.bind(on_release=self.resume_journal)
         
         self.info_label = Label(text="저장된 파일을 불러옵니다.", font_name="batang")
         
         layout.add_widget(self.info_label)
         layout.add_widget(load_btn)
+        layout.add_widget(resume_btn)
         
         self.add_widget(layout)
     
+    def save_path(self):
+        """게임 화면의 바이너리 세이브, 없으면 예전 JSON 세이브 (아직 쓰는 중인 저장이 있으면 끝난 뒤에)"""
+        from savegame import SAVE_PATH
+        game_screen = self.manager.get_screen("game")
+        with phase("load.wait_save"):
+            game_screen.saver.flush()
+        path = game_screen.saver.path
+        if not os.path.exists(path) and os.path.exists(SAVE_PATH):
+            path = SAVE_PATH
+        return path
+    
+    def on_pre_enter(self, *args):
+        # 세이브 요약 (바이너리 세이브는 헤더와 플레이어 지역 레코드만 읽음)
+        from savegame import describe_save
+        try:
+            summary = describe_save(self.save_path())
+        except ValueError as e:
+            summary = f"세이브를 읽을 수 없습니다: {e}"
+        self.info_label.text = summary or "세이브 파일이 없습니다."
+    
+    @timed("ui.load_game_file")
     def load_game_file(self, instance):
-        if not os.path.exists("savefile.json"):
+        from savegame import load_state
+        game_screen = self.manager.get_screen("game")
+        try:
+            # 세이브에 기록된 지도(map)로 불러옴 - 시나리오 파일이 없어졌으면 ValueError
+            state = load_state(self.save_path())
+        except ValueError as e:
+            self.info_label.text = f"불러오기 실패: {e}"
+            return
+        if state is None:
             self.info_label.text = "세이브 파일이 없습니다."
             return
         
-        with open("savefile.json", "r", encoding="utf-8") as f:
-            data = json.load(f)
+        game_screen.set_state(state)
         
+        self.manager.current = "game"
+    
+    def resume_journal(self, instance):
+        """journal 의 최근 스냅샷 + 뒤 기록만 재생해서 이어하기"""
+        from journal import Journal
         game_screen = self.manager.get_screen("game")
-        game_screen.player_name = data["player_name"]
-        game_screen.player_region_name = data["player_region_name"]
-        
-        for r_name, r_data in data["regions"].items():
-            if r_name not in game_screen.regions:
-                game_screen.regions[r_name] = Region(r_name)
-            
-            r_obj = game_screen.regions[r_name]
-            r_obj.owner = r_data["owner"]
-            r_obj.gold = r_data["gold"]
-            r_obj.food = r_data["food"]
-            r_obj.population = r_data["population"]
-            r_obj.agri = r_data["agri"]
-            r_obj.commerce = r_data["commerce"]
-            r_obj.security = r_data["security"]
-            r_obj.army = r_data["army"]
+        if game_screen.state is not None and game_screen.state.journal is not None:
+            # 지금 쓰고 있는 기록을 닫아야 끝까지 읽힘
+            game_screen.state.journal.close()
+        try:
+            state, _ = Journal.resume()
+        except ValueError as e:
+            # journal 이 아니거나 스냅샷이 없는 파일
+            self.info_label.text = f"이어하기 실패: {e}"
+            return
+        if state is None:
+            self.info_label.text = "기록 파일이 없습니다."
+            return
         
+        game_screen.set_state(state)
         self.manager.current = "game"
 
+# ----------------------
+# 성능 오버레이 (설정에서 켜고 끔)
+# ----------------------
+class PerfOverlay(Label):
+    """창 맨 위에 구간별 최근 시간 / 백분위를 주기적으로 표시 (매번 다른 글자라 텍스처 캐시는 안 씀)"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("font_size", 12)
+        kwargs.setdefault("halign", "left")
+        kwargs.setdefault("valign", "top")
+        kwargs.setdefault("color", (1, 1, 0, 1))
+        super().__init__(**kwargs)
+        self._event = None
+        self.bind(size=self._update_text_size)
+
+    def _update_text_size(self, instance, size):
+        self.text_size = size
+
+    @property
+    def shown(self):
+        return self._event is not None
+
+    def show(self):
+        if self.shown:
+            return
+        self.refresh()
+        Window.add_widget(self)
+        self._event = Clock.schedule_interval(self.refresh, 0.5)
+
+    def hide(self):
+        if not self.shown:
+            return
+        self._event.cancel()
+        self._event = None
+        Window.remove_widget(self)
+
+    def refresh(self, *args):
+        self.size = Window.size
+        self.text = (PROFILER.format_summary() or "(no samples)") + "\n" + TEXTURE_CACHE.format_stats()
+
 # ----------------------
 # 설정 스크린 (단순 예시)
 # ----------------------
@@ -633,15 +856,43 @@ class SettingsScreen(Screen):
         super().__init__(**kwargs)
         layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
         
-        label = Label(text="설정 화면입니다.", font_name="batang")
-        back_btn = Button(text="뒤로가기", font_name="batang")
+        self.info_label = Label(text="설정 화면입니다.", font_name="batang")
+        self.autosave_btn = CachedButton(text="자동저장: 끔", font_name="batang")
+        self.autosave_btn.bind(on_release=self.toggle_autosave)
+        self.overlay = PerfOverlay()
+        self.overlay_btn = CachedButton(text="성능 표시: 끔", font_name="batang")
+        self.overlay_btn.bind(on_release=self.toggle_overlay)
+        export_btn = CachedButton(text="성능 기록 내보내기", font_name="batang")
+        export_btn.bind(on_release=self.export_profile)
+        back_btn = CachedButton(text="뒤로가기", font_name="batang")
         back_btn.bind(on_release=self.go_back)
         
-        layout.add_widget(label)
+        layout.add_widget(self.info_label)
+        layout.add_widget(self.autosave_btn)
+        layout.add_widget(self.overlay_btn)
+        layout.add_widget(export_btn)
         layout.add_widget(back_btn)
         
         self.add_widget(layout)
     
+    def toggle_autosave(self, instance):
+        game_screen = self.manager.get_screen("game")
+        game_screen.autosave = not game_screen.autosave
+        self.autosave_btn.text = "자동저장: 켬" if game_screen.autosave else "자동저장: 끔"
+    
+    def toggle_overlay(self, instance):
+        if self.overlay.shown:
+            self.overlay.hide()
+        else:
+            self.overlay.show()
+        self.overlay_btn.text = "성능 표시: 켬" if self.overlay.shown else "성능 표시: 끔"
+    
+    def export_profile(self, instance):
+        # 백분위 요약(JSON) + chrome://tracing / Perfetto 에서 여는 trace
+        PROFILER.export_json(PROFILE_PATH)
+        PROFILER.export_chrome_trace(TRACE_PATH)
+        self.info_label.text = f"{PROFILE_PATH}, {TRACE_PATH} 에 저장했습니다."
+    
     def go_back(self, instance):
         self.manager.current = "main"
 
@@ -649,17 +900,45 @@ class SettingsScreen(Screen):
 # ScreenManager
 # ----------------------
 class HangukGameApp(App):
+    def __init__(self, scenario=None, **kwargs):
+        """scenario: scenario.Scenario (없으면 기본 14 지역 한반도)"""
+        super().__init__(**kwargs)
+        self._scenario = scenario
+    
+    @property
+    def scenario(self):
+        # 기본 지도는 처음 필요할 때 만든다 (메인 메뉴 전에는 engine 을 import 하지 않음)
+        if self._scenario is None:
+            from scenario import korea
+            self._scenario = korea()
+        return self._scenario
+    
     def build(self):
-        sm = ScreenManager()
+        # 메인 메뉴만 바로 만들고 나머지 화면은 처음 이동할 때 만든다
+        sm = LazyScreenManager()
         sm.add_widget(MainMenuScreen(name="main"))
-        sm.add_widget(StartRegionScreen(name="startregion"))
-        sm.add_widget(GameScreen(name="game"))
-        sm.add_widget(LoadScreen(name="load"))
-        sm.add_widget(SettingsScreen(name="settings"))
+        sm.add_lazy("startregion", StartRegionScreen)
+        sm.add_lazy("game", GameScreen)
+        sm.add_lazy("load", LoadScreen)
+        sm.add_lazy("settings", SettingsScreen)
+        warm_fonts()
         return sm
+    
+    def on_stop(self):
+        # 종료 전에 남은 저장 마무리 (게임 화면을 만든 적이 없으면 할 일 없음)
+        if not self.root.is_built("game"):
+            return
+        game_screen = self.root.get_screen("game")
+        game_screen.saver.flush()
+        if game_screen.state is not None and game_screen.state.journal is not None:
+            game_screen.state.journal.close()
 
 # ----------------------
 # 메인 실행
 # ----------------------
 if __name__ == "__main__":
-    HangukGameApp().run()
+    # python hgj.py [시나리오 파일]
+    import sys
+    from scenario import load_scenario
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
+    HangukGameApp(scenario=load_scenario(paths[0]) if paths else None).run()
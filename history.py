@@ -0,0 +1,339 @@
+"""
+턴별 통계 기록 (열 단위 배열)
+
+턴이 끝날 때마다 모든 지역의 소유자 / 금 / 식량 / 인구 / 병력을 미리 잡아 둔 NumPy 배열의
+한 행(row)에 복사한다. Region 객체를 턴마다 복사해 두지 않으므로 메모리는 배열 크기로 고정된다.
+
+  recent  : 최근 recent 턴은 빠짐없이 (링 버퍼, 가득 차면 가장 오래된 행을 덮어씀)
+  archive : 게임 전체를 stride 턴 간격으로. 가득 차면 한 행 걸러 버리고 stride 를 두 배로 늘린다
+            (그래서 긴 게임도 capacity 행 안에서 처음부터 지금까지 고르게 남는다)
+
+조회할 때는 archive 중 recent 보다 오래된 행 + recent 행을 턴 순서로 이어 붙인다.
+값은 float64 로 저장한다 (긴 게임에서는 식량 / 인구가 int64 범위를 넘으므로).
+
+    history = History.for_state(state)        # state.history 로 붙이면 step() 마다 기록
+    turns, gold = history.faction_series("김유진", "gold")
+    table = history.faction_table("regions")  # {세력: 턴별 지역 수}
+    history.dump("history.npz")               # 이어 붙인 시계열을 .npz 로
+    History.load("history.npz")
+
+directory 를 주면 배열을 그 폴더의 .npy 파일에 memmap 으로 만들어서 (np.lib.format.open_memmap)
+RAM 대신 디스크에 둔다. flush() 가 메타데이터(meta.json)를 쓰고, History.open(폴더) 로 다시 연다.
+"""
+import json
+import os
+
+import numpy as np
+
+HISTORY_FIELDS = ("gold", "food", "population", "army")
+# owner 배열에서 소유자가 없는 지역
+NO_OWNER = -1
+META_NAME = "meta.json"
+
+
+class _Columns:
+    """capacity 행짜리 열 배열 묶음: turn (행), owner (행 x 지역), 필드마다 (행 x 지역)"""
+
+    def __init__(self, capacity, n, fields, directory=None, prefix="", mode="w+"):
+        self.capacity = capacity
+        self.fields = fields
+
+        def make(name, shape, dtype):
+            if directory is None:
+                return np.zeros(shape, dtype=dtype)
+            path = os.path.join(directory, f"{prefix}{name}.npy")
+            if mode == "w+":
+                return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+            return np.load(path, mmap_mode=mode)
+
+        self.turn = make("turn", (capacity,), np.int64)
+        self.owner = make("owner", (capacity, n), np.int32)
+        self.values = {field: make(field, (capacity, n), np.float64) for field in fields}
+
+    def write(self, row, turn, owner, values):
+        self.turn[row] = turn
+        self.owner[row] = owner
+        for field in self.fields:
+            self.values[field][row] = values[field]
+
+    def move(self, src, dst):
+        """행 src 를 dst 로 복사 (downsample 압축용)"""
+        self.turn[dst] = self.turn[src]
+        self.owner[dst] = self.owner[src]
+        for column in self.values.values():
+            column[dst] = column[src]
+
+    def flush(self):
+        for array in (self.turn, self.owner, *self.values.values()):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+
+class History:
+    def __init__(self, names, capacity=512, recent=128, fields=HISTORY_FIELDS, directory=None):
+        if capacity < 2 or recent < 1:
+            raise ValueError("기록 크기는 capacity 2 이상, recent 1 이상이어야 합니다")
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.fields = tuple(fields)
+        self.directory = directory
+        self.factions = []      # owner 번호 -> 세력 이름
+        self._faction_ids = {}  # 세력 이름 -> owner 번호
+
+        n = len(self.names)
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.archive = _Columns(capacity, n, self.fields, directory, "archive.")
+        self.archive_len = 0
+        self.stride = 1
+        self.recent = _Columns(recent, n, self.fields, directory, "recent.")
+        self.recent_len = 0
+        self.recent_head = 0  # 다음에 쓸 recent 행
+        self.last_turn = None
+
+        self._regions = None
+        self._region_list = None
+
+    @classmethod
+    def for_state(cls, state, **kwargs):
+        """state 의 지역으로 만들고 state.history 에 붙인 뒤 지금 턴을 첫 행으로 기록"""
+        history = cls(list(state.regions), **kwargs)
+        state.history = history
+        history.record(state)
+        return history
+
+    @property
+    def nbytes(self):
+        total = 0
+        for columns in (self.archive, self.recent):
+            total += columns.turn.nbytes + columns.owner.nbytes
+            total += sum(column.nbytes for column in columns.values.values())
+        return total
+
+    # ----------------------------------
+    # 기록
+    # ----------------------------------
+    def record(self, state):
+        """
+        state 의 지금 값을 한 행으로 기록.
+        되돌리기로 턴이 거꾸로 갔으면 그 턴부터 뒤의 행을 먼저 버린다.
+        """
+        turn = state.turn
+        if self.last_turn is not None and turn <= self.last_turn:
+            self.truncate(turn)
+
+        regions = self._regions_of(state)
+        ids = self._faction_ids
+        owner = np.empty(len(regions), dtype=np.int32)
+        for i, r_obj in enumerate(regions):
+            o = r_obj.owner
+            if o is None:
+                owner[i] = NO_OWNER
+                continue
+            code = ids.get(o)
+            if code is None:
+                code = ids[o] = len(self.factions)
+                self.factions.append(o)
+            owner[i] = code
+        values = {
+            field: np.array([float(getattr(r, field)) for r in regions], dtype=np.float64)
+            for field in self.fields
+        }
+
+        recent = self.recent
+        recent.write(self.recent_head, turn, owner, values)
+        self.recent_head = (self.recent_head + 1) % recent.capacity
+        self.recent_len = min(self.recent_len + 1, recent.capacity)
+
+        if turn % self.stride == 0:
+            if self.archive_len == self.archive.capacity:
+                self._downsample()
+            # stride 가 늘었으면 이번 턴은 archive 에 안 들어갈 수도 있다
+            if turn % self.stride == 0:
+                self.archive.write(self.archive_len, turn, owner, values)
+                self.archive_len += 1
+        self.last_turn = turn
+
+    def _regions_of(self, state):
+        # 지역 이름 순서의 Region 리스트 (같은 regions dict 면 재사용)
+        if self._regions is not state.regions:
+            self._regions = state.regions
+            self._region_list = [state.regions[name] for name in self.names]
+        return self._region_list
+
+    def _downsample(self):
+        """archive 를 stride * 2 간격의 행만 남기고 앞으로 모음 (자리가 생길 때까지 반복)"""
+        archive = self.archive
+        while self.archive_len == archive.capacity:
+            self.stride *= 2
+            kept = 0
+            for row in range(self.archive_len):
+                if archive.turn[row] % self.stride == 0:
+                    if row != kept:
+                        archive.move(row, kept)
+                    kept += 1
+            self.archive_len = kept
+
+    def truncate(self, turn):
+        """turn 턴 이후(turn 포함)의 행을 버림"""
+        archive = self.archive
+        while self.archive_len and archive.turn[self.archive_len - 1] >= turn:
+            self.archive_len -= 1
+        recent = self.recent
+        while self.recent_len and recent.turn[(self.recent_head - 1) % recent.capacity] >= turn:
+            self.recent_head = (self.recent_head - 1) % recent.capacity
+            self.recent_len -= 1
+        turns = self.turns()
+        self.last_turn = int(turns[-1]) if len(turns) else None
+
+    def flush(self):
+        """memmap 배열과 메타데이터를 디스크에 기록 (directory 가 있을 때만)"""
+        if self.directory is None:
+            return
+        self.archive.flush()
+        self.recent.flush()
+        meta = {
+            "names": self.names, "fields": self.fields, "factions": self.factions,
+            "capacity": self.archive.capacity, "recent": self.recent.capacity,
+            "archive_len": self.archive_len, "stride": self.stride,
+            "recent_len": self.recent_len, "recent_head": self.recent_head,
+            "last_turn": self.last_turn,
+        }
+        tmp_path = os.path.join(self.directory, META_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(self.directory, META_NAME))
+
+    @classmethod
+    def open(cls, directory, mode="r+"):
+        """flush() 해 둔 memmap 기록 다시 열기 (mode="r" 이면 읽기 전용)"""
+        with open(os.path.join(directory, META_NAME), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        history = cls.__new__(cls)
+        history.names = meta["names"]
+        history.index = {name: i for i, name in enumerate(history.names)}
+        history.fields = tuple(meta["fields"])
+        history.directory = directory
+        history.factions = meta["factions"]
+        history._faction_ids = {name: i for i, name in enumerate(history.factions)}
+        n = len(history.names)
+        history.archive = _Columns(meta["capacity"], n, history.fields, directory, "archive.", mode)
+        history.archive_len = meta["archive_len"]
+        history.stride = meta["stride"]
+        history.recent = _Columns(meta["recent"], n, history.fields, directory, "recent.", mode)
+        history.recent_len = meta["recent_len"]
+        history.recent_head = meta["recent_head"]
+        history.last_turn = meta["last_turn"]
+        history._regions = None
+        history._region_list = None
+        return history
+
+    # ----------------------------------
+    # 조회
+    # ----------------------------------
+    def _rows(self):
+        """턴 순서로 이어 붙일 (archive 행 번호 배열, recent 행 번호 배열)"""
+        recent = self.recent
+        recent_rows = (np.arange(self.recent_len) + self.recent_head - self.recent_len) % recent.capacity
+        archive_rows = np.arange(self.archive_len)
+        if self.recent_len:
+            oldest = recent.turn[recent_rows[0]]
+            archive_rows = archive_rows[self.archive.turn[:self.archive_len] < oldest]
+        return archive_rows, recent_rows
+
+    def _window(self, turns, start, stop):
+        lo = 0 if start is None else np.searchsorted(turns, start, side="left")
+        hi = len(turns) if stop is None else np.searchsorted(turns, stop, side="left")
+        return slice(lo, hi)
+
+    def turns(self, start=None, stop=None):
+        """기록된 턴 번호 배열 (start <= 턴 < stop)"""
+        archive_rows, recent_rows = self._rows()
+        turns = np.concatenate([self.archive.turn[archive_rows], self.recent.turn[recent_rows]])
+        return turns[self._window(turns, start, stop)]
+
+    def matrix(self, field, start=None, stop=None):
+        """(턴 배열, 턴 x 지역 배열). field 는 기록한 필드 또는 "owner" (세력 번호, self.factions 참조)"""
+        archive_rows, recent_rows = self._rows()
+        turns = np.concatenate([self.archive.turn[archive_rows], self.recent.turn[recent_rows]])
+        window = self._window(turns, start, stop)
+        if field == "owner":
+            parts = (self.archive.owner[archive_rows], self.recent.owner[recent_rows])
+        elif field in self.fields:
+            parts = (self.archive.values[field][archive_rows], self.recent.values[field][recent_rows])
+        else:
+            raise ValueError(f"기록하지 않은 필드: {field}")
+        return turns[window], np.concatenate(parts)[window]
+
+    def region_series(self, name, field, start=None, stop=None):
+        """(턴 배열, 한 지역의 값 배열)"""
+        i = self.index.get(name)
+        if i is None:
+            raise ValueError(f"기록에 없는 지역: {name}")
+        turns, matrix = self.matrix(field, start, stop)
+        return turns, matrix[:, i]
+
+    def faction_series(self, faction, field, start=None, stop=None):
+        """
+        (턴 배열, 세력의 턴별 합계 배열). field 가 "regions" 면 턴별 소유 지역 수.
+        그 턴에 그 세력이 가진 지역의 값만 더한다 (지역이 없으면 0).
+        """
+        code = self._faction_ids.get(faction)
+        turns, owner = self.matrix("owner", start, stop)
+        if code is None:
+            return turns, np.zeros(len(turns))
+        mine = owner == code
+        if field == "regions":
+            return turns, mine.sum(axis=1)
+        _, values = self.matrix(field, start, stop)
+        return turns, np.where(mine, values, 0.0).sum(axis=1)
+
+    def faction_table(self, field, start=None, stop=None):
+        """
+        모든 세력의 시계열을 한 번에: (턴 배열, {세력: 턴별 합계 배열}).
+        행마다 세력 번호로 bincount 하므로 세력 수와 무관하게 배열 한 번 훑는 비용이다.
+        """
+        turns, owner = self.matrix("owner", start, stop)
+        n_factions = len(self.factions) + 1  # 마지막 칸 = 소유자 없음
+        codes = np.where(owner == NO_OWNER, n_factions - 1, owner)
+        codes = codes + (np.arange(len(turns)) * n_factions)[:, None]
+        if field == "regions":
+            weights = None
+        else:
+            weights = self.matrix(field, start, stop)[1].ravel()
+        sums = np.bincount(codes.ravel(), weights=weights, minlength=len(turns) * n_factions)
+        sums = sums.reshape(len(turns), n_factions)
+        return turns, {faction: sums[:, code] for code, faction in enumerate(self.factions)}
+
+    # ----------------------------------
+    # 내보내기
+    # ----------------------------------
+    def dump(self, path):
+        """이어 붙인 시계열 전체를 .npz 로 저장 (압축)"""
+        arrays = {"turn": self.turns(), "owner": self.matrix("owner")[1]}
+        for field in self.fields:
+            arrays[field] = self.matrix(field)[1]
+        np.savez_compressed(
+            path, names=np.array(self.names), factions=np.array(self.factions, dtype=str),
+            fields=np.array(self.fields), stride=self.stride, **arrays,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """dump() 한 .npz 를 History 로 (모든 행이 archive 에 들어간다)"""
+        with np.load(path) as data:
+            turns = data["turn"]
+            fields = tuple(data["fields"].tolist())
+            history = cls(data["names"].tolist(), capacity=max(2, len(turns)), recent=1,
+                          fields=fields)
+            history.factions = data["factions"].tolist()
+            history._faction_ids = {name: i for i, name in enumerate(history.factions)}
+            archive = history.archive
+            archive.turn[:len(turns)] = turns
+            archive.owner[:len(turns)] = data["owner"]
+            for field in fields:
+                archive.values[field][:len(turns)] = data[field]
+            history.archive_len = len(turns)
+            history.stride = int(data["stride"])
+            history.last_turn = int(turns[-1]) if len(turns) else None
+        return history
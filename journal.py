@@ -0,0 +1,283 @@
+"""
+턴 기록(journal) + 주기적 스냅샷 / 재생
+
+GameState.journal 에 Journal 을 붙이면 모든 명령(invest / recruit / orders / attack / march / step)이
+실제로 나온 난수 결과와 함께 한 줄씩 덧붙여진다. (append-only JSON Lines)
+
+  {"cmd": "start", "version": 1, "player_name": ..., "player_region_name": ..., "seed": ...,
+   "deterministic": false, "turn": ..., "map": null}
+  {"cmd": "invest", "region": ..., "kind": ..., "ok": true}
+  {"cmd": "recruit", "region": ..., "amount": 10, "ok": true}
+  {"cmd": "orders", "owner": ..., "orders": [["invest", 지역, 종류, 횟수], ["recruit", 지역, 인원], ...], "result": "ok"}
+  {"cmd": "attack", "region": ..., "target": ..., "mode": "occupy", "result": "fail"}
+  {"cmd": "march", "region": ..., "target": ..., "mode": "plunder", "max_turns": 5, "result": "plunder"}
+  {"cmd": "step", "turn": 3, "ai": [[지역, "invest", 종류], [지역, "recruit", 인원], ...], "hash": ...}
+  {"cmd": "fast_forward", "n": 10, "names": null, "turn": 13, "hash": ...}
+  {"cmd": "checkpoint", "limit": 20} / {"cmd": "rollback", "levels": 1, "turn": 13} / {"cmd": "commit"}
+
+attack 은 무작위로 고른 점령/약탈과 대상을, step 은 AI 가 정한 행동 전체를 기록하므로
+재생할 때는 난수를 전혀 쓰지 않고 같은 결과가 나온다. (탐색 플래너 세력의 행동은 명령으로 따로 기록됨)
+결정적 모드(GameState.deterministic) 게임은 턴이 끝날 때의 상태 해시(hash)도 기록되므로
+재생하면서 턴마다 해시를 비교해 처음 어긋난 턴을 바로 찾는다.
+
+snapshot_every 턴마다 그 시점 상태를 binsave 바이너리 형식으로 "<journal>.<오프셋>.snap" 에 쓴다.
+오프셋은 스냅샷 이후 기록이 시작되는 journal 의 바이트 위치다.
+이어하기(resume)는 가장 최근 스냅샷을 읽고 그 오프셋부터 끝까지만 재생한다.
+스냅샷은 헤더의 map (scenario.Scenario.source, 없으면 기본 한반도) 으로 되살린 지도 위에 올린다.
+전체 재생(replay)은 처음 스냅샷부터 모든 기록을 화면 없이 적용하고, verify=True 면
+명령 결과와 중간 스냅샷들이 기록과 같은지 확인한다.
+
+    python journal.py replay [campaign.journal]   (전체 재생 + 검증, 속도 출력)
+    python journal.py resume [campaign.journal]   (최근 스냅샷 + 꼬리 재생)
+"""
+import glob
+import json
+import os
+import sys
+import time
+
+import binsave
+from savegame import write_atomic
+from scenario import map_adjacency
+
+JOURNAL_PATH = "campaign.journal"
+VERSION = 1
+
+
+def snapshot_path(path, offset):
+    return f"{path}.{offset:012d}.snap"
+
+
+def list_snapshots(path):
+    """[(오프셋, 스냅샷 경로), ...] 오프셋 순서"""
+    snaps = []
+    for snap in glob.glob(glob.escape(path) + ".*.snap"):
+        offset = snap[len(path) + 1:-len(".snap")]
+        if offset.isdigit():
+            snaps.append((int(offset), snap))
+    snaps.sort()
+    return snaps
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        header = json.loads(f.readline())
+    if header.get("cmd") != "start":
+        raise ValueError(f"{path}: journal 파일이 아닙니다")
+    if header["version"] > VERSION:
+        raise ValueError(f"지원하지 않는 journal 버전: {header['version']}")
+    return header
+
+
+def iter_entries(path, offset):
+    """offset 부터 (기록, 그 줄 끝 오프셋) 을 순서대로. 쓰다가 끊긴 마지막 줄은 무시"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            offset += len(line)
+            yield entry, offset
+
+
+def apply_entry(state, entry):
+    """기록 하나를 state 에 적용. 결과가 기록과 같으면 True"""
+    cmd = entry["cmd"]
+    if cmd == "step":
+        state.step(intents=entry["ai"])
+        return state.turn == entry["turn"] and _hash_matches(state, entry)
+    if cmd == "fast_forward":
+        state.fast_forward(entry["n"], entry["names"])
+        return state.turn == entry["turn"] and _hash_matches(state, entry)
+    if cmd == "march":
+        result = state.march(entry["region"], entry["target"], mode=entry["mode"],
+                             max_turns=entry["max_turns"])
+        return result["result"] == entry["result"]
+    if cmd == "checkpoint":
+        state.checkpoint(entry["limit"])
+        return True
+    if cmd == "rollback":
+        state.rollback(entry["levels"])
+        return state.turn == entry["turn"]
+    if cmd == "commit":
+        state.commit()
+        return True
+    if cmd == "invest":
+        return state.invest(entry["region"], entry["kind"]) == entry["ok"]
+    if cmd == "recruit":
+        return state.recruit(entry["region"], entry["amount"]) == entry["ok"]
+    if cmd == "attack":
+        result = state.attack(entry["region"], mode=entry["mode"], target=entry["target"])
+        return result["result"] == entry["result"]
+    if cmd == "orders":
+        if entry["result"] != "ok":
+            # 거절된 대량 명령은 아무것도 바꾸지 않았음
+            return True
+        result = state.orders(entry["owner"], [tuple(order) for order in entry["orders"]])
+        return result["result"] == "ok"
+    raise ValueError(f"알 수 없는 journal 기록: {cmd}")
+
+
+def _hash_matches(state, entry):
+    # 해시는 결정적 모드 기록에만 있다
+    return "hash" not in entry or state.state_hash() == entry["hash"]
+
+
+def _load_snapshot(snap, header, rng=None):
+    with binsave.BinarySave.open(snap) as save:
+        return save.to_state(rng=rng, adjacency=map_adjacency(header.get("map")))
+
+
+# ----------------------------------
+# 기록
+# ----------------------------------
+class Journal:
+    """
+    GameState 에 붙어서 명령을 기록하는 append-only 파일.
+    새로 시작할 때는 create(), 이어서 쓸 때는 resume() 으로 만든다.
+    """
+
+    def __init__(self, state, path=JOURNAL_PATH, snapshot_every=50, keep_snapshots=2):
+        self.state = state
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.keep_snapshots = keep_snapshots  # 처음 스냅샷 외에 남겨 둘 최근 스냅샷 수
+        self._file = open(path, "ab")
+        self._last_snapshot_turn = state.turn
+        state.journal = self
+
+    @classmethod
+    def create(cls, state, path=JOURNAL_PATH, **kwargs):
+        """state 의 현재 상태부터 새 journal 을 시작 (같은 경로의 예전 기록은 지움)"""
+        for _, snap in list_snapshots(path):
+            os.remove(snap)
+        header = {
+            "cmd": "start", "version": VERSION,
+            "player_name": state.player_name, "player_region_name": state.player_region_name,
+            "seed": state.seed, "deterministic": state.deterministic, "turn": state.turn,
+            "map": state.map_source,
+        }
+        write_atomic(path, json.dumps(header, ensure_ascii=False) + "\n")
+        journal = cls(state, path, **kwargs)
+        journal.snapshot()
+        return journal
+
+    @classmethod
+    def resume(cls, path=JOURNAL_PATH, rng=None, **kwargs):
+        """
+        가장 최근 스냅샷 + 그 뒤 기록만 재생해서 (GameState, Journal) 반환. 파일이 없으면 (None, None).
+        끊긴 마지막 줄은 잘라내고 그 자리부터 이어 쓴다.
+        """
+        if not os.path.exists(path):
+            return None, None
+        header = read_header(path)
+        size = os.path.getsize(path)
+        snaps = [(offset, snap) for offset, snap in list_snapshots(path) if offset <= size]
+        if not snaps:
+            raise ValueError(f"{path}: 스냅샷이 없습니다")
+        offset, snap = snaps[-1]
+        state = _load_snapshot(snap, header, rng)
+
+        end = offset
+        for entry, end in iter_entries(path, offset):
+            apply_entry(state, entry)
+        if end < size:
+            with open(path, "r+b") as f:
+                f.truncate(end)
+        return state, cls(state, path, **kwargs)
+
+    def record(self, entry):
+        """GameState 명령이 끝난 직후 불림 (state 는 이미 이 기록까지 반영된 상태)"""
+        self._file.write(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._file.flush()
+        # 되돌리기 지점이 남아 있으면 스냅샷에 담기지 않으므로 (이어하기 후 rollback 불가) 모두 확정된 뒤에 찍는다
+        if (entry["cmd"] in ("step", "fast_forward", "commit") and not self.state.undo_depth
+                and self.state.turn - self._last_snapshot_turn >= self.snapshot_every):
+            self.snapshot()
+
+    def snapshot(self):
+        """현재 상태를 스냅샷으로 저장하고 오래된 스냅샷 정리"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        offset = self._file.tell()
+        binsave.write_binary(snapshot_path(self.path, offset), self.state.to_dict())
+        self._last_snapshot_turn = self.state.turn
+
+        # 처음 스냅샷(전체 재생 시작점)과 최근 keep_snapshots 개만 남김
+        snaps = list_snapshots(self.path)
+        for _, snap in snaps[1:-self.keep_snapshots]:
+            os.remove(snap)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.state.journal is self:
+            self.state.journal = None
+
+
+# ----------------------------------
+# 재생
+# ----------------------------------
+def replay(path=JOURNAL_PATH, verify=False, until_turn=None, rng=None):
+    """
+    처음 스냅샷부터 기록 전체를 화면 없이 재생한 GameState 반환.
+    until_turn 을 주면 그 턴이 시작되는 시점에서 멈춘다.
+    verify=True 면 명령 결과와 남아 있는 중간 스냅샷들을 비교해 다르면 ValueError.
+    """
+    header = read_header(path)
+    snaps = list_snapshots(path)
+    if not snaps:
+        raise ValueError(f"{path}: 스냅샷이 없습니다")
+    offset, snap = snaps[0]
+    state = _load_snapshot(snap, header, rng)
+    checkpoints = dict(snaps[1:]) if verify else {}
+
+    count = 0
+    for entry, offset in iter_entries(path, offset):
+        if until_turn is not None and state.turn >= until_turn:
+            break
+        if not apply_entry(state, entry) and verify:
+            if "hash" in entry:
+                raise ValueError(f"{entry['turn']} 턴 상태 해시가 다릅니다 "
+                                 f"(기록 {entry['hash']}, 재생 {state.state_hash()})")
+            raise ValueError(f"{count + 1}번째 기록의 재생 결과가 다릅니다: {entry}")
+        count += 1
+        snap = checkpoints.get(offset)
+        if snap is not None:
+            with binsave.BinarySave.open(snap) as save:
+                expected = save.to_dict()
+            if state.to_dict() != expected:
+                raise ValueError(f"{state.turn} 턴 스냅샷과 재생 결과가 다릅니다")
+    return state
+
+
+def main(argv):
+    if not argv or argv[0] not in ("replay", "resume") or len(argv) > 2:
+        print(__doc__)
+        return 2
+    path = argv[1] if len(argv) == 2 else JOURNAL_PATH
+    start = time.perf_counter()
+    if argv[0] == "replay":
+        state = replay(path, verify=True)
+        elapsed = time.perf_counter() - start
+        turns = state.turn - read_header(path)["turn"]
+        print(f"재생 완료: {turns} 턴, {elapsed:.3f}초 ({turns / max(elapsed, 1e-9):.0f} 턴/초), 검증 통과")
+        print(f"상태 해시: {state.state_hash()}")
+    else:
+        state, journal = Journal.resume(path)
+        if state is None:
+            print(f"{path} 이 없습니다")
+            return 1
+        journal.close()
+        elapsed = time.perf_counter() - start
+        print(f"이어하기: {state.turn} 턴, {elapsed:.3f}초")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
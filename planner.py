@@ -0,0 +1,297 @@
+"""
+탐색 기반 AI 플래너 (MCTS)
+
+한 세력의 투자 / 모병 / 공격(점령·약탈) / 행군 공격 / 턴 종료 행동을 몬테카를로 트리 탐색으로 고른다.
+forward model 은 GameState.clone() 위에서 실제 명령(invest / recruit / attack)과 step()
+(= Region.next_turn 경제 틱 + 규칙 AI, 전투는 do_battle_attack) 을 그대로 돌린다.
+
+- 상태 복제는 탐색마다 한 번이고, 반복(iteration)마다 GameState.preview() 로 바뀐 지역만 되돌린다.
+- 한 번의 탐색은 시작(지문 계산 / 복제 포함)부터 budget_ms 밀리초가 지나면 멈춘다. 반복 안에서도
+  행동 / step() 마다 시간을 확인하고 지났으면 그 반복을 버린다. 명령이나 step() 은 중간에 끊을 수
+  없으므로 넘치는 시간은 그 하나와 미리보기 되돌리기까지다. (2만 지역 지도에서는 step() 한 번이
+  50ms 를 넘어서 budget_ms=50 이면 반복이 하나도 끝나지 못하고 턴 종료만 추천한다)
+- 트리는 행동 순서로만 이어지는 open-loop 트리이고, 턴 종료 뒤 다음 턴의 결정까지 이어진다.
+  턴 종료 노드마다 처음 도달한 상태의 지문(fingerprint)을 기록해 두었다가, 다음 턴 실제 상태의
+  지문과 같은 노드가 있으면 그 노드를 새 루트로 삼아 통계를 이어 쓴다.
+  (GameState.seed 를 쓰는 결정적 게임에서는 대부분 이어진다)
+- AI 세력: GameState.ai_planners[세력] = Planner(세력) 로 등록하면 step() 에서 play() 가 불린다.
+  탐색 중 복제본에서 플래너 세력들은 트리가 고른 행동 외에는 아무것도 하지 않는다.
+- 플레이어 조언: advise(state) 가 추천 행동과 설명 문장을 돌려준다.
+"""
+import math
+import random
+import time
+
+import engine
+
+END = ("end",)
+INVEST_KINDS = ("agri", "commerce", "security")
+RECRUIT_AMOUNTS = (10, 50)
+
+INVEST_TEXT = {"agri": "농업", "commerce": "상업", "security": "치안"}
+
+
+def legal_actions(state, faction, march_turns=0):
+    """
+    faction 이 지금 할 수 있는 행동 리스트 (END 포함).
+    march_turns >= 2 면 내 영토를 지나 그 턴 수 안에 닿는 (인접하지 않은) 적 지역 행군 공격도 포함.
+    """
+    actions = [END]
+    for r_obj in state.owned_regions(faction):
+        if r_obj.gold >= engine.INVEST_COST:
+            for kind in INVEST_KINDS:
+                actions.append(("invest", r_obj.name, kind))
+        for amount in RECRUIT_AMOUNTS:
+            if r_obj.food >= amount * engine.RECRUIT_FOOD_COST and r_obj.population >= amount:
+                actions.append(("recruit", r_obj.name, amount))
+    for attacker, target in state.frontier_pairs(faction):
+        if attacker.army > 0:
+            for mode in ("occupy", "plunder"):
+                actions.append(("attack", attacker.name, target.name, mode))
+    if march_turns >= 2:
+        for r_obj in state.owned_regions(faction):
+            if r_obj.army <= 0:
+                continue
+            for target, turns in state.reachable(r_obj.name, march_turns, enemies_only=True).items():
+                if turns >= 2:
+                    for mode in ("occupy", "plunder"):
+                        actions.append(("march", r_obj.name, target, mode))
+    return actions
+
+
+def apply_action(state, action):
+    """행동 하나를 GameState 명령으로 실행. END 는 턴 종료(step)"""
+    kind = action[0]
+    if kind == "invest":
+        return state.invest(action[1], action[2])
+    if kind == "recruit":
+        return state.recruit(action[1], action[2])
+    if kind == "attack":
+        return state.attack(action[1], mode=action[3], target=action[2])
+    if kind == "march":
+        return state.march(action[1], action[2], mode=action[3])
+    if kind == "end":
+        return state.step()
+    raise ValueError(f"알 수 없는 행동: {action}")
+
+
+def describe_action(action):
+    kind = action[0]
+    if kind == "invest":
+        return f"{action[1]} {INVEST_TEXT[action[2]]}투자"
+    if kind == "recruit":
+        return f"{action[1]}에서 병사 {action[2]}명 모집"
+    if kind == "attack":
+        mode = "점령" if action[3] == "occupy" else "약탈"
+        return f"{action[1]} → {action[2]} 공격 ({mode})"
+    if kind == "march":
+        mode = "점령" if action[3] == "occupy" else "약탈"
+        return f"{action[1]}에서 {action[2]}까지 행군 공격 ({mode})"
+    return "턴 종료"
+
+
+def evaluate(state, faction):
+    """세력 점수: 지역 수 위주 + 병력 + 자원 (세력 합계 색인에서 바로 읽음)"""
+    s = state.faction_summary(faction)
+    return 1000 * s["regions"] + 2 * s["army"] + s["gold"] / 10 + s["food"] / 30
+
+
+def fingerprint(state):
+    return hash((state.turn, tuple(
+        (r.owner, r.gold, r.food, r.population, r.agri, r.commerce, r.security, r.army)
+        for r in state.regions.values()
+    )))
+
+
+def _expired(deadline):
+    return deadline is not None and time.perf_counter() >= deadline
+
+
+def _discard(expanded):
+    # 방문 0 인 노드가 남으면 UCB 계산에서 0 으로 나누게 되므로 떼어 냄
+    if expanded is not None:
+        node, action = expanded
+        del node.children[action]
+    return False
+
+
+class Node:
+    __slots__ = ("children", "visits", "value", "fingerprint")
+
+    def __init__(self):
+        self.children = {}  # 행동 -> Node
+        self.visits = 0
+        self.value = 0.0
+        self.fingerprint = None  # 턴 종료 노드: 처음 도달한 상태 지문 (다르게 도달하면 False)
+
+
+class Planner:
+    def __init__(self, faction, budget_ms=50, max_actions=3, tree_turns=2, rollout_turns=2,
+                 exploration=1.4, seed=0, march_turns=3, iterations=None):
+        self.faction = faction
+        self.budget_ms = budget_ms
+        # 주면 시간 대신 반복 수로 탐색 (같은 seed 면 같은 행동 - GameState 결정적 모드용)
+        self.iterations = iterations
+        self.max_actions = max_actions      # 한 턴에 트리에서 고려하는 최대 행동 수
+        self.tree_turns = tree_turns        # 트리가 이어지는 턴 수 (그 뒤는 rollout)
+        self.rollout_turns = rollout_turns  # 트리 끝에서 규칙 AI 로 더 진행할 턴 수
+        self.exploration = exploration
+        self.march_turns = march_turns      # 행군 공격을 고려할 최대 거리 (0 이면 인접 공격만)
+        self.rng = random.Random(seed)
+
+        self.root = None
+        self.root_fingerprint = None
+        self._by_fingerprint = {}  # 지문 -> 턴 종료 노드 (다음 턴 루트 후보)
+        self.last_iterations = 0
+
+    # ----------------------------------
+    # 탐색
+    # ----------------------------------
+    def search(self, state, budget_ms=None):
+        """state 에서 budget_ms 동안 (iterations 가 있으면 그 횟수만큼) 탐색하고 루트 노드를 반환"""
+        if budget_ms is None:
+            budget_ms = self.budget_ms
+        # 반복 수가 정해져 있으면 시간과 무관하게 끝까지 (결과가 기기 속도에 따라 달라지지 않게)
+        deadline = None if self.iterations is not None else time.perf_counter() + budget_ms / 1000.0
+
+        fp = fingerprint(state)
+        if self.root is None or self.root_fingerprint != fp:
+            # 지난 탐색에서 이 상태에 도달한 턴 종료 노드가 있으면 그 통계를 이어 씀
+            self.root = self._by_fingerprint.get(fp) or Node()
+            self.root_fingerprint = fp
+            self._by_fingerprint = {}
+
+        self.last_iterations = 0
+        if _expired(deadline):
+            return self.root
+        base = evaluate(state, self.faction)
+        scale = abs(base) + 1.0
+        # 복제는 탐색마다 한 번만 하고, 반복마다 preview() 로 바뀐 지역만 되돌린다
+        sim = state.clone()
+        iterations = 0
+        while iterations < self.iterations if deadline is None else not _expired(deadline):
+            if not self._iterate(sim, base, scale, deadline):
+                break
+            iterations += 1
+        self.last_iterations = iterations
+        return self.root
+
+    def _iterate(self, sim, base, scale, deadline):
+        sim.rng = random.Random(self.rng.random())
+        planners = dict(sim.ai_planners)
+        with sim.preview():
+            done = self._simulate(sim, base, scale, deadline)
+        sim.ai_planners = planners
+        return done
+
+    def _simulate(self, sim, base, scale, deadline):
+        """반복 하나. deadline 이 지나면 중간에 멈추고 False (이번에 펼친 노드는 떼어 내고 통계에 반영하지 않음)"""
+        node = self.root
+        path = [node]
+        expanded = None
+        turn_actions = 0
+        turns = 0
+
+        while turns < self.tree_turns:
+            if _expired(deadline):
+                return _discard(expanded)
+            if turn_actions >= self.max_actions:
+                actions = [END]
+            else:
+                actions = legal_actions(sim, self.faction, self.march_turns)
+            untried = [a for a in actions if a not in node.children]
+            if untried:
+                # 턴 종료를 먼저 펼쳐 두면 어느 노드에서 멈춰도 다음 턴 루트 후보가 생긴다
+                action = END if END in untried else self.rng.choice(untried)
+                child = node.children[action] = Node()
+                expanded = (node, action)
+            else:
+                action, child = self._select(node, actions)
+
+            apply_action(sim, action)
+            path.append(child)
+            node = child
+            if action == END:
+                turns += 1
+                turn_actions = 0
+                self._record_fingerprint(node, sim)
+            else:
+                turn_actions += 1
+            if untried:
+                break
+
+        # rollout: 남은 턴은 규칙 AI 로 진행 (이 세력도 규칙 AI 로)
+        sim.ai_planners.pop(self.faction, None)
+        for _ in range(self.rollout_turns):
+            if _expired(deadline):
+                return _discard(expanded)
+            sim.step()
+
+        value = (evaluate(sim, self.faction) - base) / scale
+        for n in path:
+            n.visits += 1
+            n.value += value
+        return True
+
+    def _select(self, node, actions):
+        log_n = math.log(node.visits + 1)
+        best = None
+        best_score = -math.inf
+        for action in actions:
+            child = node.children[action]
+            score = child.value / child.visits + self.exploration * math.sqrt(log_n / child.visits)
+            if score > best_score:
+                best, best_score = action, score
+        return best, node.children[best]
+
+    def _record_fingerprint(self, node, sim):
+        if node.fingerprint is False:
+            return
+        fp = fingerprint(sim)
+        if node.fingerprint is None:
+            node.fingerprint = fp
+        elif node.fingerprint != fp:
+            # 같은 행동 순서로 다른 상태에 도달 (무작위 요소) -> 루트 재사용 후보에서 제외
+            node.fingerprint = False
+            self._by_fingerprint.pop(fp, None)
+            return
+        self._by_fingerprint[fp] = node
+
+    # ----------------------------------
+    # 결과 사용
+    # ----------------------------------
+    def plan(self, state, budget_ms=None):
+        """이번 턴에 할 행동 순서 (방문 수가 가장 많은 자식을 따라감, END 로 끝남)"""
+        root = self.search(state, budget_ms)
+        plan = []
+        node = root
+        while len(plan) < self.max_actions:
+            if not node.children:
+                break
+            action, child = max(node.children.items(), key=lambda item: item[1].visits)
+            if child.visits < 2 and action != END:
+                # 한 번밖에 안 가 본 행동은 믿지 않고 여기서 턴을 끝냄
+                break
+            plan.append(action)
+            node = child
+            if action == END:
+                return plan
+        plan.append(END)
+        return plan
+
+    def best_action(self, state, budget_ms=None):
+        return self.plan(state, budget_ms)[0]
+
+    def play(self, state, budget_ms=None):
+        """AI 세력으로서 이번 턴 행동을 실제 state 에 적용 (END 는 적용하지 않음)"""
+        plan = self.plan(state, budget_ms)
+        for action in plan:
+            if action == END:
+                break
+            apply_action(state, action)
+        return plan
+
+    def advise(self, state, budget_ms=None):
+        """플레이어 조언: (추천 행동, 설명 문장)"""
+        action = self.best_action(state, budget_ms)
+        return action, describe_action(action)
@@ -0,0 +1,152 @@
+"""
+구간(phase)별 시간 측정
+
+    with profiler.phase("turn.economy"):
+        ...
+
+    @profiler.timed("ui.next_turn")
+    def next_turn(self, instance): ...
+
+이름마다 최근 window 개의 측정값을 남겨 두고 p50 / p90 / p99 를 계산한다.
+측정 구간들은 Chrome trace 이벤트로도 쌓이므로 (최근 max_events 개)
+export_chrome_trace() 로 저장한 파일을 chrome://tracing 이나 Perfetto 에서 열 수 있다.
+스레드별로 기록되므로 백그라운드 저장 스레드의 구간도 따로 보인다.
+
+측정은 perf_counter 두 번과 deque append 정도라서 항상 켜 두어도 된다.
+(enabled = False 면 아무것도 기록하지 않음)
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+PERCENTILES = (50, 90, 99)
+PROFILE_PATH = "profile.json"
+TRACE_PATH = "profile.trace.json"
+
+
+class Profiler:
+    def __init__(self, window=256, max_events=20000):
+        self.enabled = True
+        self.window = window
+        self._samples = {}  # 이름 -> deque(초)
+        self._counts = {}   # 이름 -> 전체 측정 횟수
+        self._events = deque(maxlen=max_events)  # (이름, 시작 초, 길이 초, 스레드 id)
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, start)
+
+    def record(self, name, seconds, start=None):
+        if start is None:
+            start = time.perf_counter() - seconds
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                self._counts[name] = 0
+            samples.append(seconds)
+            self._counts[name] += 1
+            self._events.append((name, start - self._origin, seconds, threading.get_ident()))
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._events.clear()
+            self._origin = time.perf_counter()
+
+    # ----------------------------------
+    # 통계
+    # ----------------------------------
+    def stats(self, name):
+        """최근 측정값 기준 {"count", "last", "mean", "p50", "p90", "p99", "max"} (밀리초)"""
+        with self._lock:
+            samples = list(self._samples.get(name, ()))
+            count = self._counts.get(name, 0)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        n = len(ordered)
+        result = {
+            "count": count,
+            "last": samples[-1] * 1000,
+            "mean": sum(ordered) / n * 1000,
+            "max": ordered[-1] * 1000,
+        }
+        for p in PERCENTILES:
+            # nearest-rank
+            result[f"p{p}"] = ordered[min(n - 1, max(0, -(-p * n // 100) - 1))] * 1000
+        return result
+
+    def summary(self):
+        """이름 순서로 {이름: stats}"""
+        with self._lock:
+            names = sorted(self._samples)
+        return {name: self.stats(name) for name in names}
+
+    def format_summary(self):
+        """오버레이용 한 줄씩 텍스트"""
+        lines = []
+        for name, s in self.summary().items():
+            lines.append(
+                f"{name:24s} last {s['last']:7.2f}  p50 {s['p50']:7.2f}  "
+                f"p90 {s['p90']:7.2f}  p99 {s['p99']:7.2f} ms"
+            )
+        return "\n".join(lines)
+
+    # ----------------------------------
+    # 내보내기
+    # ----------------------------------
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"window": self.window, "phases": self.summary()}, f, ensure_ascii=False, indent=2)
+
+    def chrome_trace(self):
+        """Chrome trace event 형식 dict (완료 이벤트 "X", 마이크로초)"""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+        return {
+            "traceEvents": [
+                {"name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": tid,
+                 "ts": start * 1e6, "dur": seconds * 1e6}
+                for name, start, seconds, tid in events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def export_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+
+# 게임 전체에서 같이 쓰는 측정기
+PROFILER = Profiler()
+
+
+def phase(name):
+    return PROFILER.phase(name)
+
+
+def timed(name):
+    """함수 전체를 name 구간으로 측정하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with PROFILER.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,278 @@
+"""
+게임 저장 / 불러오기 (게임 화면은 savefile.hgjb, 예전 세이브는 savefile.json)
+
+- 저장할 값은 호출한 스레드(Kivy 메인 스레드)에서 가볍게 복사(snapshot)만 하고,
+  JSON 직렬화와 파일 쓰기는 작업 스레드 하나에서 순서대로 처리한다.
+- 전체 저장은 임시 파일에 쓴 뒤 os.replace 로 바꿔치기하므로 쓰는 도중에 죽어도
+  기존 세이브 파일이 깨지지 않는다.
+- binary=True 면 전체 저장을 binsave 의 바이너리 형식으로 쓴다 (불러오기는 두 형식 모두 자동 판별).
+  바이너리 세이브는 JSON 을 거치지 않고 레코드에서 바로 GameState 를 만든다.
+  (색인 / 전선 / 지역 패널이 모든 지역을 읽으므로 GameState 는 한 번에 모두 푼다.
+  지연 로딩은 describe_save() 처럼 일부 지역만 보면 되는 곳에서 쓴다)
+- 부분(delta) 저장은 지난 저장 이후 바뀐 지역만 "<세이브>.delta" 파일에 한 줄씩 덧붙인다.
+  불러올 때는 전체 저장 위에 delta 줄들을 순서대로 덮어쓴다. (쓰다가 끊긴 줄은 건너뜀)
+  delta 가 compact_every 번 쌓이거나 저장이 한 번이라도 실패하면 다음 저장은 전체 저장으로 바뀐다.
+  (실패한 delta 의 지역은 다음 delta 에 다시 들어가지 않으므로, 실패 뒤의 delta 는 쓰지 않는다)
+"""
+import json
+import os
+import queue
+import threading
+import uuid
+
+import binsave
+from profiler import phase
+from engine import GameState
+
+SAVE_PATH = "savefile.json"
+BINARY_SAVE_PATH = "savefile.hgjb"
+
+
+def delta_path(path):
+    return path + ".delta"
+
+
+def write_atomic(path, content):
+    """같은 디렉터리의 임시 파일에 쓰고 fsync 후 rename (content: str 또는 bytes)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        if isinstance(content, bytes):
+            f = open(tmp_path, "wb")
+        else:
+            f = open(tmp_path, "w", encoding="utf-8")
+        with f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_deltas(path, save_id):
+    """path 의 delta 파일에서 save_id 에 해당하는 줄들을 순서대로"""
+    d_path = delta_path(path)
+    if save_id is None or not os.path.exists(d_path):
+        return
+    # 끊긴 줄이 한글 중간에서 잘렸을 수도 있으므로 바이트로 읽어 줄마다 디코드
+    with open(d_path, "rb") as f:
+        for line in f:
+            try:
+                delta = json.loads(line)
+            except ValueError:
+                # 쓰다가 끊긴 줄은 무시 (뒤에 붙은 줄은 다음 저장이 줄을 바꾼 뒤 쓴 것)
+                continue
+            if delta.get("save_id") != save_id:
+                # 예전 전체 저장에 대한 delta
+                continue
+            yield delta
+
+
+def _apply_delta_header(data, delta):
+    data["player_name"] = delta["player_name"]
+    data["player_region_name"] = delta["player_region_name"]
+    data["turn"] = delta["turn"]
+
+
+def load_game(path=SAVE_PATH):
+    """
+    전체 저장 + (있다면) 같은 save_id 의 delta 줄들을 합쳐 savefile.json 형식 dict 로 반환.
+    파일이 없으면 None.
+    """
+    if not os.path.exists(path):
+        return None
+    if binsave.is_binary_save(path):
+        with binsave.BinarySave.open(path) as save:
+            data = save.to_dict()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+    for delta in read_deltas(path, data.get("save_id")):
+        _apply_delta_header(data, delta)
+        data["regions"].update(delta["regions"])
+    return data
+
+
+def load_state(path=SAVE_PATH, rng=None):
+    """
+    세이브를 GameState 로 불러옴 (파일이 없으면 None).
+    바이너리 세이브는 dict 를 거치지 않고 레코드에서 바로 Region 을 만든다.
+    """
+    if not os.path.exists(path):
+        return None
+    if not binsave.is_binary_save(path):
+        with phase("load.read"):
+            data = load_game(path)
+        with phase("load.state"):
+            return GameState.from_dict(data, rng=rng)
+
+    with phase("load.state"), binsave.BinarySave.open(path) as save:
+        # delta 는 지역을 풀면서 덮어써서 색인 / 전선은 한 번만 만든다
+        header = {}
+        changed = {}
+        for delta in read_deltas(path, save.save_id):
+            _apply_delta_header(header, delta)
+            changed.update(delta["regions"])
+        return save.to_state(rng=rng, header=header, changed=changed)
+
+
+def describe_save(path):
+    """
+    불러오기 화면에 보일 세이브 요약 (없으면 None).
+    바이너리 세이브는 헤더와 플레이어 지역 레코드 하나만 읽는다. (JSON 세이브는 전체를 읽음)
+    """
+    if not os.path.exists(path):
+        return None
+    if not binsave.is_binary_save(path):
+        data = load_game(path)
+        player_region = data["regions"].get(data["player_region_name"])
+        gold = None if player_region is None else player_region["gold"]
+        return _describe(data["player_name"], data["player_region_name"], data["turn"],
+                         len(data["regions"]), gold)
+
+    with binsave.BinarySave.open(path) as save:
+        header = {
+            "player_name": save.player_name, "player_region_name": save.player_region_name,
+            "turn": save.turn,
+        }
+        changed = {}
+        for delta in read_deltas(path, save.save_id):
+            _apply_delta_header(header, delta)
+            changed.update(delta["regions"])
+        name = header["player_region_name"]
+        if name in changed:
+            gold = changed[name]["gold"]
+        elif name in save.regions:
+            gold = save.regions[name].gold
+        else:
+            gold = None
+        return _describe(header["player_name"], name, header["turn"], len(save), gold)
+
+
+def _describe(player_name, player_region_name, turn, region_count, gold):
+    text = f"{player_name} / {turn} 턴 / 지역 {region_count}개"
+    if gold is not None:
+        text += f"\n{player_region_name} 금 {gold}"
+    return text
+
+
+class SaveManager:
+    """
+    백그라운드 저장기. save() 는 상태를 복사해 작업 큐에 넣고 바로 돌아온다.
+    on_done(error) 은 작업 스레드에서 불리므로, UI 쪽에서는 Clock 으로 넘겨서 써야 한다.
+    """
+
+    def __init__(self, path=SAVE_PATH, compact_every=20, binary=False):
+        self.path = path
+        self.compact_every = compact_every
+        self.binary = binary
+
+        self._jobs = queue.Queue()
+        self._worker = None
+
+        # 마지막 전체 저장 기준 정보 (메인 스레드에서만 접근)
+        self._state = None
+        self._changed = None
+        self._save_id = None
+        self._delta_count = 0
+        # 작업 스레드에서 저장이 실패하면 True (다음 저장은 무조건 전체 저장)
+        self._needs_full = False
+        # 마지막으로 저장이 실패한 save_id 와 그 오류 (작업 스레드에서만 접근)
+        self._failed_save_id = None
+        self._failed_error = None
+
+    def save(self, state, delta=False, on_done=None):
+        """
+        delta=True 면 가능할 때 바뀐 지역만 저장.
+        (처음 저장, 다른 GameState, delta 누적 한도 초과 시에는 전체 저장)
+        """
+        full = (
+            not delta
+            or state is not self._state
+            or self._delta_count >= self.compact_every
+            or self._needs_full
+        )
+        if full:
+            if self._state is not None and self._changed is not None:
+                self._state.untrack_changes(self._changed)
+            self._state = state
+            self._changed = state.track_changes()
+            self._save_id = uuid.uuid4().hex[:16]
+            self._delta_count = 0
+            self._needs_full = False
+            with phase("save.snapshot"):
+                data = state.to_dict()
+            data["save_id"] = self._save_id
+            job = (self._write_full, data)
+        else:
+            with phase("save.snapshot"):
+                data = state.to_dict(self._changed)
+            data["save_id"] = self._save_id
+            self._delta_count += 1
+            job = (self._append_delta, data)
+        self._changed.clear()
+
+        self._ensure_worker()
+        self._jobs.put((job, on_done))
+
+    def flush(self):
+        """대기 중인 저장이 모두 끝날 때까지 기다림"""
+        if self._worker is not None:
+            self._jobs.join()
+
+    # ----------------------------------
+    # 작업 스레드
+    # ----------------------------------
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="save-worker", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            (func, data), on_done = self._jobs.get()
+            error = None
+            try:
+                if func == self._append_delta and data["save_id"] == self._failed_save_id:
+                    # 앞선 저장이 실패했으면 그 지역들이 빠진 delta 이므로 쓰지 않음 (다음 전체 저장이 대신함)
+                    error = self._failed_error
+                else:
+                    func(data)
+            except Exception as e:
+                error = e
+                self._failed_save_id = data["save_id"]
+                self._failed_error = e
+                self._needs_full = True
+            finally:
+                self._jobs.task_done()
+            if on_done is not None:
+                on_done(error)
+
+    def _write_full(self, data):
+        with phase("save.encode"):
+            if self.binary:
+                content = binsave.dumps(data)
+            else:
+                content = json.dumps(data, ensure_ascii=False)
+        with phase("save.write"):
+            write_atomic(self.path, content)
+        # 새 전체 저장이 자리잡은 뒤 예전 delta 정리 (남아 있어도 save_id 가 달라 무시됨)
+        d_path = delta_path(self.path)
+        if os.path.exists(d_path):
+            os.remove(d_path)
+
+    def _append_delta(self, data):
+        with phase("save.encode"):
+            line = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+        with phase("save.write"):
+            with open(delta_path(self.path), "a+b") as f:
+                # 지난번에 쓰다가 끊긴 줄이 있으면 줄을 바꿔서 이어 붙지 않게 함
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
@@ -0,0 +1,278 @@
+"""
+시나리오(지도) 파일 / 지도 생성기
+
+시나리오 파일은 한 줄에 JSON 하나인 텍스트 파일(.scn)이다.
+첫 줄은 헤더, 그 뒤로 지역 하나당 한 줄이라 지역이 100만 개여도 한 줄씩 읽어 들인다.
+
+  {"format": "hgj-scenario", "version": 1, "name": "korea", "regions": 14,
+   "defaults": {"gold": 1000, "food": 3000, ...}}
+  {"name": "평안북도", "adj": ["함경북도", "평안남도"]}
+  {"name": "제주도", "adj": ["전라남도"], "owner": "김유진", "gold": 5000}
+
+지역 줄의 owner / 자원 값은 있을 때만 기본값(defaults)을 덮어쓴다.
+owner 가 없는 지역은 새 게임에서 AI 이름이 무작위로 배정된다.
+인접 관계는 파일에 적힌 그대로 쓴다 (생성기는 항상 양방향으로 쓴다).
+
+세이브 / journal 에는 지도를 다시 만드는 방법(Scenario.source)만 "map" 으로 기록한다.
+  없음 (None)                                  : 기본 14 지역 한반도
+  {"path": 시나리오 파일 절대 경로}             : load_scenario 로 읽은 지도
+  {"generate": {"n": ..., "seed": ..., ...}}  : generate 로 만든 지도 (같은 인자면 같은 지도)
+불러올 때 map_adjacency(source) 로 인접 관계를 되살린다.
+
+    python scenario.py generate 100000 big.scn --seed 7   (연결된 지도 생성)
+    python scenario.py info big.scn
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from engine import REGION_ADJACENCY, REGION_FIELDS, REGION_NAMES, GameState, Region
+
+FORMAT = "hgj-scenario"
+VERSION = 1
+
+# Region.__init__ 의 초기값
+DEFAULT_START = {field: getattr(Region(""), field) for field in REGION_FIELDS}
+
+
+class Scenario:
+    """
+    names     : 지역 이름 리스트 (화면 / 새 게임 순서)
+    adjacency : 지역 이름 -> 인접 지역 이름 리스트
+    starts    : 지역 이름 -> 기본값과 다른 시작 값 {"owner": ..., "gold": ..., ...}
+    defaults  : 모든 지역의 시작 자원 / 능력치
+    source    : 세이브에 기록되는 지도 출처 (map_adjacency 로 인접 관계를 되살림, None 이면 한반도)
+    """
+
+    def __init__(self, name, names, adjacency, starts=None, defaults=None, source=None):
+        self.name = name
+        self.names = names
+        self.adjacency = adjacency
+        self.starts = starts if starts is not None else {}
+        self.defaults = dict(DEFAULT_START)
+        if defaults:
+            self.defaults.update(defaults)
+        self.source = source
+        if source is not None:
+            _remember(source, adjacency)
+
+    def __len__(self):
+        return len(self.names)
+
+    def start_values(self):
+        """new_game(starts=...) 에 넘길 값: 기본값이 Region 초기값과 다르면 모든 지역에 적용"""
+        if self.defaults == DEFAULT_START:
+            return self.starts
+        return {
+            name: {**self.defaults, **self.starts.get(name, {})} for name in self.names
+        }
+
+    def new_game(self, player_name, player_region_name, rng=None, seed=None, deterministic=False):
+        return GameState.new_game(
+            player_name, player_region_name, region_names=self.names, rng=rng,
+            adjacency=self.adjacency, seed=seed, starts=self.start_values(), deterministic=deterministic,
+            map_source=self.source,
+        )
+
+
+def korea():
+    """기본 14 지역 한반도 시나리오"""
+    return Scenario("korea", list(REGION_NAMES), REGION_ADJACENCY)
+
+
+# ----------------------------------
+# 파일 읽기 / 쓰기
+# ----------------------------------
+def iter_scenario(path):
+    """(헤더 dict, 지역 줄 dict 들의 iterator) - 파일을 한 줄씩 읽는다"""
+    f = open(path, "r", encoding="utf-8")
+    header = json.loads(f.readline())
+    if header.get("format") != FORMAT:
+        f.close()
+        raise ValueError(f"{path}: 시나리오 파일이 아닙니다")
+    if header["version"] > VERSION:
+        f.close()
+        raise ValueError(f"지원하지 않는 시나리오 버전: {header['version']}")
+
+    def records():
+        with f:
+            for line_no, line in enumerate(f, start=2):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    raise ValueError(f"{path}:{line_no}: 잘못된 줄입니다")
+
+    return header, records()
+
+
+def load_scenario(path):
+    header, records = iter_scenario(path)
+    names = []
+    adjacency = {}
+    starts = {}
+    # 같은 이름이 인접 리스트마다 새 문자열로 읽히므로 하나로 합쳐서 메모리를 줄임
+    canonical = {}
+    for record in records:
+        name = record.pop("name")
+        name = canonical.setdefault(name, name)
+        if name in adjacency:
+            raise ValueError(f"{path}: 지역 이름이 중복됩니다: {name}")
+        names.append(name)
+        adjacency[name] = [canonical.setdefault(nb, nb) for nb in record.pop("adj", ())]
+        if record:
+            starts[name] = record
+    if "regions" in header and header["regions"] != len(names):
+        raise ValueError(f"{path}: 지역 수가 헤더({header['regions']})와 다릅니다({len(names)})")
+    for name, neighbors in adjacency.items():
+        for nb in neighbors:
+            if nb not in adjacency:
+                raise ValueError(f"{path}: {name} 의 인접 지역 {nb} 이 없습니다")
+    return Scenario(header.get("name", path), names, adjacency, starts, header.get("defaults"),
+                    source={"path": os.path.abspath(path)})
+
+
+def write_scenario(path, scenario):
+    """한 줄씩 임시 파일에 쓴 뒤 rename (savegame.write_atomic 과 같은 방식, 전체를 메모리에 만들지 않음)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "format": FORMAT, "version": VERSION, "name": scenario.name,
+                "regions": len(scenario.names), "defaults": scenario.defaults,
+            }, ensure_ascii=False) + "\n")
+            for name in scenario.names:
+                record = {"name": name, "adj": scenario.adjacency[name]}
+                record.update(scenario.starts.get(name, {}))
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# ----------------------------------
+# 생성기
+# ----------------------------------
+def generate(n, seed=0, extra_edges=1.0, spread=0.2, window=64):
+    """
+    seed 로 결정되는 연결된 지도 (지역 n 개).
+
+    i 번 지역은 바로 앞 window 개 지역 중 하나와 이어지므로 (무작위 트리) 항상 연결되어 있고,
+    지역마다 평균 extra_edges 개의 가까운 지역과 한 번 더 이어져 고리가 생긴다.
+    번호가 가까운 지역끼리만 이어져 전선이 국지적이다.
+    시작 자원은 기본값에서 ±spread 비율로 흔든다.
+    """
+    if n < 1:
+        raise ValueError("지역 수는 1 이상이어야 합니다")
+    rng = random.Random(seed)
+    names = [f"지역{i}" for i in range(n)]
+    neighbor_ids = [[] for _ in range(n)]
+
+    def connect(i, j):
+        if i != j and j not in neighbor_ids[i]:
+            neighbor_ids[i].append(j)
+            neighbor_ids[j].append(i)
+
+    for i in range(1, n):
+        connect(i, rng.randrange(max(0, i - window), i))
+    for _ in range(int(n * extra_edges / 2)):
+        i = rng.randrange(n)
+        connect(i, min(n - 1, max(0, i + rng.randint(-window, window))))
+
+    adjacency = {names[i]: [names[j] for j in neighbor_ids[i]] for i in range(n)}
+
+    starts = {}
+    if spread > 0:
+        for name in names:
+            starts[name] = {
+                field: int(DEFAULT_START[field] * (1 + rng.uniform(-spread, spread)))
+                for field in ("gold", "food", "population")
+            }
+    source = {"generate": {"n": n, "seed": seed, "extra_edges": extra_edges, "window": window}}
+    return Scenario(f"generated-{n}-{seed}", names, adjacency, starts, source=source)
+
+
+# ----------------------------------
+# 세이브의 지도 출처 -> 인접 관계
+# ----------------------------------
+# 마지막으로 만든 / 읽은 지도 (같은 출처를 다시 불러올 때 파일을 다시 읽거나 다시 생성하지 않고,
+# 같은 dict 를 넘겨 graph.compile_graph 의 캐시도 그대로 쓰이게 함)
+_last_map = (None, None)
+
+
+def _source_key(source):
+    return json.dumps(source, sort_keys=True)
+
+
+def _remember(source, adjacency):
+    global _last_map
+    _last_map = (_source_key(source), adjacency)
+
+
+def map_adjacency(source):
+    """세이브에 기록된 지도 출처(Scenario.source) -> 인접 관계 dict (None 이면 한반도)"""
+    if source is None:
+        return REGION_ADJACENCY
+    key, adjacency = _last_map
+    if key == _source_key(source):
+        return adjacency
+    if "path" in source:
+        if not os.path.exists(source["path"]):
+            raise ValueError(f"세이브의 지도 파일이 없습니다: {source['path']}")
+        return load_scenario(source["path"]).adjacency
+    if "generate" in source:
+        params = source["generate"]
+        # 시작 자원(spread)은 인접 관계를 만든 뒤에 뽑으므로 인접 관계만 필요하면 건너뜀
+        return generate(params["n"], params["seed"], params["extra_edges"], spread=0,
+                        window=params["window"]).adjacency
+    raise ValueError(f"알 수 없는 지도 출처: {source}")
+
+
+def is_connected(scenario):
+    """BFS 로 모든 지역이 이어져 있는지 확인"""
+    if not scenario.names:
+        return True
+    seen = {scenario.names[0]}
+    queue = [scenario.names[0]]
+    for name in queue:
+        for nb in scenario.adjacency[name]:
+            if nb not in seen:
+                seen.add(nb)
+                queue.append(nb)
+    return len(seen) == len(scenario.names)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="한국지 시나리오 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="연결된 지도 생성")
+    gen.add_argument("regions", type=int)
+    gen.add_argument("path")
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--extra-edges", type=float, default=1.0)
+    info = sub.add_parser("info", help="시나리오 요약")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "generate":
+        scenario = generate(args.regions, args.seed, args.extra_edges)
+        write_scenario(args.path, scenario)
+        print(f"{args.path}: 지역 {len(scenario)}개 생성 ({time.perf_counter() - start:.2f}초)")
+    else:
+        scenario = load_scenario(args.path)
+        edges = sum(len(neighbors) for neighbors in scenario.adjacency.values())
+        print(f"{scenario.name}: 지역 {len(scenario)}개, 인접 {edges}개 (평균 {edges / len(scenario):.2f}), "
+              f"연결됨: {is_connected(scenario)}, 읽기 {time.perf_counter() - start:.2f}초")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
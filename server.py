@@ -0,0 +1,462 @@
+"""
+여러 판을 한 프로세스에서 돌리는 asyncio 게임 서버 (화면 없음)
+
+연결 하나가 세션(판) 하나다. 요청 / 응답 모두 한 줄에 JSON 하나이고,
+응답에는 전체 상태 대신 그 명령으로 바뀐 값만 담은 diff 가 붙는다.
+
+  -> {"cmd": "new", "player": "김유진", "region": "경기도", "seed": 7}
+     ("deterministic": true 를 붙이면 결정적 모드 - end 응답마다 상태 해시 "hash" 가 온다)
+  <- {"ok": true, "session": 1, "diff": {"turn": 0, "regions": {모든 지역의 모든 값}}}
+  -> {"cmd": "invest", "region": "경기도", "kind": "agri"}
+  <- {"ok": true, "result": true, "diff": {"regions": {"경기도": {"gold": 1900, "agri": 1}}}}
+  -> {"cmd": "recruit", "region": "경기도", "amount": 10}
+  -> {"cmd": "orders", "orders": [["invest", "*", "agri", 5], ["recruit", "경기도", "max"]]}
+     (대량 명령: "*" = 내 모든 지역, "max" = 가능한 만큼. 자원이 모자라면 하나도 적용 안 됨)
+  -> {"cmd": "attack", "region": "경기도", "target": "강원도", "mode": "occupy"}  (target / mode 생략 가능)
+  -> {"cmd": "march", "region": "경기도", "target": "황해도", "mode": "plunder"}  (내 영토를 지나 행군 공격)
+  -> {"cmd": "reachable", "region": "경기도", "turns": 3}
+  <- {"ok": true, "result": {"강원도": 1, "황해도": 2, ...}, "diff": {"regions": {}}}
+  -> {"cmd": "end"}
+  <- {"ok": true, "diff": {"turn": 1, "regions": {...}}}
+  -> {"cmd": "state"}   (전체 값 다시 받기)
+  <- {"ok": false, "error": "..."}   (잘못된 명령)
+
+diff 는 세션마다 마지막으로 보낸 값과 비교해서 달라진 필드만 보낸다.
+(GameState.track_changes 로 바뀐 지역만 비교하므로 지도가 커도 비용은 바뀐 지역 수에 비례)
+
+턴 종료(end)는 바로 처리하지 않고 TurnBatcher 에 모아 두었다가 여러 세션의 턴을 한 번에 진행한다.
+배치 하나가 budget_ms 를 넘으면 중간에 이벤트 루프에 양보해서 다른 세션의 명령 응답이 밀리지 않는다.
+
+    python server.py serve [--port 8765 | --unix /tmp/hgj.sock] [--scenario 지도.scn]
+    python server.py loadtest --clients 2000 --turns 10      (서버 + 가상 클라이언트를 한 프로세스에서)
+    python server.py loadtest --port 8765 --clients 500      (따로 띄운 서버에 접속)
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+import scenario as scenario_module
+from engine import REGION_FIELDS
+from profiler import Profiler
+
+DEFAULT_PORT = 8765
+# 한 줄 최대 길이 (큰 지도의 첫 diff 가 한 줄에 들어가야 함)
+LINE_LIMIT = 64 * 1024 * 1024
+# reachable 로 물어볼 수 있는 최대 턴 수 (응답 크기 제한)
+MAX_REACHABLE_TURNS = 20
+COMMANDS = ("new", "invest", "recruit", "orders", "attack", "march", "reachable", "end", "state")
+
+
+def _region_row(r_obj):
+    return (r_obj.owner,) + tuple(getattr(r_obj, field) for field in REGION_FIELDS)
+
+
+ROW_FIELDS = ("owner",) + REGION_FIELDS
+
+
+class Session:
+    """서버에서 돌아가는 한 판: GameState + 클라이언트가 마지막으로 받은 값"""
+
+    def __init__(self, session_id, state):
+        self.id = session_id
+        self.state = state
+        self._changed = state.track_changes()
+        self._sent = {}  # 지역 이름 -> 마지막으로 보낸 값 (owner, gold, ...)
+        self._sent_turn = None
+
+    def full(self):
+        """모든 지역의 모든 값 (처음 / 다시 받기)"""
+        self._changed.clear()
+        self._sent = {name: _region_row(r_obj) for name, r_obj in self.state.regions.items()}
+        self._sent_turn = self.state.turn
+        return {
+            "turn": self.state.turn,
+            "regions": {name: dict(zip(ROW_FIELDS, row)) for name, row in self._sent.items()},
+        }
+
+    def diff(self):
+        """마지막으로 보낸 뒤 달라진 값만"""
+        regions = {}
+        for name in self._changed:
+            row = _region_row(self.state.regions[name])
+            old = self._sent.get(name)
+            if old == row:
+                continue
+            if old is None:
+                regions[name] = dict(zip(ROW_FIELDS, row))
+            else:
+                regions[name] = {
+                    field: value for field, value, before in zip(ROW_FIELDS, row, old) if value != before
+                }
+            self._sent[name] = row
+        self._changed.clear()
+
+        diff = {"regions": regions}
+        if self.state.turn != self._sent_turn:
+            diff["turn"] = self._sent_turn = self.state.turn
+        return diff
+
+    def close(self):
+        self.state.untrack_changes(self._changed)
+
+
+# ----------------------------------
+# 턴 배치 처리
+# ----------------------------------
+class TurnBatcher:
+    """
+    세션들의 턴 종료 요청을 모아서 한 번에 처리.
+    요청이 들어오면 window_ms 동안 더 모은 뒤, 모인 세션들의 step() 을 차례로 돌린다.
+    """
+
+    def __init__(self, window_ms=2, budget_ms=20, profiler=None):
+        self.window_ms = window_ms
+        self.budget_ms = budget_ms
+        self.profiler = profiler
+        self.batches = 0
+        self.turns = 0
+        self._pending = []
+        self._wake = asyncio.Event()
+
+    def submit(self, session):
+        """session 의 턴 종료를 예약하고, 처리되면 끝나는 future 반환"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((session, future))
+        self._wake.set()
+        return future
+
+    async def run(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            if self.window_ms:
+                await asyncio.sleep(self.window_ms / 1000.0)
+            batch, self._pending = self._pending, []
+            await self._process(batch)
+
+    async def _process(self, batch):
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000.0
+        for session, future in batch:
+            if future.done():
+                # 처리 전에 연결이 끊김
+                continue
+            try:
+                session.state.step()
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(None)
+            if time.perf_counter() > deadline:
+                await asyncio.sleep(0)
+                deadline = time.perf_counter() + self.budget_ms / 1000.0
+        self.batches += 1
+        self.turns += len(batch)
+        if self.profiler is not None:
+            self.profiler.record("server.batch", time.perf_counter() - start, start)
+
+
+# ----------------------------------
+# 서버
+# ----------------------------------
+async def read_line(reader):
+    """
+    요청 한 줄 (연결이 끝나면 b"").
+    LINE_LIMIT 보다 긴 줄은 줄바꿈까지 읽어서 버린 뒤 ValueError - 다음 줄부터는 그대로 이어서 읽는다.
+    """
+    too_long = False
+    while True:
+        try:
+            line = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            # 줄바꿈 없이 연결이 끝남 (마지막 줄이거나 빈 값)
+            line = e.partial
+        except asyncio.LimitOverrunError as e:
+            # 버퍼에 쌓인 만큼 버리고 줄바꿈이 나올 때까지 계속
+            too_long = True
+            await reader.readexactly(e.consumed)
+            continue
+        if too_long:
+            raise ValueError(f"요청 한 줄이 너무 깁니다 (최대 {LINE_LIMIT} 바이트)")
+        return line
+
+
+class GameServer:
+    def __init__(self, scenario=None, window_ms=2, budget_ms=20, profiler=None):
+        self.scenario = scenario if scenario is not None else scenario_module.korea()
+        self.sessions = {}
+        self.profiler = profiler if profiler is not None else Profiler()
+        self.batcher = TurnBatcher(window_ms, budget_ms, self.profiler)
+        self._next_id = 1
+        self._server = None
+        self._batch_task = None
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+        self._batch_task = asyncio.create_task(self.batcher.run())
+        if unix_path is not None:
+            self._server = await asyncio.start_unix_server(self.handle, unix_path, limit=LINE_LIMIT)
+        else:
+            self._server = await asyncio.start_server(
+                self.handle, host, port, limit=LINE_LIMIT, backlog=4096
+            )
+        return self._server
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._batch_task.cancel()
+
+    async def handle(self, reader, writer):
+        session = None
+        try:
+            while True:
+                try:
+                    line = await read_line(reader)
+                    if not line:
+                        break
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("요청은 JSON 객체여야 합니다")
+                    cmd = request.get("cmd")
+                    with self.profiler.phase(f"server.{cmd if cmd in COMMANDS else 'invalid'}"):
+                        if cmd == "new":
+                            if session is not None:
+                                self._end_session(session)
+                            session = self._new_session(request)
+                            response = {"ok": True, "session": session.id, "diff": session.full()}
+                        elif session is None:
+                            raise ValueError("먼저 new 로 게임을 시작해야 합니다")
+                        elif cmd == "end":
+                            await self.batcher.submit(session)
+                            response = {"ok": True, "diff": session.diff()}
+                            if session.state.deterministic:
+                                response["hash"] = session.state.turn_hash
+                        elif cmd == "state":
+                            response = {"ok": True, "diff": session.full()}
+                        else:
+                            result = self._command(session, cmd, request)
+                            response = {"ok": True, "result": result, "diff": session.diff()}
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if session is not None:
+                self._end_session(session)
+            writer.close()
+
+    def _new_session(self, request):
+        region = request.get("region") or self.scenario.names[0]
+        if region not in self.scenario.adjacency:
+            raise ValueError(f"없는 지역입니다: {region}")
+        seed = request.get("seed")
+        deterministic = bool(request.get("deterministic"))
+        if deterministic and seed is None:
+            raise ValueError("결정적 모드에는 seed 가 필요합니다")
+        state = self.scenario.new_game(
+            request.get("player", "플레이어"), region, rng=random.Random(seed), seed=seed,
+            deterministic=deterministic,
+        )
+        session = Session(self._next_id, state)
+        self._next_id += 1
+        self.sessions[session.id] = session
+        return session
+
+    def _end_session(self, session):
+        session.close()
+        self.sessions.pop(session.id, None)
+
+    def _command(self, session, cmd, request):
+        state = session.state
+        region = request.get("region")
+        if cmd not in COMMANDS:
+            raise ValueError(f"알 수 없는 명령: {cmd}")
+        if cmd == "orders":
+            return state.orders(state.player_name, [tuple(order) for order in request["orders"]])
+        if not state.owns(state.player_name, region):
+            raise ValueError(f"내 땅이 아닙니다: {region}")
+        if cmd == "invest":
+            return state.invest(region, request["kind"])
+        if cmd == "recruit":
+            amount = int(request["amount"])
+            if amount <= 0:
+                raise ValueError("모병 인원은 1 이상이어야 합니다")
+            return state.recruit(region, amount)
+        if cmd == "reachable":
+            turns = int(request["turns"])
+            if not 0 < turns <= MAX_REACHABLE_TURNS:
+                raise ValueError(f"turns 는 1 ~ {MAX_REACHABLE_TURNS} 이어야 합니다")
+            return state.reachable(region, turns, enemies_only=bool(request.get("enemies_only")))
+        mode = request.get("mode")
+        if mode not in (None, "occupy", "plunder"):
+            raise ValueError(f"알 수 없는 공격 방식: {mode}")
+        if cmd == "march":
+            return state.march(region, request["target"], mode=mode)
+        return state.attack(region, mode=mode, target=request.get("target"))
+
+
+# ----------------------------------
+# 부하 테스트 (가상 클라이언트)
+# ----------------------------------
+async def simulated_client(client_id, connect, turns, actions, stats, names):
+    """
+    새 게임을 시작하고 turns 턴 동안 매 턴 actions 개의 무작위 명령 + 턴 종료.
+    받은 diff 로 자기 지역 소유 상태를 따라가며 명령할 지역을 고른다.
+    """
+    rng = random.Random(client_id)
+    reader, writer = await connect()
+    player = f"P{client_id}"
+
+    async def call(request):
+        start = time.perf_counter()
+        writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        stats.record(f"client.{request['cmd']}", time.perf_counter() - start, start)
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        owners.update(
+            (name, values["owner"]) for name, values in response["diff"]["regions"].items()
+            if "owner" in values
+        )
+        return response
+
+    owners = {}
+    try:
+        await call({"cmd": "new", "player": player, "region": rng.choice(names), "seed": client_id})
+        for _ in range(turns):
+            mine = [name for name, owner in owners.items() if owner == player]
+            if not mine:
+                break
+            for _ in range(actions):
+                region = rng.choice(mine)
+                kind = rng.random()
+                if kind < 0.4:
+                    await call({"cmd": "invest", "region": region,
+                                "kind": rng.choice(("agri", "commerce", "security"))})
+                elif kind < 0.8:
+                    await call({"cmd": "recruit", "region": region, "amount": 10})
+                elif kind < 0.9:
+                    await call({"cmd": "attack", "region": region})
+                else:
+                    targets = (await call({"cmd": "reachable", "region": region, "turns": 3,
+                                           "enemies_only": True}))["result"]
+                    if targets:
+                        await call({"cmd": "march", "region": region, "target": rng.choice(list(targets))})
+            await call({"cmd": "end"})
+    finally:
+        writer.close()
+
+
+async def load_test(clients=1000, turns=10, actions=3, host="127.0.0.1", port=None, unix_path=None,
+                    scenario=None, ramp_ms=0):
+    """
+    clients 개의 가상 클라이언트를 동시에 돌리고 결과 요약 dict 반환.
+    port / unix_path 가 없으면 같은 프로세스에 서버를 띄운다.
+    """
+    server = None
+    if port is None and unix_path is None:
+        server = GameServer(scenario)
+        await server.start(host, 0)
+        port = server.port
+    names = (server.scenario if server is not None else scenario or scenario_module.korea()).names
+
+    if unix_path is not None:
+        def connect():
+            return asyncio.open_unix_connection(unix_path, limit=LINE_LIMIT)
+    else:
+        def connect():
+            return asyncio.open_connection(host, port, limit=LINE_LIMIT)
+
+    stats = Profiler(window=1000000, max_events=0)
+
+    async def start_client(i):
+        if ramp_ms:
+            await asyncio.sleep(ramp_ms / 1000.0 * i / clients)
+        await simulated_client(i, connect, turns, actions, stats, names)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(start_client(i) for i in range(clients)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    errors = [r for r in results if isinstance(r, BaseException)]
+
+    summary = {
+        "clients": clients,
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_second": sum(s["count"] for s in stats.summary().values()) / elapsed,
+        "latency_ms": stats.summary(),
+    }
+    if server is not None:
+        summary["turns_per_second"] = server.batcher.turns / elapsed
+        summary["turns_per_batch"] = server.batcher.turns / max(1, server.batcher.batches)
+        summary["batch_ms"] = server.profiler.stats("server.batch")
+        await server.close()
+    if errors:
+        summary["first_error"] = repr(errors[0])
+    return summary
+
+
+def _raise_file_limit():
+    """연결마다 소켓(같은 프로세스면 양쪽 두 개)이 필요하므로 열 수 있는 파일 수를 최대로"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="한국지 게임 서버")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "loadtest"):
+        p = sub.add_parser(name)
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=DEFAULT_PORT if name == "serve" else None)
+        p.add_argument("--unix", help="TCP 대신 유닉스 소켓 경로")
+        p.add_argument("--scenario", help="시나리오 파일 (.scn), 없으면 한반도 14 지역")
+    serve = sub.choices["serve"]
+    serve.add_argument("--window-ms", type=float, default=2)
+    serve.add_argument("--budget-ms", type=float, default=20)
+    load = sub.choices["loadtest"]
+    load.add_argument("--clients", type=int, default=1000)
+    load.add_argument("--turns", type=int, default=10)
+    load.add_argument("--actions", type=int, default=3, help="턴마다 보낼 명령 수")
+    load.add_argument("--ramp-ms", type=float, default=0, help="클라이언트 접속을 이 시간에 나눠서")
+    args = parser.parse_args(argv)
+
+    scenario = scenario_module.load_scenario(args.scenario) if args.scenario else None
+    _raise_file_limit()
+    if args.command == "serve":
+        async def serve():
+            server = GameServer(scenario, args.window_ms, args.budget_ms)
+            await server.start(args.host, args.port, args.unix)
+            print(f"서버 시작: {args.unix or f'{args.host}:{server.port}'}")
+            await asyncio.Event().wait()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    summary = asyncio.run(load_test(
+        args.clients, args.turns, args.actions, args.host, args.port, args.unix, scenario, args.ramp_ms
+    ))
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
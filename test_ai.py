@@ -0,0 +1,55 @@
+"""
+AI 세력 계획 테스트 (세력별 난수)
+
+    python -m pytest -q test_ai.py
+"""
+import random
+
+import ai
+import scenario
+
+
+def make_state(seed=11):
+    sc = scenario.generate(500, seed=3)
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=seed)
+    for _ in range(12):
+        state.step()
+    return state
+
+
+def test_plan_turn_is_reproducible():
+    plans = [ai.plan_turn(make_state(), 11) for _ in range(2)]
+    assert plans[0] == plans[1]
+    assert plans[0] != ai.plan_turn(make_state(), 12)
+    assert {action for _, action, _ in plans[0]} == {"invest", "recruit"}
+
+
+def test_faction_plans_are_independent():
+    # 세력마다 자기 난수를 쓰므로 다른 세력의 계획이나 처리 순서와 무관 (세력별로 따로 계산해도 같은 결과)
+    state = make_state()
+    factions = sorted(state.rule_ai_factions())
+    rows = {
+        faction: [(r.name, r.gold, r.food, r.population) for r in state.owned_regions(faction)]
+        for faction in factions
+    }
+    separate = {
+        faction: ai.plan_faction(faction, rows[faction], 11, state.turn) for faction in reversed(factions)
+    }
+    assert ai.plan_turn(state, 11) == [intent for faction in factions for intent in separate[faction]]
+
+    # 한 세력의 지역이 바뀌어도 다른 세력의 계획은 그대로
+    first, second = factions[:2]
+    for r_obj in state.owned_regions(first):
+        r_obj.gold += 5000
+    state.touch(*[r_obj.name for r_obj in state.owned_regions(first)])
+    plan = ai.plan_turn(state, 11)
+    assert [intent for intent in plan if state.regions[intent[0]].owner == second] == separate[second]
+
+
+def test_same_seed_same_game():
+    states = [make_state(seed=11) for _ in range(2)] + [make_state(seed=12)]
+    for state in states:
+        for _ in range(5):
+            state.step()
+    assert states[0].to_dict() == states[1].to_dict()
+    assert states[0].to_dict()["regions"] != states[2].to_dict()["regions"]
@@ -0,0 +1,94 @@
+"""
+배치 전투 계산 (battle.py) 과 do_battle_attack 의 결과 비교
+
+    python -m pytest -q test_battle.py
+"""
+import random
+
+import numpy as np
+import pytest
+
+import battle
+import engine
+import scenario
+from engine import do_battle_attack
+
+
+def random_soldiers(rng, k):
+    return [
+        rng.choice([-5, 0, 1, 2, 3, 10, rng.randint(1, 100), rng.randint(1, 10 ** 5), rng.randint(1, 10 ** 12)])
+        for _ in range(k)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_batch_matches_do_battle_attack(seed):
+    rng = random.Random(seed)
+    attackers = random_soldiers(rng, 2000)
+    defenders = random_soldiers(rng, 2000)
+    att_after, def_after = battle.do_battle_attack_batch(attackers, defenders)
+    assert list(zip(att_after.tolist(), def_after.tolist())) == [
+        do_battle_attack(a, d) for a, d in zip(attackers, defenders)
+    ]
+
+
+def test_batch_with_other_balance():
+    previous = engine.set_balance(attack_factor=17, hp_factor=23)
+    try:
+        sizes = np.arange(0, 300)
+        att_after, def_after = battle.do_battle_attack_batch(sizes[:, None], sizes[None, :])
+        for a in range(300):
+            for d in range(0, 300, 7):
+                assert (att_after[a, d], def_after[a, d]) == do_battle_attack(a, d)
+    finally:
+        engine.set_balance(**previous)
+
+
+def test_attack_odds_matches_sequential_battles():
+    # 같은 시드의 난수로 수비 병력을 뽑아 하나씩 싸운 결과와 비교
+    sizes = [1, 50, 100, 149, 150, 151, 300, 1000]
+    odds = battle.attack_odds(sizes, 120, defender_spread=60, samples=500, rng=np.random.default_rng(4))
+    defenders = np.random.default_rng(4).integers(120, 180, size=500, endpoint=True).tolist()
+    for i, size in enumerate(sizes):
+        results = [do_battle_attack(size, d) for d in defenders]
+        wins = [a > 0 and d == 0 for a, d in results]
+        assert odds["win_prob"][i] == pytest.approx(sum(wins) / len(wins))
+        assert odds["occupy_prob"][i] == pytest.approx(sum(wins) / len(wins) / 2)
+        assert odds["attacker_after"][i] == pytest.approx(sum(a for a, _ in results) / len(results))
+        assert odds["defender_after"][i] == pytest.approx(sum(d for _, d in results) / len(results))
+
+    fixed = battle.attack_odds(sizes, 120)
+    assert fixed["win_prob"].tolist() == [
+        float(a > 0 and d == 0) for a, d in (do_battle_attack(size, 120) for size in sizes)
+    ]
+
+
+@pytest.mark.parametrize("defender", [0, 1, 2, 7, 100, 999, 3000])
+def test_min_winning_attacker(defender):
+    found = battle.min_winning_attacker(defender)
+    expected = next(
+        (a for a in range(1, 2 * max(defender, 1) + 1)
+         if do_battle_attack(a, defender)[0] > 0 and do_battle_attack(a, defender)[1] == 0),
+        None,
+    )
+    assert found == expected
+
+
+def test_frontier_matchups_match_attack():
+    sc = scenario.generate(300, seed=2)
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=5)
+    rng = random.Random(1)
+    for r_obj in state.regions.values():
+        r_obj.army = rng.choice([0, 10, rng.randint(1, 5000)])
+    state.touch_all()
+
+    for owner in sorted(state.factions())[:10]:
+        for attacker, target, att_after, def_after, won in battle.frontier_matchups(state, owner):
+            # 실제 공격과 같은 결과인지 복사본에서 확인
+            trial = state.clone()
+            result = trial._attack(attacker, "occupy", target)
+            if state.regions[attacker].army <= 0:
+                assert result["result"] == "no_army"
+                continue
+            assert (result["att_after"], result["def_after"]) == (att_after, def_after)
+            assert (result["result"] == "occupy") == won
@@ -0,0 +1,169 @@
+"""
+바이너리 세이브 왕복 테스트 (JSON <-> 바이너리 <-> GameState)
+
+    python -m pytest -q test_binsave.py
+"""
+import json
+import random
+
+import pytest
+
+import binsave
+import scenario
+from engine import REGION_FIELDS, GameState
+from savegame import SaveManager, load_game, load_state
+
+
+def region_names(regions):
+    return [r_obj.name for r_obj in regions]
+
+
+def region_values(r_obj):
+    return {"owner": r_obj.owner, **{field: getattr(r_obj, field) for field in REGION_FIELDS}}
+
+
+def make_data(seed=None, deterministic=False, turns=3):
+    sc = scenario.korea()
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=seed,
+                        deterministic=deterministic)
+    for _ in range(turns):
+        state.step()
+    return state.to_dict()
+
+
+@pytest.fixture(params=[
+    {},
+    {"seed": 1234},
+    {"seed": -(2 ** 63)},
+    {"seed": 99, "deterministic": True},
+], ids=["no-seed", "seed", "min-seed", "deterministic"])
+def data(request):
+    return make_data(**request.param)
+
+
+def test_dict_round_trip(data):
+    back = binsave.BinarySave.from_bytes(binsave.dumps(data)).to_dict()
+    assert back == data
+    assert list(back["regions"]) == list(data["regions"])
+
+
+def test_state_round_trip(data):
+    save = binsave.BinarySave.from_bytes(binsave.dumps(data))
+    state = save.to_state()
+    expected = GameState.from_dict(data)
+    assert state.to_dict() == expected.to_dict()
+    assert state.seed == data.get("seed")
+    assert state.deterministic == data.get("deterministic", False)
+    assert state.turn == data["turn"]
+    assert state.faction_summary("플레이어") == expected.faction_summary("플레이어")
+
+
+def test_lazy_regions(data):
+    save = binsave.BinarySave.from_bytes(binsave.dumps(data))
+    names = list(data["regions"])
+    assert len(save.regions) == len(names)
+    assert list(save.regions) == names
+    # 뒤에서부터 하나씩 - 접근한 지역만 풀린다
+    for i, name in enumerate(reversed(names)):
+        assert region_values(save.regions[name]) == data["regions"][name]
+        assert len(save.regions._hydrated) == i + 1
+    assert save.regions[names[0]] is save.regions[names[0]]
+    assert names[0] in save.regions
+    assert "없는 지역" not in save.regions
+
+
+def test_lazy_regions_from_file(tmp_path, data):
+    path = str(tmp_path / "save.hgjb")
+    binsave.write_binary(path, data)
+    with binsave.BinarySave.open(path) as save:
+        name = list(data["regions"])[-1]
+        assert region_values(save.region(name)) == data["regions"][name]
+        assert save.seed == data.get("seed")
+        assert save.to_dict() == data
+
+
+def test_none_owner_and_player():
+    data = make_data(seed=5)
+    names = list(data["regions"])
+    data["regions"][names[1]]["owner"] = None
+    data["regions"][names[2]]["owner"] = None
+    data["player_name"] = None
+    data["player_region_name"] = None
+
+    save = binsave.BinarySave.from_bytes(binsave.dumps(data))
+    assert save.player_name is None
+    assert save.player_region_name is None
+    assert save.regions[names[1]].owner is None
+    assert save.to_dict() == data
+    assert save.to_state().to_dict() == GameState.from_dict(data).to_dict()
+
+
+def test_check_parity(tmp_path, data):
+    path = tmp_path / "save.json"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    assert binsave.check_parity(str(path)) == []
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_old_header_versions(version):
+    data = make_data(seed=8)
+    raw = bytearray(binsave.dumps(data))
+    # 예전 헤더: 그 버전에 없던 확장 부분은 읽지 않아야 함
+    # (문자열 표 / 레코드 위치는 오프셋으로 찾으므로 그대로 읽힘)
+    header_size = binsave.HEADER.size + (binsave.HEADER_EXT.size if version == 2 else 0)
+    header = list(binsave.HEADER.unpack_from(raw, 0))
+    header[1:3] = [version, header_size]
+    binsave.HEADER.pack_into(raw, 0, *header)
+    raw[header_size:binsave.HEADER_SIZE] = b"\xff" * (binsave.HEADER_SIZE - header_size)
+    save = binsave.BinarySave.from_bytes(bytes(raw))
+    assert save.seed == (8 if version == 2 else None)
+    assert save.deterministic is False
+    assert save.map_source is None
+    assert save.to_dict() == (data if version == 2 else {k: v for k, v in data.items() if k != "seed"})
+
+
+def test_generated_map_round_trip():
+    sc = scenario.generate(300, seed=2)
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=4)
+    state.step()
+    data = state.to_dict()
+    assert data["map"] == sc.source
+
+    save = binsave.BinarySave.from_bytes(binsave.dumps(data))
+    assert save.map_source == sc.source
+    assert save.to_dict() == data
+    loaded = save.to_state()
+    assert len(loaded.graph) == 300
+    expected = region_names(state.enemy_neighbors("지역0"))
+    assert expected and region_names(loaded.enemy_neighbors("지역0")) == expected
+
+
+def test_rejects_values_out_of_range():
+    data = make_data()
+    with pytest.raises(ValueError):
+        binsave.dumps(dict(data, seed="문자열"))
+    data["regions"][next(iter(data["regions"]))]["gold"] = 2 ** 63
+    with pytest.raises(ValueError):
+        binsave.dumps(data)
+
+
+def test_save_manager_binary(tmp_path):
+    sc = scenario.korea()
+    state = sc.new_game("플레이어", sc.names[0], seed=77, deterministic=True)
+    for _ in range(4):
+        state.step()
+    path = str(tmp_path / "save.hgjb")
+    saver = SaveManager(path, binary=True)
+    saver.save(state)
+    saver.flush()
+
+    assert binsave.is_binary_save(path)
+    assert load_game(path) == {**state.to_dict(), "save_id": saver._save_id}
+    loaded = load_state(path)
+    assert loaded.to_dict() == state.to_dict()
+    assert loaded.state_hash() == state.state_hash()
+
+    # 이어서 진행해도 같은 게임 (결정적 모드 + seed 가 복원됨)
+    state.step()
+    loaded.step()
+    assert loaded.turn_hash == state.turn_hash
@@ -0,0 +1,119 @@
+"""
+NumPy 경제 배열 (economy.EconomyArrays) 과 Region.next_turn 의 결과 비교
+
+    python -m pytest -q test_economy.py
+"""
+import random
+
+import pytest
+
+import engine
+from economy import EconomyArrays
+from engine import REGION_FIELDS, Region
+
+
+def random_regions(rng, n):
+    regions = {}
+    for i in range(n):
+        r_obj = Region(f"지역{i}", rng.choice(["가", "나", None]))
+        r_obj.gold = rng.choice([0, 1, 1999, rng.randint(0, 10 ** 6), rng.randint(0, 10 ** 12)])
+        r_obj.food = rng.choice([0, 9, 300, rng.randint(0, 10 ** 6), rng.randint(0, 10 ** 12)])
+        r_obj.population = rng.choice([0, 1100, rng.randint(0, 10 ** 6)])
+        for field in ("agri", "commerce", "security"):
+            setattr(r_obj, field, rng.choice([0, 0, 1, 3, rng.randint(1, 40), rng.randint(1, 300)]))
+        r_obj.army = rng.choice([0, 9, 10, 3000, rng.randint(0, 10 ** 5), rng.randint(0, 10 ** 9)])
+        regions[r_obj.name] = r_obj
+    return regions
+
+
+def values(regions):
+    return {
+        name: (r_obj.owner, *[getattr(r_obj, field) for field in REGION_FIELDS])
+        for name, r_obj in regions.items()
+    }
+
+
+def stepped(regions, turns):
+    regions = engine.copy_regions(regions)
+    for _ in range(turns):
+        for r_obj in regions.values():
+            r_obj.next_turn()
+    return regions
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_next_turn_matches_region(seed):
+    rng = random.Random(seed)
+    regions = random_regions(rng, 400)
+    arrays = EconomyArrays.from_regions(regions)
+    expected = engine.copy_regions(regions)
+    for _ in range(5):
+        arrays.next_turn()
+        expected = stepped(expected, 1)
+        assert values(arrays.to_regions()) == values(expected)
+
+
+def test_next_turn_with_other_balance():
+    previous = engine.set_balance(agri_rate=0.0123, commerce_rate=0.0071, security_rate=0.0003)
+    try:
+        regions = random_regions(random.Random(7), 300)
+        arrays = EconomyArrays.from_regions(regions)
+        for _ in range(4):
+            arrays.next_turn()
+        assert values(arrays.to_regions()) == values(stepped(regions, 4))
+    finally:
+        engine.set_balance(**previous)
+
+
+def test_fast_forward_stops_before_2_53():
+    regions = random_regions(random.Random(3), 50)
+    big = regions["지역0"]
+    big.gold, big.commerce = 2 ** 53 // 2, 300
+    arrays = EconomyArrays.from_regions(regions)
+    done = arrays.fast_forward(10)
+    # 성장 배율 1.6 으로 2**52 에서 시작하면 다음 틱이 2**53 을 넘을 수 있어 바로 멈춤
+    assert done == 0
+    big.gold = 2 ** 53 // 8
+    arrays = EconomyArrays.from_regions(regions)
+    done = arrays.fast_forward(10)
+    assert 0 < done < 10
+    assert values(arrays.to_regions()) == values(stepped(regions, done))
+    assert max(r_obj.gold for r_obj in arrays.to_regions().values()) < 2 ** 53
+
+
+def test_state_fast_forward_past_2_53(monkeypatch):
+    # 배열이 멈춘 뒤의 남은 턴은 Region.fast_forward (파이썬 int) 로 이어서 계산
+    names = [f"지역{i}" for i in range(300)]
+    state = engine.GameState.new_game("플레이어", names[0], region_names=names, rng=random.Random(0),
+                                      adjacency={name: [] for name in names})
+    r_obj = state.regions[names[1]]
+    r_obj.gold, r_obj.commerce = 2 ** 50, 100
+    state.touch_all()
+    expected = stepped(state.regions, 30)
+
+    done = []
+    fast_forward = EconomyArrays.fast_forward
+    monkeypatch.setattr(EconomyArrays, "fast_forward", lambda arrays, n: done.append(fast_forward(arrays, n)) or done[-1])
+    state.fast_forward(30)
+    assert 0 < done[0] < 30
+    assert values(state.regions) == values(expected)
+    assert state.regions[names[1]].gold > 2 ** 53
+
+
+def test_invest_and_recruit_match_region():
+    regions = random_regions(random.Random(5), 100)
+    arrays = EconomyArrays.from_regions(regions)
+    expected = engine.copy_regions(regions)
+    rng = random.Random(6)
+    for name in rng.choices(list(regions), k=300):
+        if rng.random() < 0.5:
+            kind = rng.choice(engine.GameState.INVEST_KINDS)
+            before = expected[name].gold
+            getattr(expected[name], "invest_" + kind)()
+            assert arrays.invest(name, kind) == (expected[name].gold != before)
+        else:
+            amount = rng.randint(1, 500)
+            before = expected[name].army
+            expected[name].recruit_army(amount)
+            assert arrays.recruit(name, amount) == (expected[name].army != before)
+    assert values(arrays.to_regions()) == values(expected)
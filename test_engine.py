@@ -0,0 +1,379 @@
+"""
+게임 엔진 테스트 (GameState / Region)
+
+    python -m pytest -q test_engine.py
+"""
+import random
+
+import pytest
+
+import engine
+import scenario
+from engine import REGION_FIELDS, Region
+
+
+def make_state(n=14, seed=3):
+    sc = scenario.korea() if n == 14 else scenario.generate(n, seed=1)
+    return sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=seed)
+
+
+def region_values(r_obj):
+    return {"owner": r_obj.owner, **{field: getattr(r_obj, field) for field in REGION_FIELDS}}
+
+
+def random_region(rng):
+    r_obj = Region("테스트", "소유자")
+    r_obj.gold = rng.choice([0, 1, 99, 1000, rng.randint(0, 10 ** 6)])
+    r_obj.food = rng.choice([0, 1, 299, 3000, rng.randint(0, 10 ** 6)])
+    r_obj.population = rng.choice([0, 1000, rng.randint(0, 10 ** 6)])
+    for field in ("agri", "commerce", "security"):
+        setattr(r_obj, field, rng.choice([0, 0, 1, 2, rng.randint(1, 12), rng.randint(1, 200)]))
+    r_obj.army = rng.choice([0, 5, 10, 2999, 3000, 3001, rng.randint(0, 50000)])
+    return r_obj
+
+
+def stepped(r_obj, n):
+    r_obj = r_obj.copy()
+    for _ in range(n):
+        r_obj.next_turn()
+    return r_obj
+
+
+# ----------------------------------
+# Region.fast_forward
+# ----------------------------------
+@pytest.mark.parametrize("seed", range(4))
+def test_fast_forward_matches_next_turn(seed):
+    rng = random.Random(seed)
+    for _ in range(300):
+        r_obj = random_region(rng)
+        n = rng.choice([1, 2, 3, 17, rng.randint(1, 400)])
+        fast = r_obj.copy()
+        fast.fast_forward(n)
+        assert region_values(fast) == region_values(stepped(r_obj, n)), (region_values(r_obj), n)
+
+
+@pytest.mark.parametrize("level", [1, 2, 3, 5, 7, 10, 50])
+def test_fast_forward_truncation_edges(level):
+    # 성장분 int(y * rate * level) 이 막 1 / 2 / ... 가 되는 경계 바로 앞뒤에서 출발
+    for field, rate in (("commerce", engine.COMMERCE_RATE), ("security", engine.SECURITY_RATE),
+                        ("agri", engine.AGRI_RATE)):
+        income = 300 if field == "agri" else 100
+        for k in (1, 2, 3, 10):
+            edge = int(k / (rate * level)) - income
+            for start in range(max(0, edge - 3), edge + 4):
+                for n in (1, 2, 7, 60):
+                    r_obj = Region("테스트", "소유자")
+                    r_obj.gold = r_obj.food = r_obj.population = start
+                    setattr(r_obj, field, level)
+                    fast = r_obj.copy()
+                    fast.fast_forward(n)
+                    assert region_values(fast) == region_values(stepped(r_obj, n)), (field, start, n)
+
+
+def test_fast_forward_food_upkeep():
+    # 유지비가 수입보다 크거나 같은 경우, 식량이 0 이 되는 턴 전후, 병력 10 미만(유지비 0)
+    for army in (0, 9, 10, 2990, 3000, 3010, 4000, 40000):
+        for food in (0, 1, 9, 10, 299, 300, 301, 1000, 5000):
+            for agri in (0, 1, 5):
+                for n in (1, 2, 5, 13, 40):
+                    r_obj = Region("테스트", "소유자")
+                    r_obj.food, r_obj.army, r_obj.agri = food, army, agri
+                    fast = r_obj.copy()
+                    fast.fast_forward(n)
+                    assert fast.food == stepped(r_obj, n).food, (army, food, agri, n)
+
+
+def test_fast_forward_with_other_balance():
+    previous = engine.set_balance(commerce_rate=0.0007, security_rate=0.0, agri_rate=0.05)
+    try:
+        rng = random.Random(9)
+        for _ in range(200):
+            r_obj = random_region(rng)
+            n = rng.randint(1, 200)
+            fast = r_obj.copy()
+            fast.fast_forward(n)
+            assert region_values(fast) == region_values(stepped(r_obj, n))
+    finally:
+        engine.set_balance(**previous)
+
+
+@pytest.mark.parametrize("size", [14, 400])
+def test_state_fast_forward_matches_next_turn(size):
+    # 400 지역은 economy.EconomyArrays 경로, 14 지역은 Region.fast_forward 경로
+    state = make_state(size)
+    rng = random.Random(size)
+    for r_obj in state.regions.values():
+        for field in ("agri", "commerce", "security"):
+            setattr(r_obj, field, rng.choice([0, 1, 3, 8]))
+        r_obj.army = rng.choice([0, 500, 4000])
+    state.touch_all()
+    expected = {name: stepped(r_obj, 25) for name, r_obj in state.regions.items()}
+
+    state.fast_forward(25)
+    assert state.turn == 25
+    assert {name: region_values(r_obj) for name, r_obj in state.regions.items()} == {
+        name: region_values(r_obj) for name, r_obj in expected.items()
+    }
+
+
+# ----------------------------------
+# 소유자 색인 / 세력 합계
+# ----------------------------------
+def check_index(state):
+    """색인 / 합계를 모든 지역을 다시 세어 만든 값과 비교"""
+    owned = {}
+    for name, r_obj in state.regions.items():
+        owned.setdefault(r_obj.owner, []).append(name)
+    assert sorted(state.factions(), key=str) == sorted(owned, key=str)
+    for owner, names in owned.items():
+        assert [r_obj.name for r_obj in state.owned_regions(owner)] == names
+        assert all(state.owns(owner, name) for name in names)
+        regions = [state.regions[name] for name in names]
+        assert state.faction_summary(owner) == {
+            "regions": len(names),
+            "gold": sum(r_obj.gold for r_obj in regions),
+            "food": sum(r_obj.food for r_obj in regions),
+            "army": sum(r_obj.army for r_obj in regions),
+        }
+    assert state.faction_summary("없는 세력") == {"regions": 0, "gold": 0, "food": 0, "army": 0}
+
+
+def random_commands(state, rng, count, undo=True):
+    """공격 / 행군 / 투자 / 모병 / 대량 명령 / 체크포인트 / 되돌리기 / 턴 진행을 무작위로 (undo=False 면 체크포인트 / 되돌리기 빼고)"""
+    names = list(state.regions)
+    for _ in range(count):
+        name = rng.choice(names)
+        owner = state.regions[name].owner
+        roll = rng.random()
+        if roll < 0.3:
+            state.attack(name)
+        elif roll < 0.4:
+            targets = list(state.reachable(name, 3, enemies_only=True))
+            if targets:
+                state.march(name, rng.choice(targets))
+        elif roll < 0.5:
+            state.invest(name, rng.choice(state.INVEST_KINDS))
+        elif roll < 0.6:
+            state.recruit(name, rng.randint(1, 300))
+        elif roll < 0.7:
+            state.orders(owner, [("invest", engine.ALL_REGIONS, "agri", 1),
+                                 ("recruit", name, engine.MAX_AMOUNT)])
+        elif roll < 0.8:
+            if undo:
+                state.checkpoint(limit=3)
+        elif roll < 0.9:
+            if undo and state.undo_depth:
+                state.rollback(rng.randint(1, state.undo_depth))
+        elif roll < 0.95:
+            state.step()
+        else:
+            state.fast_forward(rng.randint(1, 5))
+        yield
+
+
+@pytest.mark.parametrize("size", [14, 400])
+def test_owner_index_matches_recount(size):
+    state = make_state(size)
+    rng = random.Random(size)
+    for r_obj in state.regions.values():
+        r_obj.army = rng.choice([0, 100, 3000, 20000])
+        r_obj.gold = rng.choice([0, 500, 5000])
+    state.touch_all()
+    check_index(state)
+    owners = {name: r_obj.owner for name, r_obj in state.regions.items()}
+    for _ in random_commands(state, rng, 400):
+        check_index(state)
+    # 점령으로 실제로 소유자가 바뀐 지역이 있었는지
+    assert any(r_obj.owner != owners[name] for name, r_obj in state.regions.items())
+    check_index(state.clone())
+
+
+# ----------------------------------
+# 체크포인트 / 되돌리기
+# ----------------------------------
+def snapshot(state):
+    return state.to_dict(), state.state_hash(), state.full_state_hash(), state.rng.getstate()
+
+
+@pytest.mark.parametrize("deterministic", [False, True])
+def test_rollback_restores_state(deterministic):
+    sc = scenario.generate(60, seed=2)
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=4, deterministic=deterministic)
+    rng = random.Random(1)
+    for r_obj in state.regions.values():
+        r_obj.army = rng.choice([0, 100, 3000, 20000])
+    state.touch_all()
+    state.state_hash()
+    for _ in range(30):
+        before = snapshot(state)
+        state.checkpoint()
+        for name in rng.sample(list(state.regions), 3):
+            state.invest(name, "agri")
+            state.attack(name)
+            targets = list(state.reachable(name, 3, enemies_only=True))
+            if targets:
+                state.march(name, targets[-1])
+        state.step()
+        state.fast_forward(2)
+        state.rollback()
+        assert snapshot(state) == before
+        check_index(state)
+        # 다음 체크포인트는 한 턴 뒤에서
+        state.step()
+
+
+def test_nested_rollback():
+    state = make_state(400)
+    rng = random.Random(2)
+    snapshots = []
+    for _ in range(4):
+        snapshots.append(snapshot(state))
+        state.checkpoint()
+        for _ in random_commands(state, rng, 40, undo=False):
+            pass
+    # 한 단계씩
+    for expected in reversed(snapshots[2:]):
+        state.rollback()
+        assert snapshot(state) == expected
+    # 두 단계 한꺼번에
+    state.rollback(2)
+    assert snapshot(state) == snapshots[0]
+    assert state.undo_depth == 0
+    check_index(state)
+
+
+def test_checkpoint_limit_drops_oldest():
+    state = make_state()
+    rng = random.Random(3)
+    snapshots = []
+    for _ in range(5):
+        snapshots.append(snapshot(state))
+        state.checkpoint(limit=3)
+        for _ in random_commands(state, rng, 20, undo=False):
+            pass
+    assert state.undo_depth == 3
+    state.rollback(3)
+    assert snapshot(state) == snapshots[2]
+    with pytest.raises(ValueError):
+        state.rollback()
+
+
+# ----------------------------------
+# 대량 명령
+# ----------------------------------
+def orders_state():
+    state = make_state()
+    for name in ("경기도", "충청남도"):
+        r_obj = state.regions[name]
+        r_obj.owner = "플레이어"
+        r_obj.gold, r_obj.food, r_obj.population = 5000, 5000, 2000
+    state.regions["강원도"].owner = "다른 세력"
+    state.touch("경기도", "충청남도", "강원도")
+    return state
+
+
+GOOD_ORDERS = [("invest", engine.ALL_REGIONS, "agri", 1), ("recruit", "경기도", 5),
+               ("invest", "경기도", "commerce", engine.MAX_AMOUNT), ("recruit", "충청남도", 1)]
+
+
+@pytest.mark.parametrize("bad, error", [
+    (("invest", "경기도", "agri", 10 ** 6), None),      # 금 부족
+    (("recruit", "경기도", 10 ** 7), None),             # 식량 / 인구 부족
+    (("invest", "경기도", "army", 1), ValueError),      # 없는 투자 종류
+    (("invest", "경기도", "agri", 0), ValueError),      # 횟수 0
+    (("recruit", "경기도", -3), ValueError),            # 음수 인원
+    (("recruit", "강원도", 1), ValueError),             # 남의 지역
+    (("attack", "경기도"), ValueError),                 # 없는 명령
+])
+@pytest.mark.parametrize("position", [0, 2, 4])
+def test_orders_with_one_bad_order_change_nothing(bad, error, position):
+    state = orders_state()
+    state.state_hash()
+    changed = state.track_changes()
+    state.checkpoint()
+    before = snapshot(state)
+    orders = GOOD_ORDERS[:position] + [bad] + GOOD_ORDERS[position:]
+
+    if error is not None:
+        with pytest.raises(error):
+            state.orders("플레이어", orders)
+    else:
+        result = state.orders("플레이어", orders)
+        assert result["result"] == "rejected"
+        assert len(result["errors"]) == 1
+        assert (result["gold"], result["food"], result["population"], result["regions"]) == (0, 0, 0, 0)
+    assert snapshot(state) == before
+    assert not changed
+    assert not state._undo[-1].saved
+    check_index(state)
+
+    # 나쁜 명령을 빼면 모두 적용
+    assert state.orders("플레이어", GOOD_ORDERS)["result"] == "ok"
+    assert snapshot(state) != before
+
+
+# ----------------------------------
+# 상태 해시
+# ----------------------------------
+def deterministic_state(seed=7):
+    sc = scenario.generate(400, seed=1)
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=seed, deterministic=True)
+    rng = random.Random(5)
+    for r_obj in state.regions.values():
+        r_obj.army = rng.choice([0, 100, 3000, 20000])
+        r_obj.gold = rng.choice([0, 500, 5000])
+    state.touch_all()
+    return state
+
+
+def test_state_hash_matches_full_hash():
+    state = deterministic_state()
+    assert state.state_hash() == state.full_state_hash()
+    for _ in random_commands(state, random.Random(6), 300):
+        assert state.state_hash() == state.full_state_hash()
+    assert state.turn > 0
+
+
+def test_state_hash_after_binsave_round_trip():
+    from binsave import BinarySave, dumps
+
+    state = deterministic_state()
+    for _ in random_commands(state, random.Random(8), 100):
+        pass
+    state.commit()
+    loaded = BinarySave.from_bytes(dumps(state.to_dict())).to_state()
+    assert loaded.state_hash() == loaded.full_state_hash() == state.state_hash()
+
+    # 불러온 상태에서 이어가도 원본과 같은 해시
+    for target in (state, loaded):
+        for _ in random_commands(target, random.Random(9), 100):
+            assert target.state_hash() == target.full_state_hash()
+    assert loaded.state_hash() == state.state_hash()
+
+
+def test_state_hash_after_clone():
+    state = deterministic_state()
+    for _ in random_commands(state, random.Random(10), 50):
+        pass
+    expected = state.state_hash()
+    copy = state.clone()
+    assert copy.state_hash() == copy.full_state_hash() == expected
+    for _ in random_commands(copy, random.Random(11), 100):
+        assert copy.state_hash() == copy.full_state_hash()
+    # 복제본을 바꿔도 원본의 해시 캐시는 그대로
+    assert state.state_hash() == state.full_state_hash() == expected
+
+
+def test_same_seed_same_turn_hashes():
+    def turn_hashes(seed):
+        state = deterministic_state(seed)
+        hashes = []
+        for _ in random_commands(state, random.Random(12), 200, undo=False):
+            hashes.append((state.turn, state.turn_hash, state.state_hash()))
+        return hashes
+
+    first = turn_hashes(7)
+    assert first == turn_hashes(7)
+    assert len({turn_hash for _, turn_hash, _ in first}) > 5
+    assert first != turn_hashes(8)
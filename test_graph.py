@@ -0,0 +1,152 @@
+"""
+인접 그래프 / 전선 캐시 테스트
+
+    python -m pytest -q test_graph.py
+"""
+import random
+
+import pytest
+
+import scenario
+from graph import OFF_MAP, FrontierCache, MapGraph
+
+
+def random_adjacency(rng, n, off_map=3):
+    names = [f"지역{i}" for i in range(n)]
+    extra = [f"바깥{i}" for i in range(off_map)]
+    return {
+        name: rng.sample([nb for nb in names + extra if nb != name], rng.randint(0, 5)) for name in names
+    }
+
+
+def recount(graph, owners):
+    """전선을 처음부터 다시 계산: owner -> {적 지역 ID}"""
+    fronts = {}
+    for i, owner in enumerate(owners):
+        if owner is OFF_MAP:
+            continue
+        for j in graph.neighbors(i):
+            if owners[j] is not OFF_MAP and owners[j] != owner:
+                fronts.setdefault(owner, set()).add(j)
+    return fronts
+
+
+def cached(cache):
+    return {owner: set(cache.frontier(owner)) for owner in cache.fronts}
+
+
+def test_graph_keeps_neighbor_order():
+    graph = MapGraph(scenario.REGION_ADJACENCY)
+    for name, neighbors in scenario.REGION_ADJACENCY.items():
+        assert graph.neighbor_names(name) == neighbors
+        i = graph.ids[name]
+        for nb_name in neighbors:
+            assert i in graph.incoming(graph.ids[nb_name])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_frontier_cache_matches_recount(seed):
+    rng = random.Random(seed)
+    graph = MapGraph(random_adjacency(rng, 60))
+    factions = ["가", "나", "다", None]
+    owners = [rng.choice(factions) if name.startswith("지역") else OFF_MAP for name in graph.names]
+    cache = FrontierCache(graph, owners)
+    assert cached(cache) == recount(graph, owners)
+
+    copy = cache.copy()
+    for _ in range(500):
+        i = rng.randrange(len(graph))
+        if owners[i] is OFF_MAP:
+            continue
+        owners[i] = rng.choice(factions)
+        cache.set_owner(i, owners[i])
+        assert cache.owners == owners
+        assert cached(cache) == recount(graph, owners)
+    # 복사본은 원본의 변경과 무관
+    assert cached(copy) == recount(graph, copy.owners)
+
+
+def test_unowned_regions_are_enemies():
+    # 주인 없는 지역(None)은 예전 attack_action 처럼 공격 대상
+    sc = scenario.korea()
+    state = sc.new_game("플레이어", "경기도", rng=random.Random(0), seed=1)
+    state.regions["강원도"].owner = None
+    state.regions["충청북도"].owner = "플레이어"
+    state.touch("강원도", "충청북도")
+    enemies = [r_obj.name for r_obj in state.enemy_neighbors("경기도")]
+    assert enemies == [
+        nb_name for nb_name in scenario.REGION_ADJACENCY["경기도"]
+        if state.regions[nb_name].owner != "플레이어"
+    ]
+    assert "강원도" in enemies
+    assert "강원도" in [r_obj.name for r_obj in state.frontier("플레이어")]
+    assert state.attack("경기도", target="강원도")["target"] == "강원도"
+
+    # 주인 없는 지역에서 보면 다른 세력 지역이 모두 적
+    state.regions["강원도"].owner = None
+    state.touch("강원도")
+    assert [r_obj.name for r_obj in state.enemy_neighbors("강원도")] == [
+        nb_name for nb_name in scenario.REGION_ADJACENCY["강원도"] if state.regions[nb_name].owner is not None
+    ]
+
+
+def test_off_map_neighbors_are_skipped():
+    adjacency = {"가": ["나", "바깥"], "나": ["가"]}
+    graph = MapGraph(adjacency)
+    cache = FrontierCache(graph, ["갑", "을", OFF_MAP])
+    assert cached(cache) == {"갑": {graph.ids["나"]}, "을": {graph.ids["가"]}}
+    cache.set_owner(graph.ids["나"], None)
+    assert cached(cache) == {"갑": {graph.ids["나"]}, None: {graph.ids["가"]}}
+
+
+def fresh_reachable(state, source, turns):
+    """캐시 없이 BFS: 내 영토만 지나가고 다른 소유자 지역은 도착지로만"""
+    owner = state.regions[source].owner
+    dist = {source: 0}
+    queue = [source]
+    for d in range(1, turns + 1):
+        next_queue = []
+        for name in queue:
+            for nb_name in state.adjacency.get(name, ()):
+                if nb_name in dist or nb_name not in state.regions:
+                    continue
+                dist[nb_name] = d
+                if state.regions[nb_name].owner == owner:
+                    next_queue.append(nb_name)
+        queue = next_queue
+    del dist[source]
+    return dist
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_cached_reachable_matches_fresh_bfs(seed):
+    sc = scenario.generate(300, seed=seed)
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(seed), seed=1)
+    rng = random.Random(seed)
+    names = list(state.regions)
+    factions = state.factions()
+    # 한 세력이 큰 영토를 갖도록 몰아준 뒤 시작
+    for name in rng.sample(names, 150):
+        state.regions[name].owner = factions[0]
+    state.touch_all()
+
+    sources = rng.sample(names, 20)
+    for _ in range(200):
+        name = rng.choice(names)
+        state.regions[name].owner = rng.choice(factions[:4] + [None])
+        state.touch(name)
+        for source in rng.sample(sources, 5):
+            turns = rng.randint(1, 8)
+            reached = state.reachable(source, turns)
+            assert reached == fresh_reachable(state, source, turns)
+            assert list(reached.values()) == sorted(reached.values())
+            enemies = state.reachable(source, turns, enemies_only=True)
+            owner = state.regions[source].owner
+            assert enemies == {n: d for n, d in reached.items() if state.regions[n].owner != owner}
+            if enemies:
+                target = rng.choice(list(enemies))
+                path = state.march_path(source, target, turns)
+                assert len(path) == enemies[target] + 1
+                assert path[0] == source and path[-1] == target
+                assert all(b in state.adjacency[a] for a, b in zip(path, path[1:]))
+                assert all(state.regions[n].owner == owner for n in path[:-1])
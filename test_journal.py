@@ -0,0 +1,139 @@
+"""
+journal 기록 / 재생 / 이어하기 테스트
+
+    python -m pytest -q test_journal.py
+"""
+import os
+import random
+
+import pytest
+
+import scenario
+from engine import MAX_AMOUNT
+from journal import Journal, iter_entries, list_snapshots, replay
+
+
+def play(state, rng, turns):
+    """플레이어 세력으로 명령을 골고루 섞어 turns 턴 진행 (모든 명령이 journal 에 기록됨)"""
+    player = state.player_name
+    for turn in range(turns):
+        owned = [r_obj.name for r_obj in state.owned_regions(player)]
+        if not owned:
+            state.step()
+            continue
+        name = rng.choice(owned)
+        state.invest(name, rng.choice(state.INVEST_KINDS))
+        state.recruit(name, rng.randint(10, 60))
+        state.orders(player, [("recruit", name, MAX_AMOUNT)])
+        if turn % 3 == 0:
+            state.checkpoint()
+            state.attack(name)
+            state.rollback()
+        for r_obj in state.frontier_pairs(player)[:2]:
+            state.attack(r_obj[0].name)
+        targets = state.reachable(name, 3, enemies_only=True)
+        if targets:
+            state.march(name, sorted(targets)[0])
+        if turn % 4 == 1:
+            state.checkpoint()
+            state.invest(name, "agri")
+            state.commit()
+        state.step()
+    state.fast_forward(3)
+
+
+def start(tmp_path, sc, seed=5, deterministic=False, snapshot_every=4):
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(seed), seed=seed,
+                        deterministic=deterministic)
+    path = str(tmp_path / "campaign.journal")
+    journal = Journal.create(state, path, snapshot_every=snapshot_every)
+    return state, journal, path
+
+
+def test_replay_matches_recorded_game(tmp_path):
+    state, journal, path = start(tmp_path, scenario.korea())
+    play(state, random.Random(1), 12)
+    journal.close()
+
+    assert len(list_snapshots(path)) > 2
+    replayed = replay(path, verify=True, rng=random.Random(99))
+    assert replayed.to_dict() == state.to_dict()
+    assert replayed.full_state_hash() == state.full_state_hash()
+
+
+def test_replay_and_resume_on_generated_map(tmp_path, monkeypatch):
+    sc = scenario.generate(300, seed=2)
+    state, journal, path = start(tmp_path, sc)
+    play(state, random.Random(2), 10)
+    journal.close()
+    assert any(entry["cmd"] == "attack" for entry, _ in iter_entries(path, 0))
+
+    # 다른 프로세스에서 여는 것처럼 기억해 둔 지도를 지움 (journal 헤더의 map 으로 다시 생성)
+    monkeypatch.setattr(scenario, "_last_map", (None, None))
+    replayed = replay(path, verify=True)
+    assert len(replayed.graph) == 300
+    assert replayed.to_dict() == state.to_dict()
+
+    monkeypatch.setattr(scenario, "_last_map", (None, None))
+    resumed, resumed_journal = Journal.resume(path)
+    resumed_journal.close()
+    assert resumed.to_dict() == state.to_dict()
+    assert resumed.frontier_pairs("플레이어") and [
+        (a.name, b.name) for a, b in resumed.frontier_pairs("플레이어")
+    ] == [(a.name, b.name) for a, b in state.frontier_pairs("플레이어")]
+
+
+def test_deterministic_replay_checks_turn_hashes(tmp_path):
+    state, journal, path = start(tmp_path, scenario.korea(), deterministic=True)
+    play(state, random.Random(3), 8)
+    journal.close()
+    assert replay(path, verify=True).turn_hash == state.turn_hash
+
+    # 기록된 해시 하나를 바꾸면 그 턴에서 멈춤
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    i = next(i for i, line in enumerate(lines) if '"cmd": "step"' in line)
+    lines[i] = lines[i].replace('"hash": "', '"hash": "0')
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    with pytest.raises(ValueError, match="상태 해시"):
+        replay(path, verify=True)
+
+
+def test_resume_continues_the_same_game(tmp_path):
+    state, journal, path = start(tmp_path, scenario.korea(), seed=7, deterministic=True)
+    play(state, random.Random(4), 9)
+    journal.close()
+
+    resumed, resumed_journal = Journal.resume(path)
+    assert resumed.to_dict() == state.to_dict()
+    # 이어서 둔 수도 기록되어 처음부터 재생한 결과와 같음
+    play(resumed, random.Random(5), 3)
+    resumed_journal.close()
+    assert replay(path, verify=True).to_dict() == resumed.to_dict()
+
+
+def test_resume_truncates_torn_last_line(tmp_path):
+    state, journal, path = start(tmp_path, scenario.korea())
+    play(state, random.Random(6), 5)
+    journal.close()
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write('{"cmd": "invest", "region": "평안'.encode("utf-8"))
+
+    resumed, resumed_journal = Journal.resume(path)
+    assert os.path.getsize(path) == size
+    resumed.step()
+    state.step()
+    resumed_journal.close()
+    assert replay(path, verify=True).to_dict() == state.to_dict()
+
+
+def test_resume_without_snapshot(tmp_path):
+    state, journal, path = start(tmp_path, scenario.korea())
+    journal.close()
+    for _, snap in list_snapshots(path):
+        os.remove(snap)
+    with pytest.raises(ValueError, match="스냅샷"):
+        Journal.resume(path)
+    assert Journal.resume(str(tmp_path / "없음.journal")) == (None, None)
@@ -0,0 +1,53 @@
+"""
+탐색 플래너 테스트
+
+    python -m pytest -q test_planner.py
+"""
+import random
+import time
+
+import scenario
+from planner import END, Planner
+
+
+def make_state(n=14):
+    sc = scenario.korea() if n == 14 else scenario.generate(n, seed=1)
+    return sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=3)
+
+
+def walk(node):
+    yield node
+    for child in node.children.values():
+        yield from walk(child)
+
+
+def test_budget_includes_setup():
+    state = make_state(2000)
+    planner = Planner(sorted(state.factions())[1], budget_ms=0)
+    start = time.perf_counter()
+    assert planner.plan(state) == [END]
+    assert planner.last_iterations == 0
+    assert not planner.root.children
+    # 지문 계산까지만 하고 복제 / 반복 없이 돌아옴
+    assert time.perf_counter() - start < 1.0
+
+
+def test_aborted_iterations_leave_no_unvisited_nodes():
+    state = make_state(300)
+    planner = Planner(sorted(state.factions())[1], seed=1)
+    for budget_ms in (1, 2, 5, 10):
+        planner.plan(state, budget_ms)
+        for node in walk(planner.root):
+            for child in node.children.values():
+                assert child.visits > 0
+
+
+def test_iterations_are_reproducible():
+    plans = []
+    for _ in range(2):
+        state = make_state()
+        faction = sorted(state.factions())[1]
+        planner = Planner(faction, iterations=40, seed=7)
+        plans.append([planner.plan(state) for _ in range(3)])
+        assert planner.last_iterations == 40
+    assert plans[0] == plans[1]
@@ -0,0 +1,199 @@
+"""
+백그라운드 저장 / delta 저장 테스트
+
+    python -m pytest -q test_savegame.py
+"""
+import os
+import random
+import threading
+
+import pytest
+
+import binsave
+import scenario
+from savegame import SaveManager, delta_path, describe_save, load_state, read_deltas
+
+
+def make_state():
+    sc = scenario.korea()
+    return sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=3)
+
+
+def region_names(regions):
+    return [r_obj.name for r_obj in regions]
+
+
+def change(state, name, gold):
+    state.regions[name].gold = gold
+    state.touch(name)
+
+
+def save(saver, state, delta):
+    errors = []
+    saver.save(state, delta=delta, on_done=errors.append)
+    saver.flush()
+    return errors[0]
+
+
+def test_delta_round_trip(tmp_path):
+    state = make_state()
+    path = str(tmp_path / "save.json")
+    saver = SaveManager(path)
+    assert save(saver, state, delta=False) is None
+    names = list(state.regions)
+    for i, name in enumerate(names[:3]):
+        change(state, name, 1000 + i)
+        assert save(saver, state, delta=True) is None
+    assert len(list(read_deltas(path, saver._save_id))) == 3
+    assert load_state(path).to_dict() == state.to_dict()
+
+
+def test_failed_delta_forces_full_save(tmp_path):
+    state = make_state()
+    path = str(tmp_path / "save.json")
+    saver = SaveManager(path)
+    names = list(state.regions)
+
+    # 전체 저장이 끝난 뒤 작업 스레드를 잡아 두고 delta 두 개를 큐에 넣음
+    gate = threading.Event()
+    saver.save(state, on_done=lambda error: gate.wait())
+    calls = []
+    append_delta = saver._append_delta
+
+    def failing_append(data):
+        calls.append(data)
+        if len(calls) == 1:
+            raise OSError("디스크가 가득 찼습니다")
+        append_delta(data)
+
+    saver._append_delta = failing_append
+    errors = []
+    change(state, names[0], 111)
+    saver.save(state, delta=True, on_done=errors.append)
+    change(state, names[1], 222)
+    saver.save(state, delta=True, on_done=errors.append)
+    gate.set()
+    saver.flush()
+
+    # 실패한 delta 뒤의 delta 는 쓰지 않고 같은 오류를 돌려줌
+    assert len(calls) == 1
+    assert errors == [errors[0]] * 2 and isinstance(errors[0], OSError)
+    assert list(read_deltas(path, saver._save_id)) == []
+
+    # 다음 저장은 delta 를 요청해도 전체 저장 -> 실패한 지역 값도 들어감
+    change(state, names[2], 333)
+    assert save(saver, state, delta=True) is None
+    assert calls == [calls[0]]
+    loaded = load_state(path)
+    assert [loaded.regions[name].gold for name in names[:3]] == [111, 222, 333]
+    assert loaded.to_dict() == state.to_dict()
+
+
+def test_torn_delta_line_is_skipped(tmp_path):
+    state = make_state()
+    path = str(tmp_path / "save.json")
+    saver = SaveManager(path)
+    save(saver, state, delta=False)
+    names = list(state.regions)
+
+    change(state, names[0], 111)
+    save(saver, state, delta=True)
+    # 쓰다가 끊긴 줄 (한글 중간에서 잘림)
+    with open(delta_path(path), "ab") as f:
+        f.write('{"save_id": "x", "player_name": "플레이어'.encode("utf-8")[:-2])
+    change(state, names[1], 222)
+    save(saver, state, delta=True)
+
+    assert len(list(read_deltas(path, saver._save_id))) == 2
+    loaded = load_state(path)
+    assert [loaded.regions[name].gold for name in names[:2]] == [111, 222]
+    assert loaded.to_dict() == state.to_dict()
+
+
+@pytest.mark.parametrize("binary", [False, True], ids=["json", "binary"])
+def test_generated_map_survives_reload(tmp_path, monkeypatch, binary):
+    sc = scenario.generate(300, seed=2)
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=3)
+    state.step()
+    path = str(tmp_path / "save")
+    saver = SaveManager(path, binary=binary)
+    assert save(saver, state, delta=False) is None
+    change(state, "지역5", 555)
+    assert save(saver, state, delta=True) is None
+
+    # 다른 프로세스에서 불러오는 것처럼 기억해 둔 지도를 지우고 다시 생성
+    monkeypatch.setattr(scenario, "_last_map", (None, None))
+    loaded = load_state(path)
+    assert loaded.map_source == sc.source
+    assert len(loaded.graph) == 300
+    expected = region_names(state.enemy_neighbors("지역0"))
+    assert expected and region_names(loaded.enemy_neighbors("지역0")) == expected
+    assert loaded.to_dict() == state.to_dict()
+    loaded.step()
+    state.step()
+    assert loaded.to_dict() == state.to_dict()
+
+
+def test_scenario_file_map_survives_reload(tmp_path, monkeypatch):
+    scn_path = str(tmp_path / "map.scn")
+    scenario.write_scenario(scn_path, scenario.generate(50, seed=9))
+    sc = scenario.load_scenario(scn_path)
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(0))
+    path = str(tmp_path / "save.json")
+    assert save(SaveManager(path), state, delta=False) is None
+
+    monkeypatch.setattr(scenario, "_last_map", (None, None))
+    loaded = load_state(path)
+    assert loaded.adjacency == sc.adjacency
+    expected = region_names(state.frontier("플레이어"))
+    assert expected and region_names(loaded.frontier("플레이어")) == expected
+
+    # 지도 파일이 없어졌으면 알 수 있게 실패
+    os.remove(scn_path)
+    monkeypatch.setattr(scenario, "_last_map", (None, None))
+    with pytest.raises(ValueError):
+        load_state(path)
+
+
+def test_binary_save_with_deltas(tmp_path):
+    sc = scenario.generate(200, seed=4)
+    state = sc.new_game("플레이어", sc.names[0], rng=random.Random(0), seed=3)
+    path = str(tmp_path / "save.hgjb")
+    saver = SaveManager(path, binary=True)
+    assert save(saver, state, delta=False) is None
+    for turn in range(3):
+        state.attack(sc.names[0])
+        state.step()
+        assert save(saver, state, delta=True) is None
+    assert len(list(read_deltas(path, saver._save_id))) == 3
+
+    loaded = load_state(path)
+    assert loaded.turn == state.turn
+    assert loaded.to_dict() == state.to_dict()
+    assert loaded.faction_summary("플레이어") == state.faction_summary("플레이어")
+
+
+def test_describe_save_reads_one_record(tmp_path, monkeypatch):
+    state = make_state()
+    path = str(tmp_path / "save.hgjb")
+    saver = SaveManager(path, binary=True)
+    hydrated = []
+    region_at = binsave.BinarySave.region_at
+    monkeypatch.setattr(binsave.BinarySave, "region_at",
+                        lambda save, i: hydrated.append(i) or region_at(save, i))
+
+    def expected():
+        r_obj = state.regions[state.player_region_name]
+        return f"플레이어 / {state.turn} 턴 / 지역 {len(state.regions)}개\n{r_obj.name} 금 {r_obj.gold}"
+
+    save(saver, state, delta=False)
+    assert describe_save(path) == expected()
+    # 플레이어 지역 레코드 하나만 풀림
+    assert hydrated == [list(state.regions).index(state.player_region_name)]
+
+    # 플레이어 지역이 delta 에 있으면 레코드는 풀지 않음
+    state.step()
+    save(saver, state, delta=True)
+    assert describe_save(path) == expected()
+    assert len(hydrated) == 1
+    assert describe_save(str(tmp_path / "없음.hgjb")) is None
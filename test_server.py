@@ -0,0 +1,63 @@
+"""
+게임 서버 요청 처리 테스트
+
+    python -m pytest -q test_server.py
+"""
+import asyncio
+import json
+
+import server
+
+
+async def start(monkeypatch, limit):
+    monkeypatch.setattr(server, "LINE_LIMIT", limit)
+    game_server = server.GameServer()
+    await game_server.start("127.0.0.1", 0)
+    reader, writer = await asyncio.open_connection("127.0.0.1", game_server.port, limit=2 ** 24)
+    return game_server, reader, writer
+
+
+async def call(reader, writer, payload):
+    writer.write(payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8") + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def test_oversized_line_gets_error_and_session_continues(monkeypatch):
+    async def run():
+        game_server, reader, writer = await start(monkeypatch, 1000)
+        try:
+            new = await call(reader, writer, {"cmd": "new", "player": "플레이어", "region": "경기도"})
+            assert new["ok"]
+            # 한도를 조금 넘는 줄 / 버퍼를 여러 번 채우는 줄 모두 줄 끝까지 버리고 오류 응답
+            for size in (1001, 5000, 200000):
+                response = await call(reader, writer, b"{" + b" " * size + b"}\n")
+                assert response["ok"] is False
+                assert "너무 깁니다" in response["error"]
+                # 같은 연결 / 세션으로 다음 요청은 정상 처리
+                state = await call(reader, writer, {"cmd": "state"})
+                assert state["ok"] and state["diff"]["turn"] == 0
+            assert (await call(reader, writer, b"not json\n"))["ok"] is False
+            assert len(game_server.sessions) == 1
+        finally:
+            writer.close()
+            await game_server.close()
+
+    asyncio.run(run())
+
+
+def test_oversized_last_line_without_newline(monkeypatch):
+    async def run():
+        game_server, reader, writer = await start(monkeypatch, 1000)
+        try:
+            writer.write(b"x" * 5000)
+            writer.write_eof()
+            response = json.loads(await reader.readline())
+            assert response["ok"] is False
+            # 서버가 연결을 정상적으로 닫음
+            assert await reader.read() == b""
+        finally:
+            writer.close()
+            await game_server.close()
+
+    asyncio.run(run())
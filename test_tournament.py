@@ -0,0 +1,48 @@
+"""
+AI 대전 / 밸런스 시험 테스트
+
+    python -m pytest -q test_tournament.py
+"""
+import tournament
+
+
+def results_by_game(path):
+    return {
+        (tournament.params_key(r["params"]), r["game"]): {k: v for k, v in r.items() if k != "ms"}
+        for r in tournament.load_results(path)
+    }
+
+
+def test_progress_per_game(tmp_path):
+    calls = []
+    path = str(tmp_path / "sweep.jsonl")
+    played = tournament.run_tournament(path, 3, {"hp_factor": [25, 35]}, max_turns=60, stall_turns=20,
+                                       workers=2, progress=lambda done, total: calls.append((done, total)))
+    assert played == 6
+    assert calls == [(done, 6) for done in range(1, 7)]
+
+
+def test_sweep_points_are_interleaved(tmp_path):
+    # 조합을 번갈아 넣으므로 중간에 멈춰도 조합마다 게임 수가 고르다
+    path = str(tmp_path / "sweep.jsonl")
+    tournament.run_tournament(path, 3, {"hp_factor": [25, 35]}, max_turns=60, stall_turns=20, workers=1)
+    assert [(r["params"]["hp_factor"], r["game"]) for r in tournament.load_results(path)] == [
+        (25, 0), (35, 0), (25, 1), (35, 1), (25, 2), (35, 2),
+    ]
+
+
+def test_workers_give_same_results(tmp_path):
+    paths = [str(tmp_path / f"{workers}.jsonl") for workers in (1, 3)]
+    for path, workers in zip(paths, (1, 3)):
+        tournament.run_tournament(path, 4, {"invest_cost": [50, 100]}, max_turns=60, stall_turns=20,
+                                  workers=workers)
+    assert results_by_game(paths[0]) == results_by_game(paths[1])
+    assert len(results_by_game(paths[0])) == 8
+
+
+def test_resume_skips_finished_games(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    assert tournament.run_tournament(path, 2, max_turns=40, stall_turns=10, workers=1) == 2
+    assert tournament.run_tournament(path, 5, max_turns=40, stall_turns=10, workers=1) == 3
+    assert sorted(r["game"] for r in tournament.load_results(path)) == [0, 1, 2, 3, 4]
+    assert tournament.run_tournament(path, 5, max_turns=40, stall_turns=10, workers=1) == 0
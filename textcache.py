@@ -0,0 +1,128 @@
+"""
+글자 텍스처 캐시
+
+Kivy Label 은 글자가 바뀔 때마다 큰 한글 글꼴(.ttc)로 글자를 새로 그려서 새 텍스처를 GPU 에 올린다.
+CachedLabel / CachedButton 은 (글자, 글꼴 옵션) -> 그려 둔 Texture 를 TEXTURE_CACHE 에서 먼저 찾으므로
+지역 이름 / 소유자 이름 / 버튼 글자처럼 같은 글자가 반복되는 곳은 한 번만 그리고 그 뒤로는 재사용한다.
+안내 문구(info_label)나 지역 자원 줄처럼 거의 매번 글자가 다른 곳은 일반 Label 을 쓴다.
+(캐시에 넣어 봐야 다시 쓰이지 않고 자주 쓰는 텍스처만 밀어냄 - PerfOverlay 와 같은 이유)
+
+캐시는 최근에 쓴 순서(LRU)로 관리하고 텍스처 크기 합(가로 x 세로 x 4 바이트)이 max_bytes 를 넘으면
+가장 오래 안 쓴 것부터 버린다. markup 을 쓰는 Label 은 참조(refs) 정보가 필요하므로 캐시하지 않는다.
+"""
+from collections import OrderedDict
+
+from kivy.core.text import Label as CoreLabel
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+
+TEXTURE_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def _freeze(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def texture_key(core_label):
+    """CoreLabel 의 글자 + 그리기 옵션 (색 / 크기 / 정렬 / text_size 등 텍스처에 영향을 주는 값 전부)"""
+    options = core_label.options
+    return (core_label.text,) + tuple(
+        (name, _freeze(options[name])) for name in sorted(options) if name != "text"
+    )
+
+
+class TextureCache:
+    def __init__(self, max_bytes=TEXTURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._textures = OrderedDict()  # 키 -> (Texture, 바이트, is_shortened)
+
+    def __len__(self):
+        return len(self._textures)
+
+    def get(self, key):
+        entry = self._textures.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._textures.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, texture, is_shortened=False):
+        size = texture.width * texture.height * 4
+        entry = (texture, size, is_shortened)
+        if size > self.max_bytes:
+            # 캐시 전체보다 큰 텍스처는 그냥 쓰고 보관하지 않음
+            return entry
+        old = self._textures.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._textures[key] = entry
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, old_size, _) = self._textures.popitem(last=False)
+            self.bytes -= old_size
+        return entry
+
+    def clear(self):
+        self._textures.clear()
+        self.bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "textures": len(self._textures),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def format_stats(self):
+        s = self.stats()
+        # 성능 오버레이(기본 글꼴)에 나오므로 영문
+        return (f"text cache: {s['textures']} textures {s['bytes'] / 1024 / 1024:.1f}MB, "
+                f"hit {s['hit_rate']:.0%} ({s['hits']}/{s['hits'] + s['misses']})")
+
+
+# 앱 전체에서 같이 쓰는 캐시
+TEXTURE_CACHE = TextureCache()
+
+
+class TextureCacheMixin:
+    """Label.texture_update 를 TEXTURE_CACHE 를 거치도록 바꾸는 mixin"""
+
+    def texture_update(self, *largs):
+        core = self._label
+        if self.markup or core.__class__ is not CoreLabel or not core.text.strip():
+            # markup / 빈 글자는 원래 방식 그대로
+            return super().texture_update(*largs)
+
+        key = texture_key(core)
+        entry = TEXTURE_CACHE.get(key)
+        if entry is None:
+            core.refresh()
+            texture = core.texture
+            if texture is None or texture is core.texture_1px:
+                return super().texture_update(*largs)
+            # CoreLabel 은 텍스처 내용을 처음 쓸 때 자기의 "그때" 글자로 채우므로 지금 바로 채우고,
+            # 같은 크기면 텍스처를 덮어써서 재사용하므로 다음 refresh 에서는 새 텍스처를 만들게 떼어 놓는다
+            texture.bind()
+            core.texture = None
+            entry = TEXTURE_CACHE.put(key, texture, core.is_shortened)
+
+        texture, _, is_shortened = entry
+        self.texture = texture
+        self.texture_size = list(texture.size)
+        self.is_shortened = is_shortened
+
+
+class CachedLabel(TextureCacheMixin, Label):
+    pass
+
+
+class CachedButton(TextureCacheMixin, Button):
+    pass
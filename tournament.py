@@ -0,0 +1,430 @@
+"""
+AI 끼리 붙는 대량 대전 (밸런스 시험)
+
+한반도 14 지역 지도(REGION_ADJACENCY)에서 플레이어 없이 AI 세력끼리 한 세력만 남을 때까지
+(또는 max_turns 턴까지) 게임을 돌린다. 게임 번호마다 seed 가 정해져 있어서 시작 배치(누가 어느
+지역에서 시작하는지)와 규칙 AI 의 난수가 항상 같다. 매개변수 탐색의 모든 점이 같은 seed 들을
+쓰므로 점 사이의 차이는 밸런스 상수 차이에서만 나온다.
+
+세력마다 정책(policy)을 배정한다. 세력 이름 순서대로 정책 리스트를 돌아가며 배정하고,
+게임 번호마다 한 칸씩 밀어서 정책마다 시작 자리가 고르게 돌아가게 한다.
+
+  rule           : 기존 규칙 AI (투자 / 모병만, 공격 안 함)
+  greedy[:배율]  : 규칙 AI 경제 + 추가 모병 + 적 지역보다 병력이 배율(기본 1.5)배 넘게 많으면 점령 공격
+                   (안쪽 지역은 전선 지역 병력과 합쳐서 행군 공격)
+  planner[:ms]   : planner.Planner (MCTS, 한 턴 ms 밀리초) - 시간 예산이라 결과가 매번 같지는 않다
+
+게임은 한 판씩 프로세스 풀 작업으로 돌리고, 끝난 게임은 바로 결과 파일(JSONL)에
+한 줄씩 쓴다 (진행 표시도 한 판마다 갱신). 같은 파일로 다시 실행하면 이미 끝난 (매개변수, 게임 번호) 는 건너뛴다.
+stall_turns 동안 지역 주인이 한 번도 바뀌지 않으면 교착으로 보고 일찍 끝내므로
+(기본 밸런스에서는 군비 경쟁으로 굳는 판이 많다) 매개변수 탐색도 몇 분 안에 끝난다.
+
+    python tournament.py run results.jsonl --games 2000
+    python tournament.py run sweep.jsonl --games 300 --sweep hp_factor=25,30,35 --sweep invest_cost=50,100
+    python tournament.py run mixed.jsonl --policies rule,greedy:1.5,greedy:2.5
+    python tournament.py summary sweep.jsonl
+
+밸런스 상수 이름은 engine.BALANCE_DEFAULTS 와 같다
+(agri_rate / commerce_rate / security_rate / invest_cost / attack_factor / hp_factor).
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import ai
+import engine
+from engine import REGION_ADJACENCY, REGION_NAMES, GameState
+
+DEFAULT_POLICIES = ("greedy:1.5", "greedy:2.0", "rule")
+DEFAULT_MAX_TURNS = 500
+# 이 턴 수 동안 주인이 바뀐 지역이 없으면 교착(stalled)으로 보고 끝냄 (0 이면 끝까지)
+DEFAULT_STALL_TURNS = 100
+# greedy 정책이 턴마다 더 모집하는 인구 비율 / 행군 공격 최대 거리
+RECRUIT_SHARE = 0.02
+MARCH_TURNS = 3
+# 게임 길이 분포의 구간 폭 (턴)
+HISTOGRAM_BIN = 50
+
+
+# ----------------------------------
+# 정책
+# ----------------------------------
+class GreedyPolicy:
+    """
+    규칙 AI 와 같은 경제(ai.plan_faction, 같은 세력별 난수) + 욕심쟁이 점령 공격.
+    GameState.ai_planners 에 넣으면 step() 마다 play() 가 불린다.
+    """
+
+    def __init__(self, faction, margin=1.5):
+        self.faction = faction
+        self.margin = margin
+
+    def play(self, state):
+        faction = self.faction
+        regions = [(r.name, r.gold, r.food, r.population) for r in state.owned_regions(faction)]
+        ai.apply_intents(state, ai.plan_faction(faction, regions, state.seed, state.turn))
+        state.touch(*(name for name, _, _, _ in regions))
+
+        # 모든 지역에서 인구의 RECRUIT_SHARE 만큼 더 모병 (식량은 절반까지만 씀)
+        for r_obj in state.owned_regions(faction):
+            amount = min(int(r_obj.population * RECRUIT_SHARE), r_obj.food // (2 * engine.RECRUIT_FOOD_COST))
+            if amount > 0:
+                state.recruit(r_obj.name, amount)
+
+        # 병력이 많은 지역부터: 인접 적 지역 중 이길 수 있는 가장 약한 곳을 점령,
+        # 인접 적이 없는 안쪽 지역은 전선 지역 병력과 합쳐서 이길 수 있으면 행군 공격
+        attackers = sorted(state.owned_regions(faction), key=lambda r: -r.army)
+        for r_obj in attackers:
+            if r_obj.owner != faction or r_obj.army <= 0:
+                continue
+            neighbors = state.enemy_neighbors(r_obj.name)
+            if neighbors:
+                targets = [t for t in neighbors if r_obj.army > self.margin * t.army]
+                if targets:
+                    target = min(targets, key=lambda t: t.army)
+                    state.attack(r_obj.name, mode="occupy", target=target.name)
+                continue
+            best = None
+            for name in state.reachable(r_obj.name, MARCH_TURNS, enemies_only=True):
+                path = state.march_path(r_obj.name, name, MARCH_TURNS)
+                army = r_obj.army + state.regions[path[-2]].army
+                target = state.regions[name]
+                if army > self.margin * target.army and (best is None or target.army < best.army):
+                    best = target
+            if best is not None:
+                state.march(r_obj.name, best.name, mode="occupy", max_turns=MARCH_TURNS)
+
+
+def parse_policy(spec):
+    """"greedy:1.5" -> ("greedy", 1.5)"""
+    name, _, arg = spec.partition(":")
+    if name == "rule" and not arg:
+        return name, None
+    if name == "greedy":
+        return name, float(arg) if arg else 1.5
+    if name == "planner":
+        return name, int(arg) if arg else 20
+    raise ValueError(f"알 수 없는 정책: {spec}")
+
+
+def make_policy(spec, faction, seed):
+    """spec 에 맞는 ai_planners 값 (rule 이면 None - 규칙 AI 로 움직임)"""
+    name, arg = parse_policy(spec)
+    if name == "greedy":
+        return GreedyPolicy(faction, arg)
+    if name == "planner":
+        from planner import Planner
+        return Planner(faction, budget_ms=arg, seed=ai.faction_seed(seed, 0, faction))
+    return None
+
+
+# ----------------------------------
+# 게임 한 판
+# ----------------------------------
+def play_game(game_id, seed, policies=DEFAULT_POLICIES, max_turns=DEFAULT_MAX_TURNS,
+              stall_turns=DEFAULT_STALL_TURNS):
+    """
+    한 판을 끝까지 돌리고 결과 dict 반환.
+    end: conquest (한 세력만 남음) / stalled (stall_turns 동안 지역 주인 변화 없음) / max_turns
+    conquest 가 아니면 timeout = True, winner = None 이고 leader 는 지역이 가장 많은 세력.
+    """
+    start = time.perf_counter()
+    state = GameState.new_game(None, None, rng=random.Random(seed), adjacency=REGION_ADJACENCY,
+                               seed=seed)
+    factions = sorted(state.factions())
+    assigned = {
+        faction: policies[(k + game_id) % len(policies)] for k, faction in enumerate(factions)
+    }
+    for faction, spec in assigned.items():
+        policy = make_policy(spec, faction, seed)
+        if policy is not None:
+            state.ai_planners[faction] = policy
+    starts = {faction: [r.name for r in state.owned_regions(faction)] for faction in factions}
+
+    regions = list(state.regions.values())
+    owners = [r.owner for r in regions]
+    last_change = 0
+    end = "max_turns"
+    while state.turn < max_turns:
+        if len(state.factions()) == 1:
+            end = "conquest"
+            break
+        if stall_turns and state.turn - last_change >= stall_turns:
+            end = "stalled"
+            break
+        state.step()
+        now = [r.owner for r in regions]
+        if now != owners:
+            owners = now
+            last_change = state.turn
+    else:
+        if len(state.factions()) == 1:
+            end = "conquest"
+
+    final = {faction: state.faction_summary(faction)["regions"] for faction in state.factions()}
+    leader = max(sorted(final), key=lambda f: final[f])
+    timeout = end != "conquest"
+    return {
+        "game": game_id,
+        "seed": seed,
+        "turns": state.turn,
+        "end": end,
+        "timeout": timeout,
+        "winner": None if timeout else leader,
+        "leader": leader,
+        "policies": assigned,
+        "starts": starts,
+        "final": final,
+        "ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def run_job(params, game_id, base_seed, policies, max_turns, stall_turns):
+    """프로세스 풀 작업 하나: 밸런스 상수를 params 로 맞추고 게임 한 판"""
+    previous = engine.set_balance(**{**engine.BALANCE_DEFAULTS, **params})
+    try:
+        result = play_game(game_id, base_seed + game_id, policies, max_turns, stall_turns)
+        result["params"] = params
+        return result
+    finally:
+        engine.set_balance(**previous)
+
+
+# ----------------------------------
+# 대회 / 매개변수 탐색
+# ----------------------------------
+def sweep_points(sweeps):
+    """{"hp_factor": [25, 30], "invest_cost": [50, 100]} -> 모든 조합의 params dict 리스트"""
+    unknown = set(sweeps) - set(engine.BALANCE_DEFAULTS)
+    if unknown:
+        raise ValueError(f"알 수 없는 밸런스 상수: {', '.join(sorted(unknown))}")
+    names = sorted(sweeps)
+    return [dict(zip(names, values)) for values in itertools.product(*(sweeps[n] for n in names))]
+
+
+def params_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def load_results(path):
+    """결과 파일의 게임 결과 리스트 (마지막 줄이 쓰다 만 줄이면 버림)"""
+    if not os.path.exists(path):
+        return []
+    results = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                break
+    return results
+
+
+def run_tournament(path, games, sweeps=None, policies=DEFAULT_POLICIES, max_turns=DEFAULT_MAX_TURNS,
+                   stall_turns=DEFAULT_STALL_TURNS, workers=None, base_seed=0, progress=None):
+    """
+    매개변수 조합마다 games 판씩 돌려서 path 에 한 줄씩 추가. 새로 끝낸 게임 수를 반환.
+    progress(끝낸 수, 전체 수) 가 있으면 한 판이 끝날 때마다 불린다.
+    """
+    for spec in policies:
+        parse_policy(spec)
+    points = sweep_points(sweeps or {})
+    done = {(params_key(r["params"]), r["game"]) for r in load_results(path)}
+
+    # 매개변수 조합을 번갈아 가며 넣어서 중간에 멈춰도 모든 조합의 집계가 고르게 쌓이게 한다
+    jobs = [
+        (params, g, base_seed, tuple(policies), max_turns, stall_turns)
+        for g in range(games) for params in points if (params_key(params), g) not in done
+    ]
+    total = len(jobs)
+    if not jobs:
+        return 0
+
+    finished = 0
+    with open(path, "a", encoding="utf-8") as out:
+        def write(result):
+            nonlocal finished
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            finished += 1
+            if progress is not None:
+                progress(finished, total)
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            for job in jobs:
+                write(run_job(*job))
+            return finished
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # 작업을 한꺼번에 다 넣지 않고 워커 수의 두 배만 돌려서 메모리를 묶어 두지 않음
+            # (한 판이 수십 ~ 수백 ms 라 작업마다 넘기는 인자 / 결과의 직렬화 비용은 무시할 만함)
+            pending = set()
+            queue = iter(jobs)
+            for job in itertools.islice(queue, workers * 2):
+                pending.add(pool.submit(run_job, *job))
+            while pending:
+                completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    write(future.result())
+                    job = next(queue, None)
+                    if job is not None:
+                        pending.add(pool.submit(run_job, *job))
+    return finished
+
+
+# ----------------------------------
+# 집계
+# ----------------------------------
+def _percentile(ordered, p):
+    # nearest-rank (profiler.Profiler.stats 와 같은 방식)
+    n = len(ordered)
+    return ordered[min(n - 1, max(0, -(-p * n // 100) - 1))]
+
+
+def summarize(results):
+    """
+    매개변수 조합별 집계 리스트:
+      games / 끝난 방식별 판 수 / 정책별 승률(그 정책을 맡은 세력 중 이긴 비율) /
+      정책별 선두율(끝났을 때 지역이 가장 많았던 비율, 교착 게임 포함) /
+      시작 지역별 승률(그 지역에서 시작한 세력이 이긴 비율) / 정복으로 끝난 게임의 길이(턴) 분포
+    timeout 게임은 승자 없음으로 센다.
+    """
+    groups = {}
+    for r in results:
+        groups.setdefault(params_key(r["params"]), []).append(r)
+
+    summaries = []
+    for key in sorted(groups):
+        group = groups[key]
+        policy_played = {}
+        policy_wins = {}
+        policy_leads = {}
+        ends = {}
+        region_wins = dict.fromkeys(REGION_NAMES, 0)
+        for r in group:
+            for faction, spec in r["policies"].items():
+                policy_played[spec] = policy_played.get(spec, 0) + 1
+                policy_wins.setdefault(spec, 0)
+                policy_leads.setdefault(spec, 0)
+            ends[r["end"]] = ends.get(r["end"], 0) + 1
+            policy_leads[r["policies"][r["leader"]]] += 1
+            if r["winner"] is not None:
+                spec = r["policies"][r["winner"]]
+                policy_wins[spec] += 1
+                for name in r["starts"][r["winner"]]:
+                    region_wins[name] += 1
+
+        turns = sorted(r["turns"] for r in group if not r["timeout"])
+        histogram = {}
+        for t in turns:
+            low = t // HISTOGRAM_BIN * HISTOGRAM_BIN
+            histogram[low] = histogram.get(low, 0) + 1
+        n = len(group)
+        summaries.append({
+            "params": json.loads(key),
+            "games": n,
+            "timeouts": n - len(turns),
+            "ends": ends,
+            "policy_win_rate": {
+                spec: policy_wins[spec] / policy_played[spec] for spec in sorted(policy_played)
+            },
+            "policy_lead_rate": {
+                spec: policy_leads[spec] / policy_played[spec] for spec in sorted(policy_played)
+            },
+            "region_win_rate": {name: wins / n for name, wins in region_wins.items()},
+            "turns": {
+                "mean": sum(turns) / len(turns),
+                "p10": _percentile(turns, 10),
+                "p50": _percentile(turns, 50),
+                "p90": _percentile(turns, 90),
+                "max": turns[-1],
+                "histogram": {f"{low}-{low + HISTOGRAM_BIN - 1}": histogram[low]
+                              for low in sorted(histogram)},
+            } if turns else None,
+            "game_ms": sum(r["ms"] for r in group) / n,
+        })
+    return summaries
+
+
+def format_summary(summaries):
+    lines = []
+    for s in summaries:
+        params = ", ".join(f"{k}={v}" for k, v in s["params"].items()) or "기본값"
+        ends = ", ".join(f"{end} {count}" for end, count in sorted(s["ends"].items()))
+        lines.append(f"[{params}] {s['games']}판 ({ends}, 판당 {s['game_ms']:.1f}ms)")
+        lines.append("  정책 승률: " + ", ".join(
+            f"{spec} {rate:.1%}" for spec, rate in s["policy_win_rate"].items()
+        ))
+        lines.append("  정책 선두율: " + ", ".join(
+            f"{spec} {rate:.1%}" for spec, rate in s["policy_lead_rate"].items()
+        ))
+        t = s["turns"]
+        if t is not None:
+            lines.append(f"  게임 길이: 평균 {t['mean']:.0f} / p10 {t['p10']} / p50 {t['p50']} / "
+                         f"p90 {t['p90']} / 최대 {t['max']} 턴")
+            lines.append("  길이 분포: " + ", ".join(f"{k}:{v}" for k, v in t["histogram"].items()))
+        best = sorted(s["region_win_rate"].items(), key=lambda item: -item[1])[:3]
+        lines.append("  유리한 시작 지역: " + ", ".join(f"{name} {rate:.1%}" for name, rate in best))
+    return "\n".join(lines)
+
+
+def _parse_sweep(text):
+    name, _, values = text.partition("=")
+    if not values:
+        raise ValueError(f"--sweep 형식은 이름=값1,값2 입니다: {text}")
+    default = engine.BALANCE_DEFAULTS.get(name)
+    cast = int if isinstance(default, int) else float
+    return name, [cast(v) for v in values.split(",") if v]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="한국지 AI 대전 / 밸런스 시험")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="대전 실행 (이어서 실행 가능)")
+    run.add_argument("path", help="결과 JSONL 파일")
+    run.add_argument("--games", type=int, default=1000, help="매개변수 조합마다 게임 수")
+    run.add_argument("--sweep", action="append", default=[], help="밸런스 상수=값1,값2,... (여러 번 가능)")
+    run.add_argument("--policies", default=",".join(DEFAULT_POLICIES))
+    run.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    run.add_argument("--stall-turns", type=int, default=DEFAULT_STALL_TURNS,
+                     help="지역 주인 변화가 없으면 교착으로 끝낼 턴 수 (0 이면 끝까지)")
+    run.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    run.add_argument("--seed", type=int, default=0, help="게임 seed 시작값")
+    summary = sub.add_parser("summary", help="결과 파일 집계")
+    summary.add_argument("path")
+    summary.add_argument("--json", action="store_true", help="JSON 으로 출력")
+    args = parser.parse_args(argv)
+
+    if args.command == "summary":
+        summaries = summarize(load_results(args.path))
+        if args.json:
+            print(json.dumps(summaries, ensure_ascii=False, indent=2))
+        else:
+            print(format_summary(summaries))
+        return 0
+
+    try:
+        sweeps = dict(_parse_sweep(text) for text in args.sweep)
+        policies = tuple(p for p in args.policies.split(",") if p)
+        start = time.perf_counter()
+
+        def progress(done, total):
+            print(f"\r{done}/{total} 판 ({time.perf_counter() - start:.1f}초)", end="", file=sys.stderr)
+
+        played = run_tournament(args.path, args.games, sweeps, policies, args.max_turns,
+                                args.stall_turns, args.workers, args.seed, progress=progress)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"\n{played}판 완료 ({time.perf_counter() - start:.1f}초)", file=sys.stderr)
+    print(format_summary(summarize(load_results(args.path))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))